@@ -0,0 +1,96 @@
+import pytest
+
+from yosai.core import (
+    AccountStoreRealm,
+    ModularRealmAuthorizer,
+    SimpleIdentifierCollection,
+)
+
+from .doubles import (
+    MemoryCacheHandler,
+    NullEventBus,
+    SyntheticAccountStore,
+)
+
+GRANT_COUNTS = (10, 1000, 10000)
+
+
+def identifier_for(grant_count):
+    return 'user{0}'.format(grant_count)
+
+
+@pytest.fixture(scope='session')
+def account_store():
+    return SyntheticAccountStore({identifier_for(count): count
+                                  for count in GRANT_COUNTS})
+
+
+def create_realm(name, account_store, permission_index_ttl=None):
+    realm = AccountStoreRealm(name=name,
+                              account_store=account_store,
+                              authc_verifiers=(),
+                              permission_index_ttl=permission_index_ttl)
+    realm.cache_handler = MemoryCacheHandler()
+    return realm
+
+
+@pytest.fixture(scope='function', params=[None, 300], ids=['default', 'index'])
+def permission_index_ttl(request):
+    """
+    Realms are benchmarked as configured by default and, separately, keeping
+    their compiled permission indexes (an opt-in configuration).
+    """
+    return request.param
+
+
+@pytest.fixture(scope='function')
+def realm(account_store, permission_index_ttl):
+    return create_realm('BenchmarkRealm', account_store, permission_index_ttl)
+
+
+@pytest.fixture(scope='function', params=[1, 3], ids=['1realm', '3realms'])
+def authorizer(request, account_store, permission_index_ttl):
+    """
+    With several realms, the identity is owned by the last of them and the
+    others hold no account for it, so that every realm is consulted.
+    """
+    empty_store = SyntheticAccountStore({})
+    realms = [create_realm('BenchmarkRealm{0}'.format(i), empty_store,
+                           permission_index_ttl)
+              for i in range(request.param - 1)]
+    realms.append(create_realm('BenchmarkRealm', account_store,
+                               permission_index_ttl))
+
+    mra = ModularRealmAuthorizer()
+    mra.event_bus = NullEventBus()
+    mra.init_realms(tuple(realms))
+    return mra
+
+
+@pytest.fixture(scope='function', params=GRANT_COUNTS,
+                ids=['{0}grants'.format(count) for count in GRANT_COUNTS])
+def grant_count(request):
+    return request.param
+
+
+@pytest.fixture(scope='function')
+def identifiers(grant_count):
+    # a source name that no realm owns, so that every realm is consulted:
+    return SimpleIdentifierCollection(source_name='benchmark',
+                                      identifier=identifier_for(grant_count))
+
+
+@pytest.fixture(scope='function')
+def held_permission(grant_count):
+    """
+    The permission of the last synthetic grant of the user (see
+    SyntheticAccountStore.generate_permissions)
+    """
+    i = grant_count - 1
+    actions = SyntheticAccountStore.actions
+    return 'domain{0}:{1}:{2}'.format(i % 20, actions[(i // 20) % len(actions)], i)
+
+
+@pytest.fixture(scope='function')
+def required_permissions(held_permission):
+    return [held_permission, 'domain0:read:unassigned', 'undefined:read']
@@ -0,0 +1,101 @@
+import json
+
+from yosai.core import (
+    SerializationManager,
+    account_abcs,
+    cache_abcs,
+)
+
+
+class MemoryCacheHandler(cache_abcs.CacheHandler):
+    """
+    An in-memory stand-in for a cache handler (such as yosai_dpcache's).
+    Values are serialized as they would be on the wire so that a warm cache
+    costs what deserialization costs, without network i/o.
+    """
+
+    def __init__(self):
+        self.serialization_manager = SerializationManager(None)
+        self.store = {}
+
+    def get(self, domain, identifier):
+        value = self.store.get((domain, identifier))
+        if value is None:
+            return None
+        return self.serialization_manager.deserialize(value)
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        value = self.get(domain, identifier)
+        if value is None:
+            value = creator_func(creator)
+            self.set(domain, identifier, value)
+        return value
+
+    def hmget_or_create(self, domain, identifier, keys, creator_func, creator):
+        value = self.get(domain, identifier)
+        if value is None:
+            value = creator_func(creator)
+            self.set(domain, identifier, value)
+        return [value.get(key) for key in keys]
+
+    def set(self, domain, identifier, value):
+        self.store[(domain, identifier)] = self.serialization_manager.serialize(value)
+
+    def delete(self, domain, identifier):
+        self.store.pop((domain, identifier), None)
+
+    def clear(self):
+        self.store.clear()
+
+
+class SyntheticAccountStore(account_abcs.AuthorizationAccountStore):
+    """
+    An account store of users holding a given number of synthetic grants,
+    spread across domains, of which each user holds a tenth as many roles.
+    """
+
+    actions = ('read', 'write', 'create', 'delete', 'export')
+
+    def __init__(self, grant_counts, domain_count=20):
+        """
+        :param grant_counts: {'identifier': the number of grants it holds}
+        """
+        self.domain_count = domain_count
+        self.permissions = {identifier: self.generate_permissions(count)
+                            for identifier, count in grant_counts.items()}
+        self.roles = {identifier: ['role{0}'.format(i)
+                                   for i in range(max(1, count // 10))]
+                      for identifier, count in grant_counts.items()}
+
+    def generate_permissions(self, count):
+        by_domain = {}
+        for i in range(count):
+            domain = 'domain{0}'.format(i % self.domain_count)
+            action = self.actions[(i // self.domain_count) % len(self.actions)]
+            parts = {'domain': domain,
+                     'actions': [action],
+                     'targets': [str(i)]}
+            by_domain.setdefault(domain, []).append(parts)
+
+        return {domain: json.dumps(parts) for domain, parts in by_domain.items()}
+
+    def get_authz_permissions(self, identifier):
+        return self.permissions.get(identifier)
+
+    def get_authz_roles(self, identifier):
+        return self.roles.get(identifier)
+
+
+class NullEventBus:
+    """
+    An event bus that discards events, so that event delivery is not measured.
+    """
+
+    def sendMessage(self, topic, **kwargs):
+        pass
+
+    def subscribe(self, listener, topic):
+        pass
+
+    def isSubscribed(self, listener, topic):
+        return True
@@ -0,0 +1,116 @@
+"""
+Microbenchmarks of the authorization hot path, run with pytest-benchmark:
+
+    python -m pytest benchmarks --benchmark-autosave
+
+See TESTING.md for saving results as json and comparing them across commits.
+"""
+import pytest
+
+from yosai.core import (
+    DefaultPermissionVerifier,
+    Permission,
+    permission_cache,
+)
+
+from .conftest import identifier_for
+
+
+def prepare_cache(realms, cache):
+    """
+    cold:  neither the cache handler nor the realms' compiled indexes hold
+           the user's authorization info, so it is obtained from the account
+           store
+    warm:  the cache handler and the compiled indexes hold it
+    """
+    for realm in realms:
+        if cache == 'cold':
+            realm.cache_handler.clear()
+            realm.forget_permission_index()
+            realm.negative_cache.clear()
+
+
+# -----------------------------------------------------------------------------
+# Permission Parsing
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('wildcard_perm', ['domain1',
+                                           'domain1:read,write',
+                                           'domain1:read,write:12,13,18'])
+def test_permission_parse_uncached(benchmark, wildcard_perm):
+    benchmark(Permission, wildcard_perm=wildcard_perm)
+
+
+@pytest.mark.parametrize('wildcard_perm', ['domain1:read,write:12,13,18'])
+def test_permission_parse_cached(benchmark, wildcard_perm):
+    permission_cache.clear()
+    Permission.parse(wildcard_perm)
+    benchmark(Permission.parse, wildcard_perm)
+
+
+# -----------------------------------------------------------------------------
+# DefaultPermissionVerifier
+# -----------------------------------------------------------------------------
+
+def test_verifier_is_permitted_from_json(benchmark, account_store, grant_count,
+                                         held_permission):
+    permissions = account_store.get_authz_permissions(identifier_for(grant_count))
+    blob = permissions[Permission.get_domain(held_permission)].encode('utf-8')
+    verifier = DefaultPermissionVerifier()
+
+    assert benchmark(verifier.is_permitted_from_json, held_permission, blob)
+
+
+# -----------------------------------------------------------------------------
+# AccountStoreRealm
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('cache', ['cold', 'warm'])
+def test_realm_is_permitted(benchmark, realm, identifiers, required_permissions,
+                            cache):
+    def is_permitted():
+        return list(realm.is_permitted(identifiers, required_permissions))
+
+    is_permitted()  # warms the cache
+    results = benchmark.pedantic(is_permitted,
+                                 setup=lambda: prepare_cache([realm], cache),
+                                 rounds=20 if cache == 'cold' else 200)
+
+    assert [result for permission, result in results] == [True, False, False]
+
+
+@pytest.mark.parametrize('cache', ['cold', 'warm'])
+def test_realm_has_role(benchmark, realm, identifiers, cache):
+    def has_role():
+        return list(realm.has_role(identifiers, {'role0', 'undefined'}))
+
+    has_role()  # warms the cache
+    results = benchmark.pedantic(has_role,
+                                 setup=lambda: prepare_cache([realm], cache),
+                                 rounds=20 if cache == 'cold' else 200)
+
+    assert dict(results) == {'role0': True, 'undefined': False}
+
+
+# -----------------------------------------------------------------------------
+# ModularRealmAuthorizer
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('logical_operator', [any, all],
+                         ids=['any', 'all'])
+@pytest.mark.parametrize('cache', ['cold', 'warm'])
+def test_authorizer_is_permitted_collective(
+        benchmark, authorizer, identifiers, required_permissions,
+        logical_operator, cache):
+    def is_permitted_collective():
+        return authorizer.is_permitted_collective(identifiers,
+                                                  required_permissions,
+                                                  logical_operator)
+
+    is_permitted_collective()  # warms the cache
+    result = benchmark.pedantic(
+        is_permitted_collective,
+        setup=lambda: prepare_cache(authorizer.realms, cache),
+        rounds=20 if cache == 'cold' else 200)
+
+    assert result is (logical_operator is any)
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from yosai.core import (
+    AccountException,
+    IncorrectCredentialsException,
+    SimpleIdentifierCollection,
+)
+
+from ..doubles import (
+    MockPubSub,
+)
+
+
+def authc_settings(**authc_config):
+    """
+    :returns: settings of the authc_config that a DefaultAuthenticator or a
+              PasslibVerifier reads, updated with the authc_config given
+    """
+    config = {'hash_algorithms': {'bcrypt_sha256': {}},
+              'totp': {'dispatcher': None, 'context': {}}}
+    config.update(authc_config)
+    return SimpleNamespace(AUTHC_CONFIG=config)
+
+
+class PasswordRealm:
+    """
+    A realm of plain-text passwords, keyed by identifier.
+    """
+
+    def __init__(self, name, passwords):
+        self.name = name
+        self.passwords = passwords
+        self.attempts = 0
+
+    def supports(self, token):
+        return True
+
+    def authenticate_account(self, authc_token):
+        self.attempts += 1
+        password = self.passwords.get(authc_token.identifier)
+        if password is None:
+            raise AccountException('no account: ' + authc_token.identifier)
+        if password.encode('utf-8') != authc_token.credentials:
+            raise IncorrectCredentialsException([])
+        return {'account_id': SimpleIdentifierCollection(
+                    source_name=self.name, identifier=authc_token.identifier),
+                'authc_info': {'password': {}}}
+
+
+class RecordingPubSub(MockPubSub):
+    """
+    A MockPubSub that records the topic and identifier of each message sent.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def sendMessage(self, topic_name, **kwargs):
+        self.messages.append((topic_name, kwargs.get('identifier')))
@@ -305,14 +305,19 @@ def test_da_do_authc_acct_multi_realm(
 
     faux_authc_realm = mock.create_autospec(AccountStoreRealm)
     faux_authc_realm2 = mock.create_autospec(AccountStoreRealm)
-    token_realm_resolver = {UsernamePasswordToken: (faux_authc_realm,)}
+    faux_totp_realm = mock.create_autospec(AccountStoreRealm)
+    token_realm_resolver = {UsernamePasswordToken: (faux_authc_realm,
+                                                    faux_authc_realm2)}
     monkeypatch.setattr(da, 'token_realm_resolver', token_realm_resolver)
-    monkeypatch.setattr(da, 'realms', (faux_authc_realm, faux_authc_realm2))
+    monkeypatch.setattr(da, 'realms', (faux_authc_realm, faux_authc_realm2,
+                                       faux_totp_realm))
 
     da.do_authenticate_account(mock_token)
 
     da_vl.assert_called_once_with(mock_token, [1477077663111])
-    da_amra.assert_called_once_with(da.realms, mock_token)
+    # only the realms that support the token are consulted:
+    da_amra.assert_called_once_with((faux_authc_realm, faux_authc_realm2),
+                                    mock_token)
 
 
 @mock.patch.object(DefaultAuthenticator, 'validate_locked')
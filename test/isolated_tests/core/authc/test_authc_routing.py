@@ -0,0 +1,97 @@
+import pytest
+
+from yosai.core import (
+    DefaultAuthenticator,
+    IncorrectCredentialsException,
+    MultiRealmAuthenticationException,
+    UsernamePasswordToken,
+)
+
+from .doubles import (
+    PasswordRealm,
+    authc_settings,
+)
+
+# -----------------------------------------------------------------------------
+# DefaultAuthenticator Identity Routing Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def routing_authenticator():
+    da = DefaultAuthenticator(authc_settings())
+    da.realms = (PasswordRealm('tenant1', {'thedude': 'letsgobowling'}),
+                 PasswordRealm('tenant2', {'thedude': 'abides',
+                                           'walter': 'shomer'}))
+    da.token_realm_resolver = {UsernamePasswordToken: list(da.realms)}
+    return da
+
+
+def authenticate(da, username, password):
+    token = UsernamePasswordToken(username, password)
+    token.token_info = {'tier': 1, 'cred_type': 'password'}
+    return da.do_authenticate_account(token)
+
+
+def test_da_routed_identity_falls_through_to_other_realms(routing_authenticator):
+    """
+    unit tested:  do_authenticate_account, authenticate_routed_account
+
+    test case:
+    an identity owned by two realms is routed to the realm that last
+    authenticated it, and is authenticated by the other realm when the routed
+    realm rejects the credentials, which routes it to the other realm
+    """
+    da = routing_authenticator
+    tenant1, tenant2 = da.realms
+
+    authenticate(da, 'thedude', 'letsgobowling')
+    assert da.identity_routes['thedude'] == 'tenant1'
+
+    account = authenticate(da, 'thedude', 'abides')
+    assert (account['account_id'].source_names == ('tenant2',) and
+            da.identity_routes['thedude'] == 'tenant2')
+
+    authenticate(da, 'thedude', 'abides')
+    assert tenant1.attempts == 2 and tenant2.attempts == 2
+
+
+def test_da_routed_identity_incorrect_credentials(routing_authenticator):
+    """
+    unit tested:  authenticate_routed_account
+
+    test case:
+    when only the routed realm has the account, its failure is raised as is
+    and the route is forgotten
+    """
+    da = routing_authenticator
+
+    authenticate(da, 'walter', 'shomer')
+    with pytest.raises(IncorrectCredentialsException):
+        authenticate(da, 'walter', 'shabbos')
+    assert 'walter' not in da.identity_routes
+
+
+def test_da_do_authc_acct_routes_identity(routing_authenticator):
+    """
+    unit tested:  do_authenticate_account, route_realms
+
+    test case:
+    an identifier that a realm authenticated is routed to that realm alone,
+    until that realm no longer finds the account
+    """
+    da = routing_authenticator
+    tenant1, tenant2 = da.realms
+    token = UsernamePasswordToken('walter', 'shomer')
+
+    authenticate(da, 'walter', 'shomer')
+    assert tenant1.attempts == 1
+
+    authenticate(da, 'walter', 'shomer')
+    assert (tenant1.attempts == 1 and tenant2.attempts == 2 and
+            da.route_realms(token) == ((tenant2,), True))
+
+    del tenant2.passwords['walter']
+    with pytest.raises(MultiRealmAuthenticationException):
+        authenticate(da, 'walter', 'shomer')
+    assert 'walter' not in da.identity_routes
@@ -1,6 +1,10 @@
 import pytest
+from unittest import mock
 
 from yosai.core import (
+    AccountException,
+    AuthenticationAttempt,
+    AuthenticationOverloadedException,
     all_realms_successful_strategy,
     at_least_one_realm_successful_strategy,
     first_realm_successful_strategy,
@@ -9,6 +13,21 @@ from yosai.core import (
     account_abcs,
 )
 
+
+def test_first_realmssuccessful_raises_overloaded():
+    """
+    A realm that turns the attempt away raises at once, rather than being
+    folded into a MultiRealmAuthenticationException
+    """
+    realms = [mock.MagicMock(), mock.MagicMock(), mock.MagicMock()]
+    realms[0].authenticate_account.side_effect = AccountException
+    realms[1].authenticate_account.side_effect = AuthenticationOverloadedException
+
+    with pytest.raises(AuthenticationOverloadedException):
+        first_realm_successful_strategy(AuthenticationAttempt('token', realms))
+    assert not realms[2].authenticate_account.called
+
+
 # -----------------------------------------------------------------------------
 # FirstRealmSuccessfulStrategy Tests
 # -----------------------------------------------------------------------------
@@ -0,0 +1,85 @@
+import pytest
+
+from yosai.core import (
+    AuthenticationSettings,
+    calibrate_hash_cost,
+)
+from yosai.core.authc.calibration import measure_verify_seconds
+
+from .doubles import (
+    authc_settings,
+)
+
+# -----------------------------------------------------------------------------
+# Hash Cost Calibration Tests
+# -----------------------------------------------------------------------------
+
+
+def hashing_settings(algorithm, **context):
+    """
+    :returns: the AuthenticationSettings of an algorithm configured with the
+              context given
+    """
+    return AuthenticationSettings(authc_settings(
+        preferred_algorithm=algorithm, hash_algorithms={algorithm: context}))
+
+
+@pytest.mark.parametrize('algorithm, seconds_per_cost, setting, expected',
+                         [('sha256_crypt', 0.000001, 'default_rounds', 150000),
+                          ('bcrypt', None, 'default_rounds', 13),
+                          ('argon2', 0.000002, 'memory_cost', 75000)])
+def test_calibrate_hash_cost(algorithm, seconds_per_cost, setting, expected,
+                             monkeypatch):
+    """
+    the cost is extrapolated according to how the algorithm's cost grows,
+    choosing the highest cost within the target
+    """
+    def measure(algorithm, context, setting, cost, samples):
+        if seconds_per_cost:
+            return cost * seconds_per_cost
+        return 0.1 * 2 ** (cost - 13)
+
+    monkeypatch.setattr('yosai.core.authc.calibration.measure_verify_seconds',
+                        measure)
+    result = calibrate_hash_cost(hashing_settings(algorithm),
+                                 target_seconds=0.15)
+
+    assert result['setting'] == setting
+    assert result['cost'] == expected
+    assert result['within_target']
+    assert result['hash_algorithms'] == {algorithm: {setting: expected}}
+    assert (result['logins_per_second_per_core'] ==
+            pytest.approx(1 / result['verify_seconds']))
+
+
+def test_calibrate_hash_cost_min_logins_per_core(monkeypatch):
+    """
+    the recommendation is merged into the configured context, within its
+    min_rounds and max_rounds
+    """
+    monkeypatch.setattr('yosai.core.authc.calibration.measure_verify_seconds',
+                        lambda algorithm, context, setting, cost, samples:
+                        cost / 1e6)
+    settings = hashing_settings('sha256_crypt', default_rounds=110000,
+                                min_rounds=60000, max_rounds=1000000,
+                                salt_size=16)
+
+    result = calibrate_hash_cost(settings, target_seconds=0.1,
+                                 min_logins_per_core=20)
+
+    assert result['cost'] == 60000
+    assert not result['within_target']
+    assert result['hash_algorithms'] == {
+        'sha256_crypt': {'default_rounds': 60000, 'min_rounds': 60000,
+                         'max_rounds': 1000000, 'salt_size': 16}}
+
+
+def test_calibrate_hash_cost_refuses_fixed_cost():
+    with pytest.raises(ValueError):
+        calibrate_hash_cost(hashing_settings('md5_crypt'))
+
+
+def test_measure_verify_seconds_argon2_memory_cost():
+    seconds = measure_verify_seconds('argon2', {'rounds': 1}, 'memory_cost',
+                                     64, samples=1)
+    assert seconds > 0
@@ -0,0 +1,115 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from yosai.core import (
+    AuthenticationOverloadedException,
+    IncorrectCredentialsException,
+    PasslibVerifier,
+    UsernamePasswordToken,
+)
+
+from .doubles import (
+    authc_settings,
+)
+
+# -----------------------------------------------------------------------------
+# PasslibVerifier Tests, hashing with few rounds
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def sha256_passlib_verifier():
+    pv = PasslibVerifier(authc_settings(
+        preferred_algorithm='sha256_crypt',
+        hash_algorithms={'sha256_crypt': {'default_rounds': 1000}}))
+    yield pv
+    pv.shutdown()
+
+
+@pytest.fixture(scope='function')
+def password_token():
+    token = UsernamePasswordToken(username='user123', password='secret')
+    token.token_info = {'tier': 1, 'cred_type': 'password'}
+    return token
+
+
+def password_info(pv, password):
+    return {'password': {'credential': pv.password_cc.hash(password)}}
+
+
+@pytest.mark.parametrize('offload', [False, True])
+def test_verify_credentials_offloaded(sha256_passlib_verifier, password_token,
+                                      offload):
+    """
+    verification is performed by the worker processes when offloaded, and
+    fails with the same exception either way
+    """
+    pv = sha256_passlib_verifier
+    pv.hash_offload_enabled = offload
+
+    pv.verify_credentials(password_token, password_info(pv, 'secret'))
+
+    with pytest.raises(IncorrectCredentialsException):
+        pv.verify_credentials(password_token,
+                              password_info(pv, 'something else'))
+
+    assert (pv.hash_executor is not None) == offload
+
+
+@pytest.mark.parametrize('offload', [False, True])
+def test_verify_credentials_async(sha256_passlib_verifier, password_token,
+                                  offload):
+    pv = sha256_passlib_verifier
+    pv.hash_offload_enabled = offload
+    loop = asyncio.new_event_loop()
+    matching = password_info(pv, 'secret')
+    mismatching = password_info(pv, 'something else')
+
+    try:
+        loop.run_until_complete(
+            pv.verify_credentials_async(password_token, matching, loop))
+
+        with pytest.raises(IncorrectCredentialsException):
+            loop.run_until_complete(
+                pv.verify_credentials_async(password_token, mismatching, loop))
+    finally:
+        loop.close()
+
+
+def test_get_hash_executor_recreated_after_fork(sha256_passlib_verifier):
+    pv = sha256_passlib_verifier
+    executor = pv.get_hash_executor()
+    assert pv.get_hash_executor() is executor
+
+    pv.hash_executor_pid = -1
+    try:
+        assert pv.get_hash_executor() is not executor
+    finally:
+        executor.shutdown()
+        pv.shutdown()
+    assert pv.hash_executor is None
+
+
+def test_verify_credentials_turned_away(password_token, monkeypatch):
+    """
+    a verification that cannot be admitted is turned away without verifying,
+    and an admitted one releases its admission once verified
+    """
+    pv = PasslibVerifier(authc_settings(
+        preferred_algorithm='sha256_crypt',
+        hash_algorithms={'sha256_crypt': {'default_rounds': 1000}},
+        admission={'max_concurrent': 1}))
+    authc_info = password_info(pv, 'secret')
+    password_cc = mock.MagicMock(wraps=pv.password_cc)
+    monkeypatch.setattr(pv, 'password_cc', password_cc)
+
+    pv.admission_limiter.acquire()
+    with pytest.raises(AuthenticationOverloadedException):
+        pv.verify_credentials(password_token, authc_info)
+    assert not password_cc.verify.called
+
+    pv.admission_limiter.release()
+    pv.verify_credentials(password_token, authc_info)
+    assert password_cc.verify.called and pv.admission_limiter.active == 0
@@ -0,0 +1,176 @@
+import pytest
+from unittest import mock
+
+from yosai.core import (
+    AccountException,
+    DefaultAuthenticator,
+    ExcessiveAttemptsException,
+    LoginThrottle,
+    UsernamePasswordToken,
+)
+
+from .doubles import (
+    PasswordRealm,
+    RecordingPubSub,
+    authc_settings,
+)
+from ..realm.doubles import (
+    MemoryCacheHandler,
+)
+
+# -----------------------------------------------------------------------------
+# LoginThrottle Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize('rule', [(0, 1), (0.5, 1), (10, 0), (10, -1)])
+def test_login_throttle_rejects_rules_never_admitting(rule):
+    """
+    unit tested:  __init__
+
+    test case:
+    a rule without a whole token or without a refill would turn attempts
+    away for good, so it is rejected once the throttle is built
+    """
+    with pytest.raises(ValueError):
+        LoginThrottle({'identifier': (1, 1), 'host': rule})
+
+
+@mock.patch('yosai.core.authc.throttle.time')
+def test_login_throttle_refills(mock_time):
+    """
+    a bucket admits a burst of its capacity, then refills over time
+    """
+    mock_time.time.return_value = 1000
+    throttle = LoginThrottle({'identifier': (2, 0.5), 'host': (3, 1)})
+
+    throttle.attempt('user123', '10.0.0.1')
+    throttle.attempt('user123', '10.0.0.1')
+    with pytest.raises(ExcessiveAttemptsException) as exc:
+        throttle.attempt('user123', '10.0.0.1')
+    assert exc.value.retry_after == 2
+
+    throttle.attempt('user456', '10.0.0.1')  # the host's last token
+    with pytest.raises(ExcessiveAttemptsException) as exc:
+        throttle.attempt('user789', '10.0.0.1')
+    assert exc.value.retry_after == 1
+
+    mock_time.time.return_value = 1002
+    throttle.attempt('user123', '10.0.0.1')
+
+
+def test_login_throttle_forgets_least_recent():
+    throttle = LoginThrottle({'identifier': (1, 0.001)}, maxsize=2)
+    for identifier in ('user1', 'user2', 'user3'):
+        throttle.attempt(identifier)
+
+    assert list(throttle.buckets) == [('identifier', 'user2'),
+                                      ('identifier', 'user3')]
+    throttle.attempt('user1')
+
+
+@mock.patch('yosai.core.authc.throttle.time')
+def test_login_throttle_cache_backed(mock_time):
+    """
+    buckets are shared through the cache handler rather than held in-process
+    """
+    mock_time.time.return_value = 1000
+    cache_handler = MemoryCacheHandler()
+    cache_handler.set('authentication:throttle', 'identifier:user123', [0.5, 1000])
+    throttle = LoginThrottle({'identifier': (5, 0.001)},
+                             cache_handler=cache_handler)
+
+    with pytest.raises(ExcessiveAttemptsException):
+        throttle.attempt('user123')
+
+    throttle.attempt('user456')
+    assert (cache_handler.get('authentication:throttle', 'identifier:user456') ==
+            [4, 1000] and not throttle.buckets)
+
+
+@mock.patch('yosai.core.authc.throttle.time')
+def test_login_throttle_cache_backed_unlocked(mock_time, monkeypatch):
+    """
+    the process lock isn't held across the cache handler's I/O
+    """
+    mock_time.time.return_value = 1000
+    cache_handler = MemoryCacheHandler()
+    throttle = LoginThrottle({'identifier': (5, 0.001)},
+                             cache_handler=cache_handler)
+    get = cache_handler.get
+
+    def get_unlocked(domain, identifier):
+        assert not throttle.lock.locked()
+        return get(domain, identifier)
+
+    monkeypatch.setattr(cache_handler, 'get', get_unlocked)
+
+    throttle.attempt('user123')
+    throttle.attempt('user123')
+    throttle.refund('user123')
+
+    assert get('authentication:throttle', 'identifier:user123') == [4, 1000]
+
+
+@mock.patch('yosai.core.authc.throttle.time')
+def test_login_throttle_refund(mock_time):
+    """
+    a refund returns a token taken, without exceeding the capacity
+    """
+    mock_time.time.return_value = 1000
+    throttle = LoginThrottle({'identifier': (1, 0.001), 'host': (2, 0.001)})
+
+    throttle.attempt('user123', '10.0.0.1')
+    throttle.refund('user123', '10.0.0.1')
+    throttle.refund('user123', '10.0.0.1')
+
+    assert throttle.buckets == {('identifier', 'user123'): (1, 1000),
+                                ('host', '10.0.0.1'): (2, 1000)}
+    throttle.attempt('user123', '10.0.0.1')
+
+
+# -----------------------------------------------------------------------------
+# DefaultAuthenticator Throttling Tests
+# -----------------------------------------------------------------------------
+
+
+def throttled_authenticator(refill_per_second):
+    da = DefaultAuthenticator(authc_settings(login_throttle={
+        'enabled': True,
+        'identifier': {'capacity': 1, 'refill_per_second': refill_per_second}}))
+    da.realms = (PasswordRealm('realm1', {'user123': 'secret'}),)
+    da.token_realm_resolver = {UsernamePasswordToken: list(da.realms)}
+    da.event_bus = RecordingPubSub()
+    return da
+
+
+def test_da_authenticate_account_throttled():
+    """
+    a throttled attempt is turned away before any account is obtained
+    """
+    da = throttled_authenticator(0.5)
+    token = UsernamePasswordToken('user123', 'secret', host='127.0.0.1')
+    da.realms[0].passwords.clear()
+
+    with pytest.raises(AccountException):
+        da.authenticate_account(None, token)
+
+    with pytest.raises(ExcessiveAttemptsException) as exc:
+        da.authenticate_account(None, token)
+
+    assert 0 < exc.value.retry_after <= 2
+    assert da.event_bus.messages[-1] == ('AUTHENTICATION.THROTTLED', 'user123')
+    assert da.realms[0].attempts == 1
+
+
+def test_da_authenticate_account_refunds_throttle():
+    """
+    a successful login isn't charged by the throttle
+    """
+    da = throttled_authenticator(0.001)
+    token = UsernamePasswordToken('user123', 'secret', host='127.0.0.1')
+
+    for _ in range(3):
+        da.authenticate_account(None, token)
+
+    assert da.realms[0].attempts == 3
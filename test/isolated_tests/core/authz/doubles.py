@@ -4,6 +4,13 @@ from yosai.core import (
 )
 
 
+SAMPLE_GRANTS = [{'domain': '*', 'actions': ['view'], 'targets': ['*']},
+                 {'domain': 'doc', 'actions': ['read', 'write'],
+                  'targets': ['5', '6']},
+                 {'domain': 'doc', 'actions': ['*'], 'targets': ['9']},
+                 {'domain': 'invoice', 'actions': ['create'], 'targets': ['*']}]
+
+
 class MockAuthzAccountStoreRealm(realm_abcs.AuthorizingRealm):
 
     def has_role(self, identifiers, roleid_s):
@@ -18,6 +25,15 @@ class MockAuthzAccountStoreRealm(realm_abcs.AuthorizingRealm):
     def is_permitted_all(self, identifiers, permission_s):
         return None
 
+    def filter_permitted(self, identifiers, permission, targets):
+        return None
+
+    def permitted_actions(self, identifiers, domain, target=None, catalog=None):
+        return None
+
+    def permitted_targets(self, identifiers, permission):
+        return None
+
     @property
     def authorization_cache_handler(self):
         pass
@@ -0,0 +1,216 @@
+import pytest
+from unittest import mock
+
+from yosai.core import (
+    ModularRealmAuthorizer,
+    SimpleIdentifierCollection,
+    TargetPredicate,
+)
+
+from .doubles import (
+    MockAuthzAccountStoreRealm,
+)
+
+# -----------------------------------------------------------------------------
+# ModularRealmAuthorizer Tests, consulting realm doubles
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def authorizer():
+    """
+    three authorizing realms, whose methods tests replace
+    """
+    mra = ModularRealmAuthorizer()
+    mra.realms = (MockAuthzAccountStoreRealm(),
+                  MockAuthzAccountStoreRealm(),
+                  MockAuthzAccountStoreRealm())
+    return mra
+
+
+def test_mra_filter_permitted(authorizer, monkeypatch):
+    """
+    unit tested:  filter_permitted
+
+    test case:
+    a target is permitted when any realm permits it, and each realm is only
+    consulted for the targets not yet permitted
+    """
+    mra = authorizer
+    consulted = []
+
+    def permits(permitted):
+        def filter_permitted(identifiers, permission, targets):
+            consulted.append(list(targets))
+            return [t for t in targets if t in permitted]
+        return filter_permitted
+
+    monkeypatch.setattr(mra.realms[0], 'filter_permitted', permits({3}))
+    monkeypatch.setattr(mra.realms[1], 'filter_permitted', permits({1, 2, 3}))
+    monkeypatch.setattr(mra.realms[2], 'filter_permitted', permits({4}))
+
+    results = mra.filter_permitted('identifiers', 'domain1:action1', [1, 2, 3, 5])
+
+    assert (results == [1, 2, 3] and
+            consulted == [[1, 2, 3, 5], [1, 2, 5], [5]])
+
+
+@pytest.mark.parametrize('logical_operator, realm_results, expected, consulted',
+                         [(any, [{'perm1': False, 'perm2': True}], True, 1),
+                          (any, [{'perm1': False, 'perm2': False},
+                                 {'perm1': True, 'perm2': False}], True, 2),
+                          (all, [{'perm1': True, 'perm2': False},
+                                 {'perm2': True}], True, 2),
+                          (all, [{'perm1': True, 'perm2': False},
+                                 {'perm2': False},
+                                 {'perm2': False}], False, 3),
+                          (all, [{'perm1': True, 'perm2': True}], True, 1)])
+def test_mra_is_permitted_collective_short_circuits(
+        authorizer, monkeypatch, logical_operator, realm_results, expected,
+        consulted):
+    """
+    unit tested:  is_permitted_collective
+
+    test case:
+    realms are consulted only until the outcome is certain and then only for
+    the permissions that remain undecided
+    """
+    mra = authorizer
+    calls = []
+
+    def is_permitted(results):
+        def realm_is_permitted(identifiers, permission_s):
+            calls.append(list(permission_s))
+            for permission in permission_s:
+                yield (permission, results[permission])
+        return realm_is_permitted
+
+    # there are three realms set for this fixture, unlisted realms deny all:
+    realm_results = realm_results + [{'perm1': False, 'perm2': False}] * 3
+    for realm, results in zip(mra.realms, realm_results):
+        monkeypatch.setattr(realm, 'is_permitted', is_permitted(results))
+
+    with mock.patch.object(mra, 'notify_event'):
+        result = mra.is_permitted_collective('identifiers', ['perm1', 'perm2'],
+                                             logical_operator)
+
+    assert result == expected and len(calls) == consulted
+    if logical_operator is all and consulted > 1:
+        assert calls[1] == ['perm2']
+
+
+def test_mra_authc_clears_cache_then_warms_up(authorizer, monkeypatch):
+    """
+    unit tested:  authc_clears_cache, warm_up_cache
+
+    test case:
+    when warm-up is enabled, each realm caches the authz_info it just cleared,
+    and a realm that fails to warm up doesn't prevent the others from doing so
+    """
+    mra = authorizer
+    calls = []
+    failing_realm = mock.MagicMock()
+    failing_realm.warm_authz_cache.side_effect = ValueError
+    warming_realm = mock.MagicMock()
+    warming_realm.clear_cached_authorization_info.side_effect = \
+        lambda identifier: calls.append(('clear', identifier))
+    warming_realm.warm_authz_cache.side_effect = \
+        lambda identifier: calls.append(('warm', identifier))
+    monkeypatch.setattr(mra, 'realms', (failing_realm, warming_realm))
+    monkeypatch.setattr(mra, 'warm_up_enabled', True)
+
+    mra.authc_clears_cache('identifier')
+
+    assert calls == [('clear', 'identifier'), ('warm', 'identifier')]
+
+
+def test_mra_permitted_actions(authorizer, monkeypatch):
+    """
+    unit tested:  permitted_actions
+
+    test case:
+    the actions permitted by each realm are combined, with the catalog of the
+    domain, and realms are no longer consulted once every action is permitted
+    """
+    mra = authorizer
+    consulted = []
+
+    def permits(actions):
+        def permitted_actions(identifiers, domain, target, catalog):
+            consulted.append(catalog)
+            return frozenset(actions)
+        return permitted_actions
+
+    monkeypatch.setattr(mra.realms[0], 'permitted_actions', permits({'create'}))
+    monkeypatch.setattr(mra.realms[1], 'permitted_actions', permits({'void'}))
+    monkeypatch.setattr(mra.realms[2], 'permitted_actions', permits({'export'}))
+    monkeypatch.setattr(mra, 'action_catalog',
+                        {'invoice': frozenset(['create', 'void'])})
+
+    results = mra.permitted_actions('identifiers', 'invoice')
+
+    assert (results == {'create', 'void'} and len(consulted) == 2 and
+            consulted[0] == {'create', 'void'})
+
+
+@pytest.mark.parametrize('realm_targets, expected',
+                         [([(False, {'1'}), (False, {'2'}), (False, set())],
+                           TargetPredicate(targets={'1', '2'})),
+                          ([(False, {'1'}), (True, set()), (False, {'3'})],
+                           TargetPredicate(permits_all=True)),
+                          ([(False, set())] * 3, TargetPredicate())])
+def test_mra_target_predicate(authorizer, monkeypatch, realm_targets, expected):
+    """
+    unit tested:  target_predicate
+
+    test case:
+    the targets permitted by each realm are combined into one predicate
+    """
+    mra = authorizer
+    for realm, permitted in zip(mra.realms, realm_targets):
+        monkeypatch.setattr(realm, 'permitted_targets',
+                            lambda identifiers, permission, p=permitted: p)
+
+    assert mra.target_predicate('identifiers', 'blogpost:edit') == expected
+
+
+def test_mra_route_realms(authorizer, monkeypatch):
+    """
+    unit tested:  route_realms, is_permitted
+
+    test case:
+    every realm is consulted unless routing by identity is configured, in
+    which case only the realms named by the identifiers' source_names are
+    consulted, and every realm is consulted for identifiers that name none of
+    them
+    """
+    mra = authorizer
+    consulted = []
+
+    def realm_is_permitted(name):
+        def is_permitted(identifiers, permission_s):
+            consulted.append(name)
+            return iter([(permission, False) for permission in permission_s])
+        return is_permitted
+
+    for position, realm in enumerate(mra.realms):
+        monkeypatch.setattr(realm, 'name', 'tenant' + str(position), raising=False)
+        monkeypatch.setattr(realm, 'is_permitted',
+                            realm_is_permitted('tenant' + str(position)))
+    monkeypatch.setattr(mra, 'realms_by_name',
+                        {realm.name: realm for realm in mra.realms})
+
+    mra.is_permitted(SimpleIdentifierCollection('tenant1', 'thedude'),
+                     ['domain1:action1'], log_results=False)
+    assert consulted == ['tenant0', 'tenant1', 'tenant2']
+
+    monkeypatch.setattr(mra, 'route_by_identity', True)
+    del consulted[:]
+
+    mra.is_permitted(SimpleIdentifierCollection('tenant1', 'thedude'),
+                     ['domain1:action1'], log_results=False)
+    assert consulted == ['tenant1']
+
+    mra.is_permitted(SimpleIdentifierCollection('unknown', 'thedude'),
+                     ['domain1:action1'], log_results=False)
+    assert consulted == ['tenant1', 'tenant0', 'tenant1', 'tenant2']
@@ -176,12 +176,12 @@ def test_mra_is_permitted_fails(modular_realm_authorizer_patched, monkeypatch):
 
 
 @pytest.mark.parametrize('mock_results, logical_operator, expected',
-                         [({('permission1', True), ('permission2', True)}, all, True),
-                          ({('permission1', True), ('permission2', False)}, all, False),
-                          ({('permission1', False), ('permission2', False)}, all, False),
-                          ({('permission1', True), ('permission2', True)}, any, True),
-                          ({('permission1', True), ('permission2', False)}, any, True),
-                          ({('permission1', False), ('permission2', False)}, any, False)])
+                         [({('perm1', True), ('perm2', True)}, all, True),
+                          ({('perm1', True), ('perm2', False)}, all, False),
+                          ({('perm1', False), ('perm2', False)}, all, False),
+                          ({('perm1', True), ('perm2', True)}, any, True),
+                          ({('perm1', True), ('perm2', False)}, any, True),
+                          ({('perm1', False), ('perm2', False)}, any, False)])
 def test_mra_is_permitted_collective(
         modular_realm_authorizer_patched, monkeypatch, mock_results,
         logical_operator, expected):
@@ -192,7 +192,9 @@ def test_mra_is_permitted_collective(
     a collection of permissions receives a single Boolean
     """
     mra = modular_realm_authorizer_patched
-    monkeypatch.setattr(mra, 'is_permitted', lambda x,y,log_results: mock_results)
+    # there are three realms set for this fixture:
+    for realm in mra.realms:
+        monkeypatch.setattr(realm, 'is_permitted', lambda x, y: mock_results)
     with mock.patch.object(mra, 'assert_realms_configured') as mra_arc:
         mra_arc.return_value = None
         with mock.patch.object(mra, 'notify_event') as mra_ne:
@@ -0,0 +1,124 @@
+import pytest
+import time
+from concurrent import futures
+from unittest import mock
+
+from yosai.core import (
+    ModularRealmAuthorizer,
+)
+
+# -----------------------------------------------------------------------------
+# ModularRealmAuthorizer Fan-Out Tests
+# -----------------------------------------------------------------------------
+
+
+class DelayedRealm:
+    """
+    A realm that grants the items of its results after a delay.
+    """
+
+    def __init__(self, name, results, delay=0):
+        self.name = name
+        self.results = results
+        self.delay = delay
+
+    def check(self, identifiers, item_s):
+        time.sleep(self.delay)
+        for item in item_s:
+            yield (item, self.results.get(item, False))
+
+    is_permitted = check
+    has_role = check
+
+
+@pytest.fixture(scope='function')
+def fan_out_authorizer():
+    mra = ModularRealmAuthorizer()
+    mra.executor = futures.ThreadPoolExecutor(max_workers=3)
+    mra.realm_timeout = 0.2
+    yield mra
+    mra.shutdown(wait=False)
+
+
+def test_mra_fan_out_times_out_each_realm(fan_out_authorizer):
+    """
+    unit tested:  _fan_out, is_permitted, has_role
+
+    test case:
+    a realm that doesn't respond within the realm_timeout denies every
+    item, rather than omitting its results, while the other realms'
+    results are merged
+    """
+    mra = fan_out_authorizer
+    mra.realms = (DelayedRealm('fast', {'perm1': True, 'role1': True}),
+                  DelayedRealm('slow', {'perm2': True, 'role2': True}, 1))
+
+    start = time.time()
+    results = list(mra._fan_out(mra.realms,
+                                lambda realm: realm.is_permitted('ids', ['perm1', 'perm2']),
+                                ['perm1', 'perm2']))
+    assert time.time() - start < 0.6
+    assert sorted(results) == [[('perm1', False), ('perm2', False)],
+                               [('perm1', True), ('perm2', False)]]
+
+    assert (mra.is_permitted('ids', ['perm1', 'perm2'], False) ==
+            {('perm1', True), ('perm2', False)})
+    assert (mra.has_role('ids', ['role1', 'role2'], False) ==
+            {('role1', True), ('role2', False)})
+
+
+def test_mra_is_permitted_fans_out(fan_out_authorizer):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    realms are consulted concurrently and their results merged, a permission
+    being granted when any realm grants it
+    """
+    mra = fan_out_authorizer
+    mra.realm_timeout = 1
+    mra.realms = (DelayedRealm('realm1', {'perm1': True}, 0.2),
+                  DelayedRealm('realm2', {'perm2': True}, 0.2),
+                  DelayedRealm('realm3', {}, 0.2))
+
+    start = time.time()
+    results = mra.is_permitted('identifiers', ['perm1', 'perm2', 'perm3'], False)
+
+    assert (time.time() - start < 0.5 and
+            results == {('perm1', True), ('perm2', True), ('perm3', False)})
+
+
+def test_mra_is_permitted_collective_fans_out_with_timeout(fan_out_authorizer):
+    """
+    unit tested:  is_permitted_collective
+
+    test case:
+    a realm that does not respond within the realm_timeout grants nothing, and
+    evaluation returns once the responding realms determine the outcome
+    """
+    mra = fan_out_authorizer
+    mra.realms = (DelayedRealm('realm1', {'perm1': True}),
+                  DelayedRealm('realm2', {'perm2': True}),
+                  DelayedRealm('realm3', {}, 1))
+
+    with mock.patch.object(mra, 'notify_event'):
+        start = time.time()
+        granted = mra.is_permitted_collective('identifiers', ['perm1', 'perm2'], all)
+        denied = mra.is_permitted_collective('identifiers', ['perm1', 'perm3'], all)
+
+    assert granted and not denied and time.time() - start < 0.9
+
+
+def test_mra_shutdown_stops_executors():
+    """
+    unit tested:  shutdown
+
+    test case:
+    the executors are shut down, and then no longer used
+    """
+    mra = ModularRealmAuthorizer()
+    executor = mra.executor = futures.ThreadPoolExecutor(max_workers=1)
+    mra.shutdown()
+    assert mra.executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
@@ -0,0 +1,223 @@
+import copy
+import json
+
+import pytest
+
+from yosai.core import (
+    DefaultPermissionVerifier,
+    Permission,
+    PermissionCache,
+    PermissionCodec,
+    PermissionIndex,
+    PermissionMinimizer,
+)
+
+from .doubles import (
+    SAMPLE_GRANTS,
+)
+
+# -----------------------------------------------------------------------------
+# Permission Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def sample_grants():
+    return copy.deepcopy(SAMPLE_GRANTS)
+
+
+def test_permission_implies_honors_targets():
+    assigned = Permission(wildcard_perm='blogpost:edit:12,13')
+    assert (assigned.implies(Permission(wildcard_perm='blogpost:edit:13')) and
+            not assigned.implies(Permission(wildcard_perm='blogpost:edit:14')))
+
+
+@pytest.mark.parametrize('first, second',
+                         [('domain1', 'domain1:*:*'),
+                          ('domain1:action2,action1', 'domain1:action1, action2'),
+                          ('domain1:action1:target2,target1',
+                           'domain1:action1:target1,target2')])
+def test_permission_canonical(first, second):
+    """
+    unit tested:  canonical
+
+    test case:
+    equal permissions have the same canonical string
+    """
+    assert (Permission(wildcard_perm=first).canonical() ==
+            Permission(wildcard_perm=second).canonical())
+
+
+# -----------------------------------------------------------------------------
+# PermissionCache Tests
+# -----------------------------------------------------------------------------
+
+
+def test_permission_parse_returns_shared_instance():
+    assert (Permission.parse('domain1:action1:target1') is
+            Permission.parse('domain1:action1:target1'))
+
+
+def test_permission_is_immutable():
+    permission = Permission.parse('domain1:action1')
+    with pytest.raises(AttributeError):
+        permission.actions = frozenset(['*'])
+    with pytest.raises(AttributeError):
+        permission.actions.add('action2')
+
+
+def test_permission_cache_counts_hits_and_misses():
+    cache = PermissionCache(maxsize=10)
+    first = cache.get('domain1:action1')
+    second = cache.get('domain1:action1')
+    cache.get('domain1:action2')
+
+    assert (first is second and
+            cache.cache_info() == (1, 2, 10, 2))
+
+
+def test_permission_cache_evicts_least_recently_used():
+    cache = PermissionCache(maxsize=2)
+    cache.get('domain1:action1')
+    cache.get('domain1:action2')
+    cache.get('domain1:action1')
+    cache.get('domain1:action3')  # evicts domain1:action2
+
+    cache.get('domain1:action1')
+    cache.get('domain1:action2')
+
+    assert cache.cache_info() == (2, 4, 2, 2)
+
+
+@pytest.mark.parametrize('wildcard_perm,domain',
+                         [('domain1:action1', 'domain1'),
+                          (':action1', '*'),
+                          ('domain1', 'domain1')])
+def test_permission_get_domain(wildcard_perm, domain):
+    assert Permission.get_domain(wildcard_perm) == domain
+
+
+def test_permission_cache_pins_permissions():
+    cache = PermissionCache(maxsize=1)
+    pinned = cache.pin('domain1:action1')
+    cache.get('domain1:action2')
+    cache.get('domain1:action3')
+
+    assert cache.get('domain1:action1') is pinned
+    with pytest.raises(ValueError):
+        cache.pin('domain1:action1:target1:extra')
+
+
+# -----------------------------------------------------------------------------
+# PermissionMinimizer Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize('assigned, expected',
+                         [(['doc:*', 'doc:read', 'doc:read:5'], ['doc:*:*']),
+                          (['doc:read:5', 'doc:write:5'], ['doc:read,write:5']),
+                          (['doc:read:5', 'doc:read:6'], ['doc:read:5,6']),
+                          (['doc:read:5', 'doc:write:6', 'doc:write:5'],
+                           ['doc:read,write:5', 'doc:write:6']),
+                          (['doc:read:5', 'invoice:read:5'],
+                           ['doc:read:5', 'invoice:read:5'])])
+def test_permission_minimizer_minimize(assigned, expected):
+    minimized = PermissionMinimizer().minimize(assigned)
+    assert [permission.canonical() for permission in minimized] == expected
+
+
+def test_permission_minimizer_minimize_matches_permission_implies(sample_grants):
+    """
+    unit tested:  minimize
+
+    test case:
+    the minimized permissions imply every action on every target that the
+    assigned permissions do
+    """
+    assigned = ([Permission(parts=parts) for parts in sample_grants] +
+                [Permission.parse(p) for p in ('doc:read:5', 'doc:read:7',
+                                               'invoice:void:1', 'doc:*:9,5')])
+    minimized = PermissionMinimizer().minimize(assigned)
+
+    assert len(minimized) < len(assigned)
+    for domain in ('doc', 'invoice', 'report'):
+        for action in ('read', 'write', 'view', 'void', 'create'):
+            for target in ('1', '5', '6', '7', '9', '*'):
+                required = Permission.parse(':'.join((domain, action, target)))
+                assert (any(p.implies(required) for p in assigned) ==
+                        any(p.implies(required) for p in minimized))
+
+
+def test_permission_minimizer_minimize_json_removes_wildcard_domain_implied():
+    permissions = {'*': json.dumps([{'domain': '*', 'actions': ['view'],
+                                     'targets': ['*']}]),
+                   'doc': json.dumps([{'domain': 'doc', 'actions': ['view'],
+                                       'targets': ['5']},
+                                      {'domain': 'doc', 'actions': ['read'],
+                                       'targets': ['5']}]).encode('utf-8')}
+
+    minimized = PermissionMinimizer().minimize_json(permissions)
+
+    assert (json.loads(minimized['doc']) ==
+            [{'domain': 'doc', 'actions': ['read'], 'targets': ['5']}] and
+            len(json.loads(minimized['*'])) == 1)
+
+
+# -----------------------------------------------------------------------------
+# PermissionCodec Tests
+# -----------------------------------------------------------------------------
+
+
+def test_permission_codec_round_trip(sample_grants):
+    """
+    unit tested:  encode, decode
+
+    test case:
+    a compact blob decodes to the permissions encoded, is smaller than the
+    json blob of the same permissions, and json blobs are decoded alike
+    """
+    codec = PermissionCodec()
+    assigned = ([Permission(parts=parts) for parts in sample_grants] +
+                [Permission.parse('doc:read:007,0,12')])
+    json_blob = json.dumps([p.to_parts() for p in assigned]).encode('utf-8')
+
+    compact_blob = codec.encode(assigned)
+
+    assert (PermissionCodec.is_compact(compact_blob) and
+            not PermissionCodec.is_compact(json_blob) and
+            len(compact_blob) < len(json_blob) and
+            codec.decode(compact_blob) == assigned and
+            codec.decode(json_blob) == assigned and
+            codec.decode(None) == [])
+
+
+@pytest.mark.parametrize('target, packed',
+                         [('12', 12), ('0', 0), ('007', '007'), ('\u00b2', '\u00b2'),
+                          ('\u0663', '\u0663'), ('-1', '-1'), ('1' * 19, '1' * 19)])
+def test_permission_codec_pack_target(target, packed):
+    """
+    unit tested:  pack_target
+
+    test case:
+    only targets that unpack to the same string are packed as integers
+    """
+    assert PermissionCodec.pack_target(target) == packed
+
+
+def test_permission_readers_accept_compact_blobs(sample_grants):
+    """
+    unit tested:  PermissionIndex.add_json,
+                  DefaultPermissionVerifier.is_permitted_from_json
+
+    test case:
+    compact blobs are read wherever json blobs are
+    """
+    codec = PermissionCodec()
+    blob = codec.encode(Permission(parts=parts) for parts in sample_grants
+                        if parts['domain'] == 'doc')
+    index = PermissionIndex()
+    index.add_json('doc', blob, codec)
+
+    assert (index.implies(Permission.parse('doc:write:6')) and
+            DefaultPermissionVerifier().is_permitted_from_json('doc:delete:9',
+                                                               blob))
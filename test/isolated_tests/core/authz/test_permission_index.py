@@ -0,0 +1,221 @@
+import copy
+import json
+
+import pytest
+
+from yosai.core import (
+    Permission,
+    PermissionIndex,
+    TargetPredicate,
+)
+
+from .doubles import (
+    SAMPLE_GRANTS,
+)
+
+# -----------------------------------------------------------------------------
+# PermissionIndex Tests, with grants that mix the wildcard among named parts
+# -----------------------------------------------------------------------------
+
+MIXED_GRANTS = ['doc:*,write', 'doc:read:*,5', '*,doc:delete', 'doc:view:7',
+                '*:export', 'invoice:*,void:3', 'report:*']
+
+CATALOG = frozenset(['read', 'write', 'delete', 'view', 'export', 'void',
+                     'create'])
+
+
+@pytest.fixture(scope='function')
+def mixed_grants():
+    return [Permission(wildcard_perm=grant) for grant in MIXED_GRANTS]
+
+
+@pytest.fixture(scope='function')
+def mixed_index(mixed_grants):
+    index = PermissionIndex()
+    for grant in mixed_grants:
+        index.add(grant)
+    return index
+
+
+@pytest.mark.parametrize('domain, target',
+                         [('doc', None), ('doc', '5'), ('doc', '7'), ('doc', '*'),
+                          ('invoice', None), ('invoice', '3'), ('report', None),
+                          ('other', None)])
+def test_permission_index_permitted_actions_mixed_wildcards(
+        mixed_index, mixed_grants, domain, target):
+    """
+    unit tested:  permitted_actions
+
+    test case:
+    an action of the catalog is permitted exactly when checking the action
+    individually is, a wildcard among named actions or domains granting none
+    but the named ones
+    """
+    suffix = '' if target is None else ':' + target
+    expected = {action for action in CATALOG
+                if any(grant.implies(
+                       Permission(wildcard_perm=domain + ':' + action + suffix))
+                       for grant in mixed_grants)}
+
+    assert mixed_index.permitted_actions(domain, target, CATALOG) == expected
+
+
+def test_permission_index_permitted_actions_mixed_without_catalog(mixed_index):
+    """
+    unit tested:  permitted_actions
+
+    test case:
+    without a catalog, the wildcard is reported only when a grant permits
+    every action
+    """
+    assert mixed_index.permitted_actions('doc') == {'write', 'read', 'export'}
+    assert mixed_index.permitted_actions('report') == {'*', 'export'}
+
+
+# -----------------------------------------------------------------------------
+# PermissionIndex Tests, with grants compiled from json blobs
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def sample_grants():
+    return copy.deepcopy(SAMPLE_GRANTS)
+
+
+@pytest.fixture(scope='function')
+def permission_index(sample_grants):
+    index = PermissionIndex()
+    for domain in ('*', 'doc', 'invoice'):
+        blob = json.dumps([g for g in sample_grants if g['domain'] == domain])
+        index.add_json(domain, blob.encode('utf-8'))
+    return index
+
+
+@pytest.mark.parametrize('required',
+                         ['doc:read:5', 'doc:read,write:6', 'doc:read:7',
+                          'doc:delete:9', 'doc:delete', 'doc:view:1',
+                          'doc:read,view:5', 'invoice:create:1', 'invoice',
+                          '*:view', 'report:view', 'report:edit'])
+def test_permission_index_implies_matches_permission_implies(
+        permission_index, sample_grants, required):
+    """
+    unit tested:  implies
+
+    test case:
+    the index grants exactly what a scan of every assigned permission grants
+    """
+    required_perm = Permission(wildcard_perm=required)
+    expected = any(Permission(parts=parts).implies(required_perm)
+                   for parts in sample_grants)
+
+    assert permission_index.implies(required_perm) == expected
+
+
+def test_permission_index_candidates_excludes_unrelated(permission_index):
+    required = Permission(wildcard_perm='invoice:create:1')
+    candidates = list(permission_index.candidates(required))
+    assert ({next(iter(c.domain)) for c in candidates} == {'invoice'})
+
+
+def test_permission_index_add_json_marks_empty_domain_indexed():
+    index = PermissionIndex()
+    index.add_json('doc', None)
+    assert (index.is_indexed('doc') and
+            not index.implies(Permission(wildcard_perm='doc:read')))
+
+
+@pytest.mark.parametrize('permission', ['doc:read', 'doc:read,write',
+                                        'doc:delete', 'doc', '*:view',
+                                        'invoice:create', 'report:edit'])
+def test_permission_index_filter_permitted_matches_permission_implies(
+        permission_index, sample_grants, permission):
+    """
+    unit tested:  filter_permitted
+
+    test case:
+    a target is permitted exactly when checking the target individually is
+    """
+    targets = ['5', '6', '9', 7, '*', '', '5,6', '5,7', '5:6', ' 6']
+    prefix = permission if ':' in permission else permission + ':*'
+    expected = [t for t in targets
+                if any(Permission(parts=parts).implies(
+                       Permission(wildcard_perm=prefix + ':' + str(t)))
+                       for parts in sample_grants)]
+
+    assert permission_index.filter_permitted(permission, targets) == expected
+
+
+def test_permission_index_permitted_targets(permission_index):
+    assert (permission_index.permitted_targets(Permission.parse('doc:read')) ==
+            (False, frozenset(['5', '6', '9'])) and
+            permission_index.permitted_targets(Permission.parse('doc:view')) ==
+            (True, frozenset()))
+
+
+@pytest.mark.parametrize('domain, target',
+                         [('doc', None), ('doc', '5'), ('doc', 9), ('doc', '7'),
+                          ('invoice', None), ('invoice', '3'), ('report', None)])
+def test_permission_index_permitted_actions_matches_permission_implies(
+        permission_index, sample_grants, domain, target):
+    """
+    unit tested:  permitted_actions
+
+    test case:
+    an action of the catalog is permitted exactly when checking the action
+    individually is, the wildcard action being expanded against the catalog
+    """
+    catalog = frozenset(['read', 'write', 'delete', 'view', 'create'])
+    suffix = '' if target is None else ':' + str(target)
+    expected = {action for action in catalog
+                if any(Permission(parts=parts).implies(
+                       Permission(wildcard_perm=domain + ':' + action + suffix))
+                       for parts in sample_grants)}
+
+    assert permission_index.permitted_actions(domain, target, catalog) == expected
+
+
+def test_permission_index_permitted_actions_without_catalog(permission_index):
+    assert (permission_index.permitted_actions('doc', '9') == {'*', 'view'} and
+            permission_index.permitted_actions('doc') == {'view'})
+
+
+# -----------------------------------------------------------------------------
+# TargetPredicate Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize('permits_all, targets, expected_sql',
+                         [(True, {'5'}, ('1 = 1', [])),
+                          (False, set(), ('1 = 0', [])),
+                          (False, {'6', '5'}, ('post.id IN (%s, %s)', [5, 6]))])
+def test_target_predicate_to_sql(permits_all, targets, expected_sql):
+    predicate = TargetPredicate(permits_all, targets)
+    assert predicate.to_sql('post.id', placeholder='%s', coerce=int) == expected_sql
+
+
+def test_target_predicate_to_sqlalchemy():
+    sqlalchemy = pytest.importorskip('sqlalchemy')
+    column = sqlalchemy.column('id')
+
+    clause = TargetPredicate(targets={'12', '13'}).to_sqlalchemy(column, int)
+
+    assert (str(clause.compile(compile_kwargs={'literal_binds': True})) ==
+            'id IN (12, 13)' and
+            TargetPredicate().to_sqlalchemy(column) is not None)
+
+
+def test_target_predicate_permits_as_permitted_targets(permission_index):
+    """
+    unit tested:  permits
+
+    test case:
+    a predicate compiled from the permitted targets permits a target exactly
+    when checking the target individually is
+    """
+    for permission in ('doc:read', 'doc:view', 'doc:delete', 'report:edit'):
+        predicate = TargetPredicate(*permission_index.permitted_targets(
+            Permission.parse(permission)))
+        for target in ('5', '6', 7, '9'):
+            assert (predicate.permits(target) ==
+                    permission_index.implies(
+                        Permission.parse(permission + ':' + str(target))))
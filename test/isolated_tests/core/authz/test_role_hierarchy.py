@@ -0,0 +1,75 @@
+import pytest
+
+from yosai.core import (
+    RoleHierarchy,
+)
+
+# -----------------------------------------------------------------------------
+# RoleHierarchy Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def role_hierarchy():
+    return RoleHierarchy({'admin': ['editor', 'auditor'],
+                          'editor': ['viewer']},
+                         {'editor': ['document:edit'],
+                          'viewer': ['document:read']})
+
+
+def test_role_hierarchy_expand_memoized(role_hierarchy):
+    """
+    unit tested:  expand
+
+    test case:
+    the expansion of a set of assigned roles is computed once, until
+    inheritance is next edited
+    """
+    expanded = role_hierarchy.expand(['editor', 'auditor'])
+
+    assert role_hierarchy.expand(('auditor', 'editor')) is expanded
+    assert expanded == {'editor', 'auditor', 'viewer'}
+
+    role_hierarchy.add_inheritance('viewer', 'guest')
+    assert role_hierarchy.expand(['editor', 'auditor']) == (
+        {'editor', 'auditor', 'viewer', 'guest'})
+
+    role_hierarchy.remove_inheritance('admin', 'editor')
+    role_hierarchy.remove_inheritance('editor', 'viewer')
+    assert role_hierarchy.expand(['editor', 'auditor']) == {'editor', 'auditor'}
+
+
+def test_role_hierarchy_expansions_bounded():
+    role_hierarchy = RoleHierarchy({'editor': ['viewer']}, expansions_maxsize=2)
+
+    for role_s in (['editor'], ['viewer'], ['auditor'], ['editor']):
+        role_hierarchy.expand(role_s)
+
+    assert list(role_hierarchy.expansions) == [frozenset(['auditor']),
+                                               frozenset(['editor'])]
+
+
+def test_role_hierarchy_closure(role_hierarchy):
+    assert (role_hierarchy.implied_roles('admin') ==
+            {'admin', 'editor', 'auditor', 'viewer'} and
+            role_hierarchy.expand(['editor', 'unknown']) ==
+            {'editor', 'viewer', 'unknown'} and
+            role_hierarchy.permissions(['editor']) ==
+            {'document:edit', 'document:read'})
+
+
+def test_role_hierarchy_updates_incrementally(role_hierarchy):
+    """
+    unit tested:  add_inheritance, remove_inheritance
+
+    test case:
+    an incrementally updated closure is that of a hierarchy built anew
+    """
+    role_hierarchy.add_inheritance('viewer', 'guest')
+    role_hierarchy.add_inheritance('superuser', 'admin')
+    role_hierarchy.remove_inheritance('admin', 'editor')
+
+    rebuilt = RoleHierarchy({'admin': ['auditor'], 'editor': ['viewer'],
+                             'viewer': ['guest'], 'superuser': ['admin']})
+
+    assert role_hierarchy.closure == rebuilt.closure
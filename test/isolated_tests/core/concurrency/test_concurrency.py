@@ -2,6 +2,7 @@ from unittest import mock
 import threading
 import time
 from yosai.core import (
+    ConcurrencyLimiter,
     StoppableScheduledExecutor,
 )
 
@@ -20,3 +21,29 @@ def test_sse_runs(stoppable_scheduled_executor):
         time.sleep(1)
         sse.stop()
         assert mock_run.called
+
+
+def test_concurrency_limiter_turns_away_beyond_queue():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=1)
+    assert limiter.acquire()
+    assert not limiter.acquire(blocking=False)
+
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(limiter.acquire()))
+    waiter.start()
+    while not limiter.queued:
+        time.sleep(0.01)
+
+    assert not limiter.acquire()  # the queue is full
+
+    limiter.release()
+    waiter.join()
+    assert admitted == [True] and limiter.active == 1 and limiter.queued == 0
+
+
+def test_concurrency_limiter_queue_timeout():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=1,
+                                 queue_timeout=0.05)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    assert limiter.queued == 0
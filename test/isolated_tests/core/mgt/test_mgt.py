@@ -573,7 +573,8 @@ def test_nsm_do_create_subject(mock_ds, native_security_manager, monkeypatch):
                                     host='host',
                                     session='session',
                                     session_creation_enabled='session_creation_enabled',
-                                    security_manager='security_manager')
+                                    security_manager='security_manager',
+                                    decision_memo_enabled=False)
 
 
 def test_nsm_save(native_security_manager, monkeypatch):
@@ -0,0 +1,152 @@
+import copy
+import json
+
+from yosai.core import (
+    IncorrectCredentialsException,
+    UsernamePasswordToken,
+    account_abcs,
+    authc_abcs,
+    cache_abcs,
+)
+
+
+class MemoryCacheHandler(cache_abcs.CacheHandler):
+    """
+    An in-memory stand-in for a cache handler (such as yosai_dpcache's).
+    Values are copied in and out, as they would be serialized on the wire.
+    """
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, domain, identifier):
+        return copy.deepcopy(self.store.get((domain, identifier)))
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        value = self.get(domain, identifier)
+        if value is None:
+            value = creator_func(creator)
+            self.set(domain, identifier, value)
+        return value
+
+    def hmget_or_create(self, domain, identifier, keys, creator_func, creator):
+        value = self.get(domain, identifier)
+        if value is None:
+            value = creator_func(creator)
+            self.set(domain, identifier, value)
+        return [value.get(key) for key in keys]
+
+    def set(self, domain, identifier, value):
+        self.store[(domain, identifier)] = copy.deepcopy(value)
+
+    def delete(self, domain, identifier):
+        self.store.pop((domain, identifier), None)
+
+    def keys(self, domain):
+        """
+        :returns: the identifiers cached under the domain
+        """
+        return {identifier for key_domain, identifier in self.store
+                if key_domain == domain}
+
+
+class MemoryAccountStore(account_abcs.AuthorizationAccountStore):
+    """
+    An account store of roles, wildcard permission strings and plain-text
+    passwords, keyed by identifier, which tests change as an administrator
+    would.
+    """
+
+    def __init__(self, roles=None, permissions=None, passwords=None):
+        self.roles = roles or {}
+        self.permissions = permissions or {}
+        self.passwords = passwords or {}
+        self.locked = {}
+        self.queries = 0
+
+    def get_authc_info(self, identifier):
+        self.queries += 1
+        password = self.passwords.get(identifier)
+        if password is None:
+            return None
+        return {'account_locked': self.locked.get(identifier),
+                'authc_info': {'password': {'credential': password,
+                                            'failed_attempts': []}}}
+
+    def lock_account(self, identifier, locked_time):
+        self.locked[identifier] = locked_time
+
+    def unlock_account(self, identifier):
+        self.locked.pop(identifier, None)
+
+    def get_authz_roles(self, identifier):
+        self.queries += 1
+        return self.roles.get(identifier)
+
+    def get_authz_permissions(self, identifier):
+        self.queries += 1
+        return self.permission_blobs(identifier)
+
+    def permission_blobs(self, identifier):
+        """
+        :returns: the identifier's permissions as json blobs, keyed by domain
+        """
+        by_domain = {}
+        for wildcard_perm in self.permissions.get(identifier, ()):
+            domain, _, rest = wildcard_perm.partition(':')
+            action, _, target = rest.partition(':')
+            by_domain.setdefault(domain, []).append(
+                {'domain': domain,
+                 'actions': action.split(',') if action else ['*'],
+                 'targets': target.split(',') if target else ['*']})
+        if not by_domain:
+            return None
+        return {domain: json.dumps(parts) for domain, parts in by_domain.items()}
+
+
+class MemoryAuthzInfoAccountStore(MemoryAccountStore,
+                                  account_abcs.AuthorizationInfoAccountStore):
+    """
+    A MemoryAccountStore that also obtains roles and permissions at once.
+    """
+
+    def get_authz_info(self, identifier):
+        self.queries += 1
+        return {'roles': self.roles.get(identifier),
+                'permissions': self.permission_blobs(identifier)}
+
+
+class MemoryRoleHierarchyAccountStore(MemoryAccountStore,
+                                      account_abcs.RoleHierarchyAccountStore):
+    """
+    A MemoryAccountStore that also defines a role hierarchy.
+    """
+
+    def __init__(self, role_hierarchy=None, role_permissions=None, **kwargs):
+        super().__init__(**kwargs)
+        self.role_hierarchy = role_hierarchy or {}
+        self.role_permissions = role_permissions
+
+    def get_role_hierarchy(self):
+        return self.role_hierarchy
+
+    def get_role_permissions(self):
+        return self.role_permissions
+
+
+class PlainTextVerifier(authc_abcs.CredentialsVerifier):
+    """
+    Verifies passwords against the plain-text credential stored, counting
+    the verifications that a hashing verifier would pay for.
+    """
+
+    supported_tokens = [UsernamePasswordToken]
+
+    def __init__(self):
+        self.verifications = 0
+
+    def verify_credentials(self, authc_token, authc_info):
+        self.verifications += 1
+        stored = authc_info[authc_token.token_info['cred_type']]['credential']
+        if stored.encode('utf-8') != authc_token.credentials:
+            raise IncorrectCredentialsException([])
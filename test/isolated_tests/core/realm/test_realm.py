@@ -309,8 +309,8 @@ def test_asr_get_authz_permissions_cannot_locate(
         asr.get_authzd_permissions('marty', 'domain12')
 
 
-@mock.patch.object(AccountStoreRealm, 'get_authzd_permissions')
-def test_asr_is_permitted_yields(asr_gap, account_store_realm, monkeypatch):
+@mock.patch.object(AccountStoreRealm, 'get_authzd_domain_permissions')
+def test_asr_is_permitted_yields(asr_gadp, account_store_realm, monkeypatch):
     """
     unit tested:  is_permitted
 
@@ -318,21 +318,19 @@ def test_asr_is_permitted_yields(asr_gap, account_store_realm, monkeypatch):
     - gets permissions
     - yields one permission at a time
     """
-    mock1 = mock.MagicMock()
-    mock1.implies.return_value = False
-    mock2 = mock.MagicMock()
-    mock2.implies.return_value = True
-
-    asr_gap.return_value = [mock1, mock2]
+    asr_gadp.return_value = [
+        rapidjson.dumps([{'domain': '*', 'actions': ['view'], 'targets': ['*']}]),
+        rapidjson.dumps([{'domain': 'domain1', 'actions': ['action1']}])]
     asr = account_store_realm
     mock_identifiers = mock.create_autospec(SimpleIdentifierCollection)
     mock_identifiers.primary_identifier = 'thedude'
-    test_permissions = ['domain1:action1']
+    test_permissions = ['domain1:action1', 'domain1:action2', 'domain1:view']
 
     result = list(asr.is_permitted(mock_identifiers, test_permissions))
 
-    asr_gap.assert_called_once_with('thedude', 'domain1')
-    assert result == [('domain1:action1', True)]
+    asr_gadp.assert_called_once_with('thedude', ['domain1'])
+    assert result == [('domain1:action1', True), ('domain1:action2', False),
+                      ('domain1:view', True)]
 
 
 def test_asr_is_permitted_no_account_obtained(
@@ -347,7 +345,7 @@ def test_asr_is_permitted_no_account_obtained(
     asr = account_store_realm
     sic = simple_identifier_collection
 
-    monkeypatch.setattr(asr, 'get_authzd_permissions', lambda x, y: [])
+    monkeypatch.setattr(asr, 'get_authzd_domain_permissions', lambda x, y: [])
 
     results = list(asr.is_permitted(sic, ['domain1:action1', 'domain2:action1']))
     assert results == [('domain1:action1', False), ('domain2:action1', False)]
@@ -0,0 +1,117 @@
+import pytest
+
+from yosai.core import (
+    AccountStoreRealm,
+    IncorrectCredentialsException,
+    UsernamePasswordToken,
+)
+
+from .doubles import (
+    MemoryAccountStore,
+    MemoryCacheHandler,
+    PlainTextVerifier,
+)
+
+# -----------------------------------------------------------------------------
+# AccountStoreRealm Authentication Tests, using in-memory doubles
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def password_account_store():
+    return MemoryAccountStore(passwords={'thedude': 'letsgobowling'})
+
+
+@pytest.fixture(scope='function')
+def password_realm(password_account_store):
+    realm = AccountStoreRealm(name='MemoryRealm',
+                              account_store=password_account_store,
+                              authc_verifiers=(PlainTextVerifier(),),
+                              verified_credentials_ttl=60)
+    realm.cache_handler = MemoryCacheHandler()
+    return realm
+
+
+def authenticate(realm, username, password):
+    token = UsernamePasswordToken(username, password)
+    token.token_info = {'tier': 1, 'cred_type': 'password'}
+    return realm.authenticate_account(token)
+
+
+def verifications(realm):
+    return realm.authc_verifiers[0].verifications
+
+
+def test_asr_authenticate_remembers_verified_credentials(password_realm):
+    """
+    unit tested:  authenticate_account, assert_credentials_match
+
+    test case:
+    the same credentials submitted again, within verified_credentials_ttl,
+    aren't verified again
+    """
+    asr = password_realm
+
+    for _ in range(3):
+        authenticate(asr, 'thedude', 'letsgobowling')
+
+    assert verifications(asr) == 1
+
+
+def test_asr_authenticate_other_password_verified(password_realm):
+    """
+    unit tested:  assert_credentials_match
+
+    test case:
+    another password submitted for a remembered identifier is verified, and
+    fails, without forgetting the verification that was remembered
+    """
+    asr = password_realm
+    authenticate(asr, 'thedude', 'letsgobowling')
+
+    with pytest.raises(IncorrectCredentialsException):
+        authenticate(asr, 'thedude', 'letsgobowling ')
+    assert verifications(asr) == 2
+
+    authenticate(asr, 'thedude', 'letsgobowling')
+    assert verifications(asr) == 2
+
+
+def test_asr_authenticate_changed_password_verified(
+        password_realm, password_account_store):
+    """
+    unit tested:  assert_credentials_match, get_verified_credentials_digest
+
+    test case:
+    once a changed credential is stored, the former password is verified
+    again, and fails, even though the verification of it was remembered
+    and the cache expired rather than being cleared by the realm
+    """
+    asr = password_realm
+    authenticate(asr, 'thedude', 'letsgobowling')
+
+    password_account_store.passwords['thedude'] = 'theduderabides'
+    asr.cache_handler.delete('authentication:' + asr.name, 'thedude')  # expired
+
+    with pytest.raises(IncorrectCredentialsException):
+        authenticate(asr, 'thedude', 'letsgobowling')
+    authenticate(asr, 'thedude', 'theduderabides')
+    assert verifications(asr) == 3
+
+
+def test_asr_lock_account_forgets_verified_credentials(password_realm):
+    """
+    unit tested:  lock_account
+
+    test case:
+    locking an account forgets its verification, so that credentials are
+    verified again once it is unlocked
+    """
+    asr = password_realm
+    authenticate(asr, 'thedude', 'letsgobowling')
+
+    asr.lock_account('thedude')
+    asr.unlock_account('thedude')
+    authenticate(asr, 'thedude', 'letsgobowling')
+
+    assert verifications(asr) == 2
@@ -0,0 +1,731 @@
+import json
+import time
+from unittest import mock
+
+import pytest
+
+from yosai.core import (
+    AccountStoreRealm,
+    DefaultPermissionVerifier,
+    Permission,
+    PermissionCodec,
+    PermissionMinimizer,
+    SimpleIdentifierCollection,
+    permission_cache,
+)
+
+from .doubles import (
+    MemoryAccountStore,
+    MemoryAuthzInfoAccountStore,
+    MemoryCacheHandler,
+    MemoryRoleHierarchyAccountStore,
+)
+
+# -----------------------------------------------------------------------------
+# AccountStoreRealm Authorization Tests, using in-memory doubles
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def memory_account_store():
+    return MemoryAccountStore(
+        roles={'thedude': ['editor']},
+        permissions={'thedude': ['document:read:1,2,3', 'report:*']})
+
+
+@pytest.fixture(scope='function')
+def memory_realm(memory_account_store):
+    realm = AccountStoreRealm(name='MemoryRealm',
+                              account_store=memory_account_store,
+                              authc_verifiers=())
+    realm.cache_handler = MemoryCacheHandler()
+    return realm
+
+
+@pytest.fixture(scope='function')
+def combined_cache_realm():
+    account_store = MemoryAuthzInfoAccountStore(
+        roles={'thedude': ['editor']},
+        permissions={'thedude': ['document:read:1,2,3', 'report:*']})
+    realm = AccountStoreRealm(name='MemoryRealm',
+                              account_store=account_store,
+                              authc_verifiers=())
+    realm.cache_handler = MemoryCacheHandler()
+    realm.combined_authz_cache = True
+    return realm
+
+
+@pytest.fixture(scope='function')
+def thedude():
+    return SimpleIdentifierCollection(source_name='MemoryRealm',
+                                      identifier='thedude')
+
+
+def test_asr_is_permitted_leaves_instances_uncached(memory_realm, thedude):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    checking instance-level permissions, such as those rendered by
+    requires_dynamic_permission, doesn't fill the permission_cache, whereas the
+    permissions of the fixed vocabulary are cached
+    """
+    permission_cache.clear()
+
+    for doc_id in range(2000):
+        list(memory_realm.is_permitted(thedude, ['document:read:' + str(doc_id)]))
+    assert permission_cache.cache_info().currsize == 0
+
+    results = list(memory_realm.is_permitted(
+        thedude, ['document:read:2', 'document:read:9', 'report:export']))
+    assert results == [('document:read:2', True), ('document:read:9', False),
+                       ('report:export', True)]
+    assert permission_cache.cache_info().currsize == 1
+
+
+def test_asr_decision_cache_leaves_instances_uncached(memory_realm, thedude):
+    """
+    unit tested:  get_cached_decisions
+
+    test case:
+    shared decisions are keyed by canonical permission without caching the
+    instance-level permissions that are parsed to obtain them
+    """
+    memory_realm.decision_cache_ttl = 30
+    permission_cache.clear()
+
+    for _ in range(2):
+        results = list(memory_realm.is_permitted(
+            thedude, ['document:read:3', 'document:read:4', 'document:read:3']))
+        assert results == [('document:read:3', True), ('document:read:4', False),
+                           ('document:read:3', True)]
+
+    assert permission_cache.cache_info().currsize == 0
+
+
+def test_asr_clear_cached_authorization_info_roles_expired(
+        memory_realm, memory_account_store, thedude):
+    """
+    unit tested:  clear_cached_authorization_info
+
+    test case:
+    with authz generations, stamped permissions are cleared even once the
+    roles that stamped them are no longer cached
+    """
+    asr = memory_realm
+    asr.authz_generations = True
+    asr.bump_authz_generation(role='editor')
+
+    assert list(asr.is_permitted(thedude, ['doc:zzz'])) == [('doc:zzz', False)]
+
+    asr.cache_handler.delete('authorization:roles:' + asr.name,
+                             asr.get_authz_cache_identifier(
+                                 'thedude', 'authorization:roles'))
+    memory_account_store.permissions['thedude'].append('doc:zzz')
+    asr.clear_cached_authorization_info('thedude')
+
+    assert list(asr.is_permitted(thedude, ['doc:zzz'])) == [('doc:zzz', True)]
+
+
+def test_asr_permission_index_compiled_during_clear_not_kept(
+        memory_realm, memory_account_store, thedude, monkeypatch):
+    """
+    unit tested:  get_permission_index, forget_permission_index
+
+    test case:
+    an index compiled from authorization info that is cleared while it is
+    being compiled isn't kept, so the next check compiles a fresh one
+    """
+    asr = memory_realm
+    asr.permission_index_ttl = 300
+    create_permission_index = asr.create_permission_index
+
+    def create_then_clear(identifier):
+        index = create_permission_index(identifier)
+        memory_account_store.permissions['thedude'].append('doc:zzz')
+        asr.clear_cached_authorization_info(identifier)
+        return index
+
+    monkeypatch.setattr(asr, 'create_permission_index', create_then_clear)
+    list(asr.is_permitted(thedude, ['report:view']))
+    assert 'thedude' not in asr.permission_indexes
+
+    monkeypatch.setattr(asr, 'create_permission_index', create_permission_index)
+    assert list(asr.is_permitted(thedude, ['doc:zzz'])) == [('doc:zzz', True)]
+    assert 'thedude' in asr.permission_indexes
+
+
+def test_asr_is_permitted_fetches_every_domain_at_once(memory_realm, thedude,
+                                                      monkeypatch):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    the permissions of every distinct domain are obtained in one request
+    """
+    asr = memory_realm
+    get_authzd_domain_permissions = asr.get_authzd_domain_permissions
+    requested = []
+
+    def get_and_record(identifier, perm_domains):
+        requested.append(list(perm_domains))
+        return get_authzd_domain_permissions(identifier, perm_domains)
+
+    monkeypatch.setattr(asr, 'get_authzd_domain_permissions', get_and_record)
+
+    results = list(asr.is_permitted(thedude, ['document:read:1', 'report:view',
+                                              'document:write:1', 'report:export']))
+
+    assert requested == [['document', 'report']]
+    assert results == [('document:read:1', True), ('report:view', True),
+                       ('document:write:1', False), ('report:export', True)]
+
+
+def test_asr_filter_permitted(memory_realm, thedude, monkeypatch):
+    """
+    unit tested:  filter_permitted
+
+    test case:
+    the domain's permissions are obtained once and every target is filtered
+    against them, keeping the order of the targets
+    """
+    asr = memory_realm
+    get_authzd_domain_permissions = asr.get_authzd_domain_permissions
+    requested = []
+
+    def get_and_record(identifier, perm_domains):
+        requested.append(list(perm_domains))
+        return get_authzd_domain_permissions(identifier, perm_domains)
+
+    monkeypatch.setattr(asr, 'get_authzd_domain_permissions', get_and_record)
+
+    result = asr.filter_permitted(thedude, 'document:read', [4, 3, 2, 1, 9])
+
+    assert requested == [['document']] and result == [3, 2, 1]
+
+
+def test_asr_get_authzd_domain_permissions_without_cache(
+        memory_realm, memory_account_store):
+    """
+    unit tested:  get_authzd_domain_permissions
+
+    test case:
+    without a cache_handler, the '*' domain and then every domain requested
+    are obtained from the account_store, None standing for a domain without
+    permissions
+    """
+    asr = memory_realm
+    asr.cache_handler = None
+    memory_account_store.permissions['thedude'].append('*:view')
+    blobs = memory_account_store.permission_blobs('thedude')
+
+    result = asr.get_authzd_domain_permissions('thedude', ['report', 'invoice'])
+
+    assert result == [blobs['*'], blobs['report'], None]
+
+
+def test_asr_minimizes_permissions_before_caching(memory_realm,
+                                                 memory_account_store):
+    """
+    unit tested:  get_authzd_domain_permissions
+
+    test case:
+    permissions obtained from the account_store are minimized before the
+    cache_handler caches them
+    """
+    asr = memory_realm
+    asr.permission_minimizer = PermissionMinimizer()
+    memory_account_store.permissions['thedude'] = ['document:*', 'document:read:5']
+
+    result = asr.get_authzd_domain_permissions('thedude', ['document'])
+
+    assert (result[0] is None and json.loads(result[1]) ==
+            [{'domain': 'document', 'actions': ['*'], 'targets': ['*']}])
+
+
+def test_asr_prepare_permissions_compact(memory_realm, memory_account_store,
+                                        thedude):
+    """
+    unit tested:  prepare_permissions
+
+    test case:
+    with the compact permission_wire_format, permissions are cached as
+    compact blobs that the PermissionIndex reads
+    """
+    asr = memory_realm
+    asr.permission_wire_format = 'compact'
+
+    prepared = asr.prepare_permissions(
+        memory_account_store.permission_blobs('thedude'))
+
+    decoded = asr.permission_codec.decode(prepared['document'])
+    assert (PermissionCodec.is_compact(prepared['document']) and
+            [permission.canonical() for permission in decoded] ==
+            ['document:read:1,2,3'])
+    assert (list(asr.is_permitted(thedude, ['document:read:2', 'document:read:4'])) ==
+            [('document:read:2', True), ('document:read:4', False)])
+
+
+def test_asr_is_permitted_reuses_permission_index(memory_realm, thedude,
+                                                 monkeypatch):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    permissions are compiled once per identifier, until the cached
+    authorization info is cleared
+    """
+    asr = memory_realm
+    asr.permission_index_ttl = 300
+    create_permission_index = asr.create_permission_index
+    compiled = []
+
+    def create_and_record(identifier):
+        compiled.append(identifier)
+        return create_permission_index(identifier)
+
+    monkeypatch.setattr(asr, 'create_permission_index', create_and_record)
+    list(asr.is_permitted(thedude, ['document:read:1']))
+    list(asr.is_permitted(thedude, ['document:read:1', 'report:view']))
+    assert compiled == ['thedude']
+
+    asr.clear_cached_authorization_info('thedude')
+    list(asr.is_permitted(thedude, ['document:read:1']))
+    assert compiled == ['thedude', 'thedude']
+
+
+def test_asr_permission_indexes_bounded(memory_realm):
+    """
+    unit tested:  get_permission_index
+
+    test case:
+    indexes aren't kept without a ttl, and are otherwise kept for the most
+    recently used identifiers only
+    """
+    asr = memory_realm
+
+    asr.get_permission_index('user1', ['document'])
+    assert not asr.permission_indexes
+
+    asr.permission_index_ttl = 300
+    asr.permission_index_maxsize = 2
+    for identifier in ('user1', 'user2', 'user1', 'user3'):
+        asr.get_permission_index(identifier, ['document'])
+    assert list(asr.permission_indexes) == ['user1', 'user3']
+
+
+def test_asr_has_role_with_role_hierarchy(thedude):
+    """
+    unit tested:  has_role, get_permission_index
+
+    test case:
+    a subject is a member of every role implied by its assigned roles and is
+    granted the permissions of those roles
+    """
+    account_store = MemoryRoleHierarchyAccountStore(
+        role_hierarchy={'admin': ['editor'], 'editor': ['viewer']},
+        role_permissions={'viewer': ['document:read']},
+        roles={'thedude': ['editor']})
+    asr = AccountStoreRealm(name='MemoryRealm',
+                            account_store=account_store,
+                            authc_verifiers=())
+    asr.cache_handler = MemoryCacheHandler()
+
+    results = list(asr.has_role(thedude, ['admin', 'editor', 'viewer']))
+
+    assert (results == [('admin', False), ('editor', True), ('viewer', True)] and
+            list(asr.is_permitted(thedude, ['document:read:1'])) ==
+            [('document:read:1', True)])
+
+    asr.remove_role_inheritance('editor', 'viewer')
+    assert (list(asr.is_permitted(thedude, ['document:read:1'])) ==
+            [('document:read:1', False)])
+
+
+def test_asr_role_inheritance_without_store_hierarchy(memory_realm, thedude):
+    """
+    unit tested:  add_role_inheritance, remove_role_inheritance
+
+    test case:
+    when the account_store defines no role hierarchy, inheritance added at
+    runtime creates one, and removing inheritance doesn't raise
+    """
+    asr = memory_realm
+    assert asr.role_hierarchy is None
+
+    asr.remove_role_inheritance('editor', 'viewer')
+    asr.add_role_inheritance('editor', 'viewer')
+    assert dict(asr.has_role(thedude, ['viewer'])) == {'viewer': True}
+
+    asr.remove_role_inheritance('editor', 'viewer')
+    assert dict(asr.has_role(thedude, ['viewer'])) == {'viewer': False}
+
+
+def test_asr_get_authc_info_negatively_cached(memory_realm, memory_account_store):
+    """
+    unit tested:  get_authentication_info
+
+    test case:
+    the absence of credentials is remembered for the domain's ttl, until the
+    cached authc_info is cleared
+    """
+    asr = memory_realm
+    asr.negative_cache_ttl = {'authentication': 30}
+
+    assert asr.get_authentication_info('unknown') is None
+    assert asr.get_authentication_info('unknown') is None
+    assert memory_account_store.queries == 1
+
+    asr.clear_cached_authc_info('unknown')
+    asr.get_authentication_info('unknown')
+    assert memory_account_store.queries == 2
+
+
+def test_asr_authz_info_negatively_cached(memory_realm, memory_account_store):
+    """
+    unit tested:  get_authzd_roles, get_authzd_domain_permissions,
+                  clear_cached_authorization_info
+
+    test case:
+    an identifier without roles or permissions isn't looked up again until
+    its cached authorization info is cleared
+    """
+    asr = memory_realm
+    asr.negative_cache_ttl = {'authorization:roles': 30,
+                              'authorization:permissions': 30}
+    nobody = SimpleIdentifierCollection(source_name='MemoryRealm',
+                                        identifier='nobody')
+
+    for _ in range(2):
+        assert list(asr.is_permitted(nobody, ['report:view'])) == [
+            ('report:view', False)]
+        assert list(asr.has_role(nobody, ['editor'])) == [('editor', False)]
+    assert memory_account_store.queries == 2
+
+    memory_account_store.roles['nobody'] = ['editor']
+    asr.clear_cached_authorization_info('nobody')
+    assert list(asr.has_role(nobody, ['editor'])) == [('editor', True)]
+    assert memory_account_store.queries == 3
+
+
+def test_asr_negative_cache_expires_and_is_bounded(memory_realm):
+    """
+    unit tested:  cache_negative_result, is_negatively_cached
+
+    test case:
+    negative results expire after the domain's ttl, and at most
+    negative_cache_maxsize are kept for a domain
+    """
+    asr = memory_realm
+    asr.negative_cache_ttl = {'authorization:roles': 60}
+    asr.negative_cache_maxsize = 2
+
+    for identifier in ('user1', 'user2', 'user3'):
+        asr.cache_negative_result('authorization:roles', identifier)
+    asr.cache_negative_result('authorization:permissions', 'user3')
+
+    assert not asr.is_negatively_cached('authorization:roles', 'user1')
+    assert asr.is_negatively_cached('authorization:roles', 'user3')
+    assert not asr.is_negatively_cached('authorization:permissions', 'user3')
+
+    with mock.patch('yosai.core.realm.realm.time.time', return_value=time.time() + 61):
+        assert not asr.is_negatively_cached('authorization:roles', 'user3')
+
+
+def test_asr_authz_generations_stamp_cached_info(memory_realm, thedude):
+    """
+    unit tested:  bump_authz_generation, get_authz_cache_identifier,
+                  get_authzd_domain_permissions
+
+    test case:
+    cached authorization info is keyed by the realm generation, and cached
+    permissions hold the stamp of the generations of the identifier's roles
+    """
+    asr = memory_realm
+    asr.authz_generations = True
+    permissions_domain = 'authorization:permissions:' + asr.name
+
+    def stamps():
+        return (asr.get_authz_cache_identifier('thedude', 'authorization:permissions'),
+                asr.get_authz_cache_identifier('thedude', 'authorization:roles'))
+
+    assert stamps() == ('thedude@0', 'thedude@0')
+
+    asr.bump_authz_generation(role='editor')
+    assert stamps() == ('thedude@0', 'thedude@0')
+
+    list(asr.is_permitted(thedude, ['report:view']))
+    cached = asr.cache_handler.store[(permissions_domain, 'thedude@0')]
+    assert cached[asr.ROLES_STAMP_KEY] == asr.get_role_generations_stamp(['editor'])
+
+    asr.bump_authz_generation()
+    assert stamps() == ('thedude@1', 'thedude@1')
+
+
+def test_asr_authz_generations_without_role_generations(
+        memory_realm, memory_account_store, thedude):
+    """
+    unit tested:  get_authz_cache_identifier, get_authzd_domain_permissions
+
+    test case:
+    until a role's generation is bumped, permission checks don't obtain the
+    identifier's roles
+    """
+    asr = memory_realm
+    asr.authz_generations = True
+    asr.bump_authz_generation()
+
+    for _ in range(2):
+        assert list(asr.is_permitted(thedude, ['report:view'])) == [
+            ('report:view', True)]
+
+    assert memory_account_store.queries == 1
+    assert asr.cache_handler.keys('authorization:roles:' + asr.name) == set()
+
+
+def test_asr_authz_generations_make_cached_info_stale(
+        memory_realm, memory_account_store, thedude):
+    """
+    unit tested:  bump_authz_generation, is_permitted
+
+    test case:
+    a permission granted to a role is observed once the role's generation is
+    bumped, without clearing the cached authorization info of its members
+    """
+    asr = memory_realm
+    asr.authz_generations = True
+    asr.bump_authz_generation(role='viewer')
+
+    assert list(asr.is_permitted(thedude, ['doc:zzz'])) == [('doc:zzz', False)]
+
+    memory_account_store.permissions['thedude'].append('doc:zzz')
+    asr.bump_authz_generation(role='viewer')
+    assert list(asr.is_permitted(thedude, ['doc:zzz'])) == [('doc:zzz', False)]
+
+    asr.bump_authz_generation(role='editor')
+    assert list(asr.is_permitted(thedude, ['doc:zzz'])) == [('doc:zzz', True)]
+
+
+def test_asr_clear_cached_authorization_info_stamped(
+        memory_realm, memory_account_store, thedude):
+    """
+    unit tested:  clear_cached_authorization_info
+
+    test case:
+    with authz generations, stamped permissions are cleared without
+    obtaining the identifier's roles, from the cache or the account_store
+    """
+    asr = memory_realm
+    asr.authz_generations = True
+    asr.bump_authz_generation()
+    asr.bump_authz_generation(role='editor')
+
+    list(asr.is_permitted(thedude, ['doc:zzz']))
+    permissions_domain = 'authorization:permissions:' + asr.name
+    assert asr.cache_handler.keys(permissions_domain) == {'thedude@1'}
+
+    asr.cache_handler.delete('authorization:roles:' + asr.name, 'thedude@1')
+    queries = memory_account_store.queries
+    asr.clear_cached_authorization_info('thedude')
+
+    assert memory_account_store.queries == queries
+    assert asr.cache_handler.keys(permissions_domain) == set()
+
+
+# -----------------------------------------------------------------------------
+# Combined Authorization Cache Tests
+# -----------------------------------------------------------------------------
+
+def test_asr_warm_authz_cache_single_query(combined_cache_realm, thedude):
+    """
+    unit tested:  warm_authz_cache
+
+    test case:
+    an AuthorizationInfoAccountStore is queried once for both roles and
+    permissions, which populate the cache and the PermissionIndex
+    """
+    asr = combined_cache_realm
+    asr.combined_authz_cache = False
+    asr.permission_index_ttl = 300
+
+    asr.warm_authz_cache('thedude')
+
+    assert asr.account_store.queries == 1
+    assert asr.cache_handler.keys('authorization:roles:' + asr.name) == {'thedude'}
+    assert (asr.cache_handler.keys('authorization:permissions:' + asr.name) ==
+            {'thedude'})
+    index = asr.permission_indexes['thedude']
+    assert index.implies(Permission(wildcard_perm='document:read:2'))
+
+    assert list(asr.is_permitted(thedude, ['report:view'])) == [('report:view', True)]
+    assert list(asr.has_role(thedude, ['editor'])) == [('editor', True)]
+    assert asr.account_store.queries == 1
+
+
+def test_asr_warm_authz_cache_without_index(combined_cache_realm, thedude,
+                                            monkeypatch):
+    """
+    unit tested:  warm_authz_cache
+
+    test case:
+    unless compiled indexes are kept, warming up caches the authorization
+    info without compiling a PermissionIndex that would be thrown away
+    """
+    asr = combined_cache_realm
+    asr.combined_authz_cache = False
+    monkeypatch.setattr(asr, 'create_permission_index', None)  # not called
+
+    asr.warm_authz_cache('thedude')
+
+    assert (asr.cache_handler.keys('authorization:permissions:' + asr.name) ==
+            {'thedude'})
+    assert not asr.permission_indexes
+
+
+def test_asr_combined_authz_cache(combined_cache_realm, thedude):
+    """
+    unit tested:  get_authz_info, get_authzd_roles,
+                  get_authzd_domain_permissions, clear_cached_authorization_info
+
+    test case:
+    roles and permissions are cached as one record, obtained with a single
+    account_store query and cleared as one
+    """
+    asr = combined_cache_realm
+    ch = asr.cache_handler
+
+    assert asr.get_authzd_roles('thedude') == {'editor'}
+    assert list(asr.is_permitted(thedude, ['report:view', 'document:read:4'])) == [
+        ('report:view', True), ('document:read:4', False)]
+    assert asr.account_store.queries == 1
+    assert ch.keys('authorization:info:' + asr.name) == {'thedude'}
+    assert ch.keys('authorization:roles:' + asr.name) == set()
+    assert ch.keys('authorization:permissions:' + asr.name) == set()
+
+    asr.clear_cached_authorization_info('thedude')
+    assert ch.keys('authorization:info:' + asr.name) == set()
+
+    asr.get_authzd_roles('thedude')
+    assert asr.account_store.queries == 2
+
+
+def test_asr_combined_authz_cache_role_generations(combined_cache_realm):
+    """
+    unit tested:  get_authz_info
+
+    test case:
+    a record obtained before a generation of one of its roles was bumped is
+    replaced, whereas bumping another role's generation doesn't replace it
+    """
+    asr = combined_cache_realm
+    asr.authz_generations = True
+
+    asr.get_authz_info('thedude')
+    asr.bump_authz_generation(role='viewer')
+    asr.get_authz_info('thedude')
+    assert asr.account_store.queries == 1
+
+    asr.account_store.roles['thedude'].append('viewer')
+    asr.bump_authz_generation(role='editor')
+    assert asr.get_authz_info('thedude')['roles'] == ['editor', 'viewer']
+    assert asr.account_store.queries == 2
+
+
+# -----------------------------------------------------------------------------
+# Decision Cache Tests
+# -----------------------------------------------------------------------------
+
+def test_asr_decision_cache(memory_realm, thedude, monkeypatch):
+    """
+    unit tested:  is_permitted, get_cached_decisions,
+                  clear_cached_authorization_info
+
+    test case:
+    only those permissions whose decisions aren't cached, or have expired, are
+    evaluated, and the decisions are shared by way of the cache_handler
+    """
+    asr = memory_realm
+    asr.decision_cache_ttl = 30
+    evaluate_permissions = asr.evaluate_permissions
+    evaluated = []
+
+    def evaluate_and_record(identifier, permission_s):
+        evaluated.extend(permission_s)
+        return evaluate_permissions(identifier, permission_s)
+
+    monkeypatch.setattr(asr, 'evaluate_permissions', evaluate_and_record)
+    key = ('authorization:decisions:' + asr.name, 'thedude')
+
+    results = list(asr.is_permitted(thedude, ['report:view', 'dashboard:edit']))
+    assert results == [('report:view', True), ('dashboard:edit', False)]
+
+    asr.cache_handler.store[key]['decisions']['dashboard:edit:*'][1] = time.time() - 1
+    results = list(asr.is_permitted(thedude, ['dashboard:edit', 'report:view']))
+    assert results == [('dashboard:edit', False), ('report:view', True)]
+    assert evaluated == ['report:view', 'dashboard:edit', 'dashboard:edit']
+
+    asr.clear_cached_authorization_info('thedude')
+    assert key not in asr.cache_handler.store
+
+
+def test_asr_decision_cache_bounded(memory_realm, thedude):
+    """
+    unit tested:  get_cached_decisions
+
+    test case:
+    at most decision_cache_maxsize decisions are shared for an identifier,
+    and none are shared that were evaluated with a previously compiled index
+    """
+    asr = memory_realm
+    asr.decision_cache_ttl = 30
+    asr.decision_cache_maxsize = 2
+    key = ('authorization:decisions:' + asr.name, 'thedude')
+
+    for target in range(3):
+        list(asr.is_permitted(thedude, ['document:read:' + str(target)]))
+    assert len(asr.cache_handler.store[key]['decisions']) == 2
+
+    asr.decision_cache_maxsize = 10
+    asr.permission_index_ttl = 300
+    list(asr.is_permitted(thedude, ['document:read:8']))  # compiles the index
+    list(asr.is_permitted(thedude, ['document:read:9']))
+    decisions = asr.cache_handler.store[key]['decisions']
+    assert 'document:read:8' in decisions and 'document:read:9' not in decisions
+
+
+# -----------------------------------------------------------------------------
+# Permission Verifier Tests
+# -----------------------------------------------------------------------------
+
+class AuditedVerifier(DefaultPermissionVerifier):
+    """
+    A custom verifier that never grants a check of document 2.
+    """
+
+    def is_permitted_from_json(self, required, assigned):
+        if required.endswith(':2'):
+            return False
+        return super().is_permitted_from_json(required, assigned)
+
+
+def test_asr_custom_permission_verifier_consulted(memory_realm, thedude):
+    """
+    unit tested:  is_permitted, filter_permitted, permitted_targets,
+                  permitted_actions
+
+    test case:
+    a permission_verifier other than the DefaultPermissionVerifier evaluates
+    permissions in place of the PermissionIndex
+    """
+    asr = memory_realm
+    asr.permission_verifier = AuditedVerifier()
+
+    results = list(asr.is_permitted(thedude, ['document:read:1', 'document:read:2',
+                                              'report:export']))
+    assert results == [('document:read:1', True), ('document:read:2', False),
+                       ('report:export', True)]
+    assert asr.filter_permitted(thedude, 'document:read', [1, 2, 3, 4]) == [1, 3]
+    assert asr.permitted_targets(thedude, 'document:read') == (
+        False, frozenset(['1', '3']))
+    assert asr.permitted_actions(thedude, 'report', target=2) == frozenset()
+    assert asr.permitted_actions(thedude, 'report', target=1) == frozenset(['*'])
@@ -0,0 +1,106 @@
+import pytest
+from unittest import mock
+
+from yosai.core import (
+    DelegatingSubject,
+    SimpleIdentifierCollection,
+    UnauthorizedException,
+)
+
+from ..doubles import (
+    MockSecurityManager,
+)
+
+# ------------------------------------------------------------------------------
+# DelegatingSubject Authorization Tests, using a security manager double
+# ------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def authenticated_subject():
+    return DelegatingSubject(
+        identifiers=SimpleIdentifierCollection(source_name='realm1',
+                                               identifier='thedude'),
+        authenticated=True,
+        host='127.0.0.1',
+        session_creation_enabled=False,
+        security_manager=MockSecurityManager())
+
+
+@pytest.fixture(scope='function')
+def memoizing_subject(authenticated_subject):
+    ds = authenticated_subject
+    ds.decision_memo = {}
+    return ds
+
+
+def test_ds_decision_memo_answers_repeat_checks(memoizing_subject, monkeypatch):
+    """
+    unit tested:  check_permission
+
+    test case:
+    a check repeated while the decision memo is enabled does not consult the
+    security_manager again
+    """
+    ds = memoizing_subject
+    mock_ipc = mock.MagicMock(return_value=True)
+    monkeypatch.setattr(ds.security_manager, 'is_permitted_collective', mock_ipc)
+
+    ds.check_permission(['domain1:action1', 'domain2:action1'], any)
+    ds.check_permission(['domain1:action1', 'domain2:action1'], any)
+
+    assert mock_ipc.call_count == 1
+
+
+def test_ds_decision_memo_reuses_individual_results(memoizing_subject, monkeypatch):
+    """
+    unit tested:  is_permitted, has_role_collective
+
+    test case:
+    results memoized individually answer later checks, and only items that
+    aren't memoized are checked
+    """
+    ds = memoizing_subject
+    mock_ip = mock.MagicMock(return_value={('domain1:action1', True),
+                                           ('domain2:action1', False)})
+    monkeypatch.setattr(ds.security_manager, 'is_permitted', mock_ip)
+
+    ds.is_permitted(['domain1:action1', 'domain2:action1'])
+    results = ds.is_permitted(['domain1:action1'])
+
+    assert (results == {('domain1:action1', True)} and
+            ds.is_permitted_collective(['domain1:action1', 'domain2:action1'], any) and
+            mock_ip.call_count == 1)
+
+    with pytest.raises(UnauthorizedException):
+        ds.check_permission(['domain1:action1', 'domain2:action1'], all)
+
+
+def test_ds_decision_memo_cleared_when_identity_changes(memoizing_subject,
+                                                        monkeypatch):
+    ds = memoizing_subject
+    monkeypatch.setattr(ds.security_manager, 'has_role_collective',
+                        lambda x, y, z: True)
+    ds.has_role_collective(['role1'], all)
+    assert ds.decision_memo
+
+    ds.identifiers = SimpleIdentifierCollection(source_name='realm1',
+                                                identifier='walter')
+    assert not ds.decision_memo
+
+
+def test_ds_permitted_actions(authenticated_subject, monkeypatch):
+    """
+    unit tested:  permitted_actions
+
+    test case:
+    the identifiers, domain and target are passed on to the security manager
+    """
+    ds = authenticated_subject
+    mock_sm = mock.MagicMock()
+    mock_sm.permitted_actions.return_value = frozenset(['create'])
+    monkeypatch.setattr(ds, 'security_manager', mock_sm)
+
+    assert ds.permitted_actions('invoice', target=5) == {'create'}
+    mock_sm.permitted_actions.assert_called_once_with(ds.identifiers,
+                                                      'invoice', 5)
@@ -136,7 +136,8 @@ def test_wsm_do_create_subject(mock_ds, web_security_manager, monkeypatch):
                                     session='session',
                                     session_creation_enabled='session_creation_enabled',
                                     security_manager='security_manager',
-                                    web_registry=mock_sc.web_registry)
+                                    web_registry=mock_sc.web_registry,
+                                    decision_memo_enabled=False)
 
 
 # ------------------------------------------------------------------------
@@ -385,6 +385,19 @@ def test_requires_permission_raises_two(monkeypatch):
         do_this()
 
 
+@pytest.mark.parametrize('permission_s',
+                         [['something:anything:target:other'],
+                          ['something:anything,,else'],
+                          ['']])
+def test_requires_permission_raises_when_decorating(permission_s):
+    """
+    A malformed permission raises when the decorator is applied rather than
+    when the decorated function is called.
+    """
+    with pytest.raises(ValueError):
+        WebYosai.requires_permission(permission_s)
+
+
 def test_requires_dynamic_permission_succeeds(monkeypatch):
     """
     This test verifies that the decorator works as expected.
@@ -31,8 +31,10 @@ from .exceptions import (
     AccountException,
     AdditionalAuthenticationRequired,
     AuthenticationException,
+    AuthenticationOverloadedException,
     AuthorizationException,
     ConsumedTOTPToken,
+    ExcessiveAttemptsException,
     ExpiredSessionException,
     IdleExpiredSessionException,
     IncorrectCredentialsException,
@@ -98,6 +100,11 @@ from yosai.core.authc.authc_settings import (
 )
 
 
+from yosai.core.authz.authz_settings import (
+    AuthorizationSettings,
+)
+
+
 from yosai.core.logging.slogging import (
     load_logconfig,
 )
@@ -109,6 +116,7 @@ from yosai.core.account.account import (
 
 
 from yosai.core.concurrency.concurrency import (
+    ConcurrencyLimiter,
     StoppableScheduledExecutor,
 )
 
@@ -137,6 +145,20 @@ from yosai.core.serialize.serialize import (
 
 thread_local = threading.local()  # use only one global instance
 
+from yosai.core.authz.authz import (
+    DefaultPermissionVerifier,
+    ModularRealmAuthorizer,
+    Permission,
+    PermissionCache,
+    PermissionCodec,
+    PermissionIndex,
+    PermissionMinimizer,
+    RoleHierarchy,
+    TargetPredicate,
+    permission_cache,
+    permission_codec,
+)
+
 from yosai.core.subject.subject import(
     Yosai,
     SubjectContext,
@@ -154,6 +176,10 @@ from yosai.core.authc.strategy import (
     first_realm_successful_strategy,
 )
 
+from yosai.core.authc.throttle import (
+    LoginThrottle,
+)
+
 from yosai.core.authc.authc import (
     DefaultAuthenticator,
     TOTPToken,
@@ -166,10 +192,8 @@ from yosai.core.authc.credential import (
     create_totp_factory,
 )
 
-from yosai.core.authz.authz import (
-    DefaultPermissionVerifier,
-    ModularRealmAuthorizer,
-    Permission,
+from yosai.core.authc.calibration import (
+    calibrate_hash_cost,
 )
 
 
@@ -65,3 +65,36 @@ class AuthorizationAccountStore(AccountStore):
     @abstractmethod
     def get_authz_roles(self, identifiers):
         pass
+
+
+class AuthorizationInfoAccountStore(AuthorizationAccountStore):
+
+    @abstractmethod
+    def get_authz_info(self, identifier):
+        """
+        Obtains both the roles and the permissions of an identifier, at once.
+
+        :returns: a dict, {'roles': as get_authz_roles returns,
+                           'permissions': as get_authz_permissions returns}
+        """
+        pass
+
+
+class RoleHierarchyAccountStore(AccountStore):
+
+    @abstractmethod
+    def get_role_hierarchy(self):
+        """
+        :returns: a dict mapping each role to the roles that it directly
+                  implies (inherits), such as {'admin': ['editor'],
+                  'editor': ['viewer']}
+        """
+        pass
+
+    @abstractmethod
+    def get_role_permissions(self):
+        """
+        :returns: a dict mapping a role to the wildcard permission strings
+                  assigned directly to the role, or None
+        """
+        pass
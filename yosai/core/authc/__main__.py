@@ -0,0 +1,3 @@
+from yosai.core.authc.calibration import main
+
+main()
@@ -16,8 +16,9 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import logging
+import threading
 from passlib.context import CryptContext
 from passlib.totp import TokenError, TOTP
 
@@ -25,12 +26,16 @@ from yosai.core import (
     EVENT_TOPIC,
     AccountException,
     AdditionalAuthenticationRequired,
+    AuthenticationOverloadedException,
     AuthenticationSettings,
     AuthenticationAttempt,
+    ExcessiveAttemptsException,
     first_realm_successful_strategy,
     IncorrectCredentialsException,
     InvalidAuthenticationSequenceException,
     LockedAccountException,
+    LoginThrottle,
+    MultiRealmAuthenticationException,
     authc_abcs,
     realm_abcs,
 )
@@ -118,6 +123,17 @@ token_info = {UsernamePasswordToken: {'tier': 1, 'cred_type': 'password'},
 
 
 class DefaultAuthenticator(authc_abcs.Authenticator):
+    """
+    Realms are resolved by the type of the authentication token and, with the
+    first_realm_successful_strategy, by identity:  an identifier that a realm
+    authenticated is routed to that realm first.  Should that realm fail to
+    authenticate it, the route is forgotten and the other realms are
+    consulted, as the strategy would consult them.  The identity_routes are
+    limited to identity_routes_maxsize identifiers, the least recently used
+    of which are forgotten.
+    """
+
+    identity_routes_maxsize = 10000
 
     # Unlike Shiro, Yosai injects the strategy and the eventbus
     def __init__(self,
@@ -135,9 +151,27 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
 
         self.realms = None
         self.token_realm_resolver = None
+        self.identity_routes = OrderedDict()  # identifier -> realm name
+        self.identity_routes_lock = threading.Lock()
         self.locking_realm = None
         self.locking_limit = None
         self.event_bus = None
+        self.login_throttle = self.init_login_throttle()
+
+    def init_login_throttle(self):
+        if not self.authc_settings.login_throttle_enabled:
+            return None
+        return LoginThrottle(self.authc_settings.login_throttle_rules,
+                             self.authc_settings.login_throttle_maxsize)
+
+    def apply_cache_handler(self, cache_handler):
+        """
+        Shares the login throttle's buckets through the cache handler, when
+        so configured.
+        """
+        if (self.login_throttle is not None and
+                self.authc_settings.login_throttle_cache_backed):
+            self.login_throttle.cache_handler = cache_handler
 
     def init_realms(self, realms):
         """
@@ -163,6 +197,52 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
                     token_resolver[token_class].append(realm)
         return token_resolver
 
+    def route_realms(self, authc_token):
+        """
+        Obtains the realms that support the token and, with the
+        first_realm_successful_strategy, the realm among them that last
+        authenticated the token's identifier, if any.
+
+        :returns: a tuple of realms and whether they were routed by identity
+        :rtype: tuple
+        """
+        try:
+            realms = self.token_realm_resolver[authc_token.__class__]
+        except KeyError:
+            raise KeyError('Unsupported Token Type Provided: ', authc_token.__class__.__name__)
+
+        if (len(realms) > 1 and
+                self.authentication_strategy is first_realm_successful_strategy):
+            with self.identity_routes_lock:
+                realm_name = self.identity_routes.get(authc_token.identifier)
+                if realm_name is not None:
+                    self.identity_routes.move_to_end(authc_token.identifier)
+            if realm_name is not None:
+                for realm in realms:
+                    if getattr(realm, 'name', None) == realm_name:
+                        return (realm,), True
+
+        return tuple(realms), False
+
+    def record_identity_route(self, identifier, account):
+        """
+        Routes the identifier to the realm that authenticated its account.
+        """
+        try:
+            realm_name = account['account_id'].source_names[0]
+        except (KeyError, IndexError, AttributeError, TypeError):
+            return
+
+        with self.identity_routes_lock:
+            self.identity_routes[identifier] = realm_name
+            self.identity_routes.move_to_end(identifier)
+            while len(self.identity_routes) > self.identity_routes_maxsize:
+                self.identity_routes.popitem(last=False)
+
+    def forget_identity_route(self, identifier):
+        with self.identity_routes_lock:
+            self.identity_routes.pop(identifier, None)
+
     def locate_locking_realm(self):
         """
         the first realm that is identified as a LockingRealm will be used to
@@ -180,6 +260,43 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         attempt = AuthenticationAttempt(authc_token, realms)
         return self.authentication_strategy(attempt)
 
+    def authenticate_routed_account(self, realm, authc_token):
+        """
+        Authenticates the token with the realm that its identifier is routed
+        to.  Should the realm fail to authenticate it, the route is forgotten
+        and the other realms that support the token are consulted, in turn,
+        for the identity may be owned by several of them.  Realms without the
+        account aren't counted as failures when the routed realm has it, so
+        that its failure, such as incorrect credentials, is raised as is.
+
+        :returns:  Account
+        """
+        try:
+            return self.authenticate_single_realm_account(realm, authc_token)
+        except AuthenticationOverloadedException:
+            raise
+        except Exception as exc:
+            self.forget_identity_route(authc_token.identifier)
+            realm_errors = [exc]
+
+        owned = not isinstance(realm_errors[0], AccountException)
+        for other in self.token_realm_resolver[authc_token.__class__]:
+            if other is realm:
+                continue
+            try:
+                return self.authenticate_single_realm_account(other, authc_token)
+            except AuthenticationOverloadedException:
+                raise
+            except AccountException as ex:
+                if not owned:
+                    realm_errors.append(ex)
+            except Exception as ex:
+                realm_errors.append(ex)
+
+        if len(realm_errors) == 1:
+            raise realm_errors[0]
+        raise MultiRealmAuthenticationException(realm_errors)
+
     def authenticate_account(self, identifiers, authc_token, second_factor_token=None):
         """
         :type identifiers: SimpleIdentifierCollection or None
@@ -201,6 +318,15 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         # add token metadata before sending it onward:
         authc_token.token_info = token_info[authc_token.__class__]
 
+        if self.login_throttle is not None:
+            try:
+                self.login_throttle.attempt(authc_token.identifier,
+                                            getattr(authc_token, 'host', None))
+            except ExcessiveAttemptsException:
+                self.notify_event(authc_token.identifier,
+                                  'AUTHENTICATION.THROTTLED')
+                raise
+
         try:
             account = self.do_authenticate_account(authc_token)
             if (account is None):
@@ -211,6 +337,7 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
                 raise AccountException(msg2)
 
         except AdditionalAuthenticationRequired as exc:
+            self.refund_login_throttle(authc_token)
             if second_factor_token:
                 return self.authenticate_account(exc.account_id, second_factor_token, None)
 
@@ -233,11 +360,20 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
             # this won't be called if the Account is locked:
             raise IncorrectCredentialsException
 
+        self.refund_login_throttle(authc_token)
         self.notify_event(account['account_id'].primary_identifier,
                           'AUTHENTICATION.SUCCEEDED')
 
         return account['account_id']
 
+    def refund_login_throttle(self, authc_token):
+        """
+        A login that succeeds isn't charged by the throttle
+        """
+        if self.login_throttle is not None:
+            self.login_throttle.refund(authc_token.identifier,
+                                       getattr(authc_token, 'host', None))
+
     def do_authenticate_account(self, authc_token):
         """
         Returns an account object only when the current token authenticates AND
@@ -247,15 +383,18 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         :raises AdditionalAuthenticationRequired: when additional tokens are required,
                                                   passing the account object
         """
-        try:
-            realms = self.token_realm_resolver[authc_token.__class__]
-        except KeyError:
-            raise KeyError('Unsupported Token Type Provided: ', authc_token.__class__.__name__)
+        realms, routed = self.route_realms(authc_token)
 
-        if (len(self.realms) == 1):
-            account = self.authenticate_single_realm_account(realms[0], authc_token)
+        if routed:
+            account = self.authenticate_routed_account(realms[0], authc_token)
+        elif (len(realms) == 1):
+            account = self.authenticate_single_realm_account(realms[0],
+                                                             authc_token)
         else:
-            account = self.authenticate_multi_realm_account(self.realms, authc_token)
+            account = self.authenticate_multi_realm_account(realms, authc_token)
+
+        if account is not None:
+            self.record_identity_route(authc_token.identifier, account)
 
         cred_type = authc_token.token_info['cred_type']
         attempts = account['authc_info'][cred_type].get('failed_attempts', [])
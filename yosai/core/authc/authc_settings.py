@@ -17,6 +17,28 @@ class AuthenticationSettings:
 
         self.account_lock_threshold = self.authc_config.get('account_lock_threshold')
 
+        # verifying a password hash may be sent to a pool of worker processes:
+        hash_offload = self.authc_config.get('hash_offload') or {}
+        self.hash_offload_enabled = hash_offload.get('enabled', False)
+        self.hash_offload_max_workers = hash_offload.get('max_workers')
+
+        # admission control of credential verification, disabled when
+        # max_concurrent is null:
+        admission = self.authc_config.get('admission') or {}
+        self.admission_max_concurrent = admission.get('max_concurrent')
+        self.admission_max_queued = admission.get('max_queued', 0)
+        self.admission_queue_timeout = admission.get('queue_timeout')
+
+        # rate limiting of login attempts, by identifier and by host:
+        throttle = self.authc_config.get('login_throttle') or {}
+        self.login_throttle_enabled = throttle.get('enabled', False)
+        self.login_throttle_rules = {
+            kind: (rule['capacity'], rule['refill_per_second'])
+            for kind, rule in throttle.items()
+            if kind in ('identifier', 'host') and rule}
+        self.login_throttle_maxsize = throttle.get('maxsize', 100000)
+        self.login_throttle_cache_backed = throttle.get('cache_backed', False)
+
         totp_settings = self.authc_config.get('totp')
         # context contains:  secrets, digits, alg, period, label, issuer
         self.totp_context = totp_settings.get('context')
@@ -0,0 +1,209 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+
+import argparse
+import math
+import time
+from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+
+from yosai.core import (
+    AuthenticationSettings,
+    LazySettings,
+)
+
+CALIBRATION_PASSWORD = 'calibration-password'
+
+
+def calibrate_hash_cost(authc_settings, target_seconds=0.1,
+                        min_logins_per_core=None, samples=3, attempts=5):
+    """
+    Benchmarks the preferred_algorithm, as configured, on the current host
+    and finds the cost at which a verification takes about target_seconds
+    of one core, or less when min_logins_per_core requires it.
+
+    The cost tuned is argon2's memory_cost, else the algorithm's
+    default_rounds, kept within the configured min_rounds and max_rounds.
+    An algorithm without either cannot be calibrated.
+
+    :type authc_settings: AuthenticationSettings
+
+    :param target_seconds: the desired duration of a verification
+    :param min_logins_per_core: the fewest verifications per second that a
+                                core must sustain, or None
+    :param samples: the number of verifications timed, of which the fastest
+                    counts, for each cost considered
+    :param attempts: the number of costs considered
+
+    :returns: {'algorithm', 'setting', 'cost', 'verify_seconds',
+               'logins_per_second_per_core', 'within_target',
+               'hash_algorithms'}, of which 'hash_algorithms' is the
+              AUTHC_CONFIG entry to configure:  the configured context with
+              the cost setting replaced.  A verification that exceeds the
+              target at the lowest cost allowed isn't within_target.
+    :rtype: dict
+
+    :raises ValueError: when the algorithm doesn't have a configurable cost
+    """
+    algorithm = authc_settings.preferred_algorithm
+    handler = get_crypt_handler(algorithm)
+    setting = get_cost_setting(handler)
+
+    if min_logins_per_core:
+        target_seconds = min(target_seconds, 1.0 / min_logins_per_core)
+
+    prefix = algorithm + '__'
+    context = {key[len(prefix):]: value for key, value in
+               authc_settings.preferred_algorithm_context.items()}
+    bounds = get_cost_bounds(handler, setting, context)
+    cost = clamp_cost(context.get(setting, getattr(handler, setting)), bounds)
+
+    measured = {}  # cost -> seconds
+    for _ in range(attempts):
+        if cost in measured:
+            break
+        measured[cost] = measure_verify_seconds(algorithm, context, setting,
+                                                cost, samples)
+        cost = estimate_cost(handler, setting, cost, measured[cost],
+                             target_seconds, bounds)
+
+    # the highest cost measured within the target, else the lowest:
+    within = [c for c, seconds in measured.items() if seconds <= target_seconds]
+    cost = max(within) if within else min(measured)
+    seconds = measured[cost]
+
+    settings = dict(context)
+    settings[setting] = cost
+
+    return {'algorithm': algorithm,
+            'setting': setting,
+            'cost': cost,
+            'verify_seconds': seconds,
+            'logins_per_second_per_core': 1.0 / seconds,
+            'within_target': seconds <= target_seconds,
+            'hash_algorithms': {algorithm: settings}}
+
+
+def get_cost_setting(handler):
+    """
+    :returns: the name of the setting that calibration tunes for the handler
+    :raises ValueError: when the handler doesn't have a configurable cost
+    """
+    if 'memory_cost' in handler.setting_kwds:
+        return 'memory_cost'
+    if 'rounds' in handler.setting_kwds:
+        return 'default_rounds'
+    msg = ("{0} does not have a configurable cost, so it cannot be "
+           "calibrated".format(handler.name))
+    raise ValueError(msg)
+
+
+def get_cost_bounds(handler, setting, context):
+    """
+    :returns: the (lowest, highest) cost allowed, of which highest may be None
+    """
+    if setting == 'memory_cost':
+        parallelism = context.get('parallelism', handler.parallelism)
+        return (handler.min_memory_cost * parallelism, None)
+
+    lowest = context.get('min_rounds', getattr(handler, 'min_rounds', None))
+    highest = context.get('max_rounds', getattr(handler, 'max_rounds', None))
+    return (lowest or 1, highest)
+
+
+def clamp_cost(cost, bounds):
+    lowest, highest = bounds
+    if highest is not None:
+        cost = min(highest, cost)
+    return max(lowest, cost)
+
+
+def measure_verify_seconds(algorithm, context, setting, cost, samples):
+    """
+    :returns: the fewest seconds that a verification took, of those timed
+    """
+    settings = {algorithm + '__' + key: value for key, value in context.items()}
+    settings[algorithm + '__' + setting] = cost
+    crypt_context = CryptContext(schemes=[algorithm], **settings)
+    stored = crypt_context.hash(CALIBRATION_PASSWORD)
+
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        crypt_context.verify(CALIBRATION_PASSWORD, stored)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def estimate_cost(handler, setting, cost, seconds, target_seconds, bounds):
+    """
+    Extrapolates the cost at which a verification takes target_seconds,
+    given that it took seconds at cost, according to how the handler's
+    cost grows with the setting.  Memory grows linearly.
+    """
+    ratio = target_seconds / max(seconds, 1e-9)
+    if (setting == 'default_rounds' and
+            getattr(handler, 'rounds_cost', 'linear') == 'log2'):
+        estimate = cost + int(math.floor(math.log(ratio, 2)))
+    else:
+        estimate = int(cost * ratio)
+
+    return clamp_cost(estimate, bounds)
+
+
+def main(argv=None):
+    """
+    python -m yosai.core.authc --target-ms 100
+    """
+    parser = argparse.ArgumentParser(
+        description="Calibrates the cost of the preferred_algorithm to a "
+                    "verification latency on this host.")
+    parser.add_argument('--env-var', default='YOSAI_SETTINGS',
+                        help='the environment variable of the settings file')
+    parser.add_argument('--file-path', default=None,
+                        help='the settings file, instead of --env-var')
+    parser.add_argument('--target-ms', type=float, default=100,
+                        help='the desired milliseconds of a verification')
+    parser.add_argument('--min-logins-per-core', type=float, default=None,
+                        help='the fewest verifications per second per core')
+    args = parser.parse_args(argv)
+
+    if args.file_path:
+        settings = LazySettings(file_path=args.file_path)
+    else:
+        settings = LazySettings(env_var=args.env_var)
+    result = calibrate_hash_cost(AuthenticationSettings(settings),
+                                 target_seconds=args.target_ms / 1000.0,
+                                 min_logins_per_core=args.min_logins_per_core)
+
+    print("{0} at {1}={2}:  {3:.1f} ms per verification, {4:.1f} logins "
+          "per second per core".format(result['algorithm'], result['setting'],
+                                       result['cost'],
+                                       result['verify_seconds'] * 1000,
+                                       result['logins_per_second_per_core']))
+    if not result['within_target']:
+        print("The target is exceeded at the lowest {0} allowed:  lower the "
+              "algorithm's other costs or the configured minimum."
+              .format(result['setting']))
+    print("AUTHC_CONFIG:")
+    print("    hash_algorithms:")
+    for algorithm, values in result['hash_algorithms'].items():
+        print("        {0}:".format(algorithm))
+        for key, value in sorted(values.items()):
+            print("            {0}: {1}".format(key, value))
@@ -17,12 +17,20 @@ specific language governing permissions and limitations
 under the License.
 """
 
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import functools
 import logging
+import os
+import threading
 from passlib.context import CryptContext
 from passlib.totp import TokenError, TOTP
 
 from yosai.core import (
+    AuthenticationOverloadedException,
     AuthenticationSettings,
+    ConcurrencyLimiter,
     ConsumedTOTPToken,
     IncorrectCredentialsException,
     LazySettings,
@@ -38,21 +46,34 @@ class PasslibVerifier(authc_abcs.CredentialsVerifier):
 
     def __init__(self, settings):
         authc_settings = AuthenticationSettings(settings)
+        self.password_context = self.get_password_context(authc_settings)
         self.password_cc = self.create_password_crypt_context(authc_settings)
         self.totp_factory = create_totp_factory(authc_settings=authc_settings)
         self.supported_tokens = [UsernamePasswordToken, TOTPToken]
 
+        # when enabled, password hashes are verified by a pool of worker
+        # processes rather than on the thread that requests authentication:
+        self.hash_offload_enabled = authc_settings.hash_offload_enabled
+        self.hash_offload_max_workers = authc_settings.hash_offload_max_workers
+        self.hash_executor = None
+        self.hash_executor_pid = None
+        self.hash_executor_lock = threading.Lock()
+
+        # bounds the number of password verifications in progress and queued:
+        self.admission_limiter = self.create_admission_limiter(authc_settings)
+
     def verify_credentials(self, authc_token, authc_info):
         submitted = authc_token.credentials
         stored = self.get_stored_credentials(authc_token, authc_info)
 
         if isinstance(authc_token, UsernamePasswordToken):
-            try:
-                result = self.password_cc.verify(submitted, stored)
-                if not result:
-                    raise IncorrectCredentialsException
-            except ValueError:
-                raise IncorrectCredentialsException
+            with self.admission():
+                if self.hash_offload_enabled:
+                    self.get_hash_executor().submit(
+                        verify_password_offloaded, self.password_context,
+                        submitted, stored).result()
+                else:
+                    verify_password(self.password_cc, submitted, stored)
             return
 
         try:
@@ -69,6 +90,118 @@ class PasslibVerifier(authc_abcs.CredentialsVerifier):
         except (ValueError, TokenError):
             raise IncorrectCredentialsException
 
+    def verify_credentials_async(self, authc_token, authc_info, loop=None):
+        """
+        The asyncio entry point of verify_credentials:  returns a future that
+        an event loop awaits, which resolves or raises as verify_credentials
+        would.  Password hashes are verified by the worker processes when
+        offloading is enabled, otherwise by the loop's default executor, so
+        that the event loop is never blocked by hashing.
+
+        Admission is never waited for, as waiting would block the event loop.
+
+        :type loop: asyncio.AbstractEventLoop
+        :rtype: asyncio.Future
+        :raises AuthenticationOverloadedException: when the verification
+                                                   cannot be admitted
+        """
+        loop = loop or asyncio.get_event_loop()
+
+        if not isinstance(authc_token, UsernamePasswordToken):
+            # totp verification is cheap, so it is performed in-line:
+            future = asyncio.Future(loop=loop)
+            try:
+                self.verify_credentials(authc_token, authc_info)
+                future.set_result(None)
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+
+        submitted = authc_token.credentials
+        stored = self.get_stored_credentials(authc_token, authc_info)
+
+        limiter = self.admission_limiter
+        if limiter is not None and not limiter.acquire(blocking=False):
+            raise AuthenticationOverloadedException
+
+        try:
+            if self.hash_offload_enabled:
+                future = loop.run_in_executor(self.get_hash_executor(),
+                                              verify_password_offloaded,
+                                              self.password_context,
+                                              submitted, stored)
+            else:
+                future = loop.run_in_executor(None, verify_password,
+                                              self.password_cc,
+                                              submitted, stored)
+        except Exception:
+            if limiter is not None:
+                limiter.release()
+            raise
+
+        if limiter is not None:
+            future.add_done_callback(lambda f: limiter.release())
+        return future
+
+    def create_admission_limiter(self, authc_settings):
+        if not authc_settings.admission_max_concurrent:
+            return None
+        return ConcurrencyLimiter(authc_settings.admission_max_concurrent,
+                                  authc_settings.admission_max_queued,
+                                  authc_settings.admission_queue_timeout)
+
+    @contextmanager
+    def admission(self):
+        """
+        Admits a password verification or, when too many are already in
+        progress and queued, turns it away.
+
+        :raises AuthenticationOverloadedException: when it is turned away
+        """
+        limiter = self.admission_limiter
+        if limiter is None:
+            yield
+            return
+
+        if not limiter.acquire():
+            msg = ('Credential verification turned away: {0} in progress '
+                   'and {1} queued'.format(limiter.max_concurrent,
+                                           limiter.max_queued))
+            logger.warning(msg)
+            raise AuthenticationOverloadedException(msg)
+
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def get_hash_executor(self):
+        """
+        The pool of worker processes is created upon first use, and again
+        within a process forked from the one that created it, because a pool
+        cannot be shared across a fork.
+
+        :rtype: ProcessPoolExecutor
+        """
+        pid = os.getpid()
+        with self.hash_executor_lock:
+            if self.hash_executor is None or self.hash_executor_pid != pid:
+                self.hash_executor = ProcessPoolExecutor(
+                    max_workers=self.hash_offload_max_workers)
+                self.hash_executor_pid = pid
+            return self.hash_executor
+
+    def shutdown(self, wait=True):
+        """
+        Stops the worker processes, if any were started.
+        """
+        with self.hash_executor_lock:
+            if self.hash_executor is not None:
+                if self.hash_executor_pid == os.getpid():
+                    self.hash_executor.shutdown(wait=wait)
+                self.hash_executor = None
+                self.hash_executor_pid = None
+
     def get_stored_credentials(self, authc_token, authc_info):
         # look up the db credential type assigned to this type token:
         cred_type = authc_token.token_info['cred_type']
@@ -80,16 +213,54 @@ class PasslibVerifier(authc_abcs.CredentialsVerifier):
             msg = "{0} is required but unavailable from authc_info".format(cred_type)
             raise KeyError(msg)
 
-    def create_password_crypt_context(self, authc_settings):
-        context = dict(schemes=[authc_settings.preferred_algorithm])
+    def get_password_context(self, authc_settings):
+        """
+        The keyword arguments of the password CryptContext, as a tuple of
+        items so that worker processes can cache the contexts they create
+        from it.
+
+        :rtype: tuple
+        """
+        context = dict(schemes=(authc_settings.preferred_algorithm,))
         context.update(authc_settings.preferred_algorithm_context)
-        return CryptContext(**context)
+        return tuple(sorted(context.items()))
+
+    def create_password_crypt_context(self, authc_settings):
+        return CryptContext(**dict(self.get_password_context(authc_settings)))
 
     def generate_totp_token(self, totp_key):
         totp = self.totp_factory.from_json(totp_key)
         return totp.generate().token
 
 
+def verify_password(crypt_context, submitted, stored):
+    """
+    :raises IncorrectCredentialsException: when the submitted password does
+                                           not match the stored hash
+    """
+    try:
+        result = crypt_context.verify(submitted, stored)
+    except ValueError:
+        raise IncorrectCredentialsException
+
+    if not result:
+        raise IncorrectCredentialsException
+
+
+@functools.lru_cache(maxsize=8)
+def get_offloaded_crypt_context(password_context):
+    return CryptContext(**dict(password_context))
+
+
+def verify_password_offloaded(password_context, submitted, stored):
+    """
+    Verifies a password within a worker process, where the CryptContext is
+    created from its (picklable) keyword arguments once per process.
+    """
+    verify_password(get_offloaded_crypt_context(password_context),
+                    submitted, stored)
+
+
 def create_totp_factory(env_var=None, file_path=None, authc_settings=None):
     if not authc_settings:
         yosai_settings = LazySettings(env_var=env_var, file_path=file_path)
@@ -19,6 +19,7 @@ under the License.
 from collections import namedtuple
 
 from yosai.core import (
+    AuthenticationOverloadedException,
     IncorrectCredentialsException,
     MultiRealmAuthenticationException,
 )
@@ -84,6 +85,9 @@ def first_realm_successful_strategy(authc_attempt):
          * If no exceptions were thrown, None is returned, indicating to the
            calling Authenticator that no Account was found (for that token)
 
+     An AuthenticationOverloadedException is raised immediately, as it isn't
+     a failure of the credentials.
+
     :type authc_attempt:  AuthenticationAttempt
     :returns:  Account
     """
@@ -94,6 +98,8 @@ def first_realm_successful_strategy(authc_attempt):
         if (realm.supports(authc_token)):
             try:
                 account = realm.authenticate_account(authc_token)
+            except AuthenticationOverloadedException:
+                raise
             except Exception as ex:
                 realm_errors.append(ex)
             if (account):
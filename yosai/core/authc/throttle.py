@@ -0,0 +1,180 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+from yosai.core import (
+    ExcessiveAttemptsException,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottle:
+    """
+    Rate limits login attempts, before any account is obtained or credential
+    verified, using a token bucket per identifier and per host:  a bucket
+    admits a burst of up to `capacity` attempts and refills at `refill_rate`
+    attempts per second.
+
+    Buckets are kept in memory, as (tokens, timestamp) tuples of which the
+    least recently used are forgotten beyond maxsize.  When a cache handler
+    is applied, buckets are kept by it instead so that every process of a
+    deployment shares them.  The cache handler cannot update a bucket
+    atomically, so concurrent attempts may occasionally both be admitted.
+    """
+
+    cache_domain = 'authentication:throttle'
+
+    def __init__(self, rules, maxsize=100000, cache_handler=None):
+        """
+        :param rules: {'identifier' or 'host': (capacity, refill_rate)}, a
+                      capacity of at least 1 and a positive refill_rate
+        :type rules: dict
+
+        :param maxsize: the number of buckets kept in memory
+        :type maxsize: int
+
+        :raises ValueError: when a rule would never admit another attempt
+        """
+        for kind, (capacity, refill_rate) in rules.items():
+            if capacity < 1 or refill_rate <= 0:
+                msg = ("Invalid login_throttle rule for {0}:  capacity must "
+                       "be at least 1 and refill_per_second positive, not "
+                       "{1} and {2}".format(kind, capacity, refill_rate))
+                raise ValueError(msg)
+
+        self.rules = rules
+        self.maxsize = maxsize
+        self.cache_handler = cache_handler
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def attempt(self, identifier, host=None):
+        """
+        Takes a token from the buckets of the identifier and of the host,
+        unless either is empty.  A successful login is handed its tokens back
+        through refund, so that only failed attempts are charged.
+
+        :raises ExcessiveAttemptsException: when either bucket is empty,
+                                            indicating the seconds after which
+                                            an attempt would be admitted
+        """
+        keys = self.get_keys(identifier, host)
+        if not keys:
+            return
+
+        if self.cache_handler is not None:
+            # cache I/O isn't atomic anyway, so it isn't held under the lock:
+            self.take(keys, identifier)
+            return
+
+        with self.lock:
+            self.take(keys, identifier)
+
+    def refund(self, identifier, host=None):
+        """
+        Returns the tokens taken by an attempt that succeeded.
+        """
+        keys = self.get_keys(identifier, host)
+        if not keys:
+            return
+
+        if self.cache_handler is not None:
+            self.give(keys)
+            return
+
+        with self.lock:
+            self.give(keys)
+
+    def get_keys(self, identifier, host):
+        return [(kind, key) for kind, key in (('identifier', identifier),
+                                              ('host', host))
+                if key is not None and self.rules.get(kind)]
+
+    def take(self, keys, identifier):
+        now = time.time()
+        levels = [self.refill(kind, key, now) for kind, key in keys]
+
+        retry_after = max(self.wait_time(kind, tokens)
+                          for (kind, key), tokens in zip(keys, levels))
+        if retry_after:
+            msg = ('Too many authentication attempts for {0}.  Retry '
+                   'after {1:.1f} seconds.'.format(identifier, retry_after))
+            logger.debug(msg)
+            raise ExcessiveAttemptsException(retry_after)
+
+        for (kind, key), tokens in zip(keys, levels):
+            self.save(kind, key, (tokens - 1, now))
+
+    def give(self, keys):
+        now = time.time()
+        for kind, key in keys:
+            capacity, refill_rate = self.rules[kind]
+            tokens = self.refill(kind, key, now)
+            if tokens < capacity:
+                self.save(kind, key, (min(capacity, tokens + 1), now))
+
+    def refill(self, kind, key, now):
+        """
+        :returns: the number of tokens in the bucket, as of now
+        """
+        capacity, refill_rate = self.rules[kind]
+        bucket = self.load(kind, key)
+        if bucket is None:
+            return capacity
+
+        tokens, timestamp = bucket
+        return min(capacity, tokens + (now - timestamp) * refill_rate)
+
+    def wait_time(self, kind, tokens):
+        if tokens >= 1:
+            return 0
+        capacity, refill_rate = self.rules[kind]
+        return (1 - tokens) / refill_rate
+
+    def load(self, kind, key):
+        if self.cache_handler is not None:
+            bucket = self.cache_handler.get(domain=self.cache_domain,
+                                            identifier=kind + ':' + key)
+            return tuple(bucket) if bucket else None
+
+        bucket = self.buckets.get((kind, key))
+        if bucket is not None:
+            self.buckets.move_to_end((kind, key))
+        return bucket
+
+    def save(self, kind, key, bucket):
+        if self.cache_handler is not None:
+            self.cache_handler.set(domain=self.cache_domain,
+                                   identifier=kind + ':' + key,
+                                   value=list(bucket))
+            return
+
+        self.buckets[(kind, key)] = bucket
+        self.buckets.move_to_end((kind, key))
+        while len(self.buckets) > self.maxsize:
+            self.buckets.popitem(last=False)
+
+    def __repr__(self):
+        return "LoginThrottle(rules={0}, maxsize={1})".format(
+            self.rules, self.maxsize)
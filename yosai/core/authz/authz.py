@@ -16,11 +16,17 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+from concurrent import futures
 import itertools
 import logging
 import json
+import re
+import threading
+import time
+import weakref
 
 from yosai.core import (
+    AuthorizationSettings,
     EVENT_TOPIC,
     SerializationManager,
     UnauthorizedException,
@@ -88,22 +94,33 @@ class Permission:
     PART_DIVIDER_TOKEN = ':'
     SUBPART_DIVIDER_TOKEN = ','
 
+    __slots__ = ('domain', 'actions', 'targets')
+
     def __init__(self, wildcard_perm=None, parts=None):
         if wildcard_perm:
             parts = iter(self.partify(wildcard_perm))
             try:
-                self.domain = next(parts)
-                self.actions = next(parts)
-                self.targets = next(parts)
+                domain = next(parts)
+                actions = next(parts)
+                targets = next(parts)
             except StopIteration:
                 raise ValueError("Permission cannot identify required parts from string")
         else:
-            self.domain = set([parts.get('domain', self.WILDCARD_TOKEN)])
-            self.actions = set(parts.get('actions', self.WILDCARD_TOKEN))
-            self.targets = set(parts.get('targets', self.WILDCARD_TOKEN))
+            domain = frozenset([parts.get('domain', self.WILDCARD_TOKEN)])
+            actions = frozenset(parts.get('actions', self.WILDCARD_TOKEN))
+            targets = frozenset(parts.get('targets', self.WILDCARD_TOKEN))
+
+        # Permission instances are shared by the permission_cache and so are
+        # immutable once initialized:
+        object.__setattr__(self, 'domain', domain)
+        object.__setattr__(self, 'actions', actions)
+        object.__setattr__(self, 'targets', targets)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Permission instances are immutable')
 
     def partify(self, wildcard_perm):
-        return [set(a.strip() for a in y.split(self.SUBPART_DIVIDER_TOKEN))
+        return [frozenset(a.strip() for a in y.split(self.SUBPART_DIVIDER_TOKEN))
                 for y in [x[0] if x[0] else x[1]
                           for x in itertools.zip_longest(
                           wildcard_perm.split(self.PART_DIVIDER_TOKEN),
@@ -112,6 +129,20 @@ class Permission:
                 ]
 
     def implies(self, permission):
+        if not self.implies_actions(permission):
+            return False
+
+        if self.targets != {self.WILDCARD_TOKEN}:
+            if not self.targets >= permission.targets:
+                return False
+
+        return True
+
+    def implies_actions(self, permission):
+        """
+        Determines whether this permission implies the domain and actions of
+        the permission, disregarding targets.
+        """
         if self.domain != {self.WILDCARD_TOKEN}:
             if self.domain != permission.domain:
                 return False
@@ -120,35 +151,896 @@ class Permission:
             if not self.actions >= permission.actions:
                 return False
 
-        if self.targets != {self.WILDCARD_TOKEN}:
-            if not self.actions >= permission.actions:
-                return False
-
         return True
 
     @staticmethod
-    def get_domain(wildcard_perm):
-        domain = wildcard_perm.split(Permission.PART_DIVIDER_TOKEN)[0].strip()
-        if not domain:
-            return Permission.WILDCARD_TOKEN
-        return domain
+    def parse(wildcard_perm, cache=True):
+        """
+        Obtains the shared Permission instance for a wildcard permission string
+        from the permission_cache, parsing the string only when it isn't cached.
+
+        :type wildcard_perm: str
+
+        :param cache: whether a parsed Permission is placed in the
+                      permission_cache, as it shouldn't be when it is one of
+                      as many permissions as there are instances
+        :type cache: bool
+
+        :rtype: Permission
+        """
+        return permission_cache.get(wildcard_perm, keep=cache)
+
+    @staticmethod
+    def parse_required(wildcard_perm):
+        """
+        Parses a required permission, caching it unless it names targets.
+        Instance-level permissions, such as those rendered by
+        requires_dynamic_permission, are as many as the instances they name
+        and would evict the application's fixed vocabulary from the
+        permission_cache.
+        A pinned permission is obtained either way.
+
+        :type wildcard_perm: str
+        :rtype: Permission
+        """
+        parts = wildcard_perm.split(Permission.PART_DIVIDER_TOKEN)
+        names_targets = (len(parts) > 2 and
+                         parts[2].strip() not in ('', Permission.WILDCARD_TOKEN))
+        return Permission.parse(wildcard_perm, cache=not names_targets)
+
+    @staticmethod
+    def from_parts(domain, actions, targets):
+        """
+        Creates a Permission from parts that have already been split, such as
+        those decoded from a compact blob.
+
+        :type domain: frozenset
+        :type actions: frozenset
+        :type targets: frozenset
+        :rtype: Permission
+        """
+        permission = object.__new__(Permission)
+        object.__setattr__(permission, 'domain', domain)
+        object.__setattr__(permission, 'actions', actions)
+        object.__setattr__(permission, 'targets', targets)
+        return permission
+
+    @staticmethod
+    def validate(wildcard_perm):
+        """
+        Confirms that a wildcard permission string is well formed:  a non-empty
+        string of at most three parts (domain, actions, targets), none of which
+        includes an empty subpart.
+
+        :type wildcard_perm: str
+        :raises ValueError: if the wildcard permission is malformed
+        """
+        if not isinstance(wildcard_perm, str) or not wildcard_perm.strip():
+            msg = "A permission must be a non-empty string: {0!r}".\
+                format(wildcard_perm)
+            raise ValueError(msg)
+
+        parts = wildcard_perm.split(Permission.PART_DIVIDER_TOKEN)
+        if len(parts) > 3:
+            msg = ("A permission has at most three parts (domain, actions, "
+                   "targets): {0!r}".format(wildcard_perm))
+            raise ValueError(msg)
+
+        for part in parts:
+            if part and not all(subpart.strip() for subpart in
+                                part.split(Permission.SUBPART_DIVIDER_TOKEN)):
+                msg = "A permission part has an empty subpart: {0!r}".\
+                    format(wildcard_perm)
+                raise ValueError(msg)
+
+    def canonical(self):
+        """
+        :returns: the wildcard permission string of the permission's parts,
+                  with sorted subparts, such that equal permissions have the
+                  same canonical string
+        """
+        return self.PART_DIVIDER_TOKEN.join(
+            self.SUBPART_DIVIDER_TOKEN.join(sorted(part))
+            for part in (self.domain, self.actions, self.targets))
+
+    def to_parts(self):
+        """
+        :returns: the parts dict of the permission, as stored in json blobs
+        """
+        return {'domain': next(iter(self.domain)),
+                'actions': sorted(self.actions),
+                'targets': sorted(self.targets)}
+
+    @staticmethod
+    def get_domain(wildcard_perm, cache=True):
+        return Permission.parse(wildcard_perm, cache).domain_name()
+
+    def domain_name(self):
+        """
+        :returns: the domain under which the permission's grants are stored
+        """
+        if len(self.domain) == 1:
+            return next(iter(self.domain))
+        return self.SUBPART_DIVIDER_TOKEN.join(sorted(self.domain))
+
+    def __eq__(self, other):
+        try:
+            return (self.domain == other.domain and
+                    self.actions == other.actions and
+                    self.targets == other.targets)
+        except AttributeError:
+            return False
+
+    def __hash__(self):
+        return hash((self.domain, self.actions, self.targets))
+
+    def __repr__(self):
+        return "Permission(domain={0}, actions={1}, targets={2})".\
+            format(sorted(self.domain), sorted(self.actions), sorted(self.targets))
+
+
+PermissionCacheInfo = collections.namedtuple('PermissionCacheInfo',
+                                             'hits misses maxsize currsize')
+
+
+class PermissionCache:
+    """
+    A bounded, thread-safe, least-recently-used cache of parsed Permission
+    instances, keyed by wildcard permission string.  Identical strings are
+    parsed once and share one immutable Permission instance.
+
+    The hit and miss counters, reported by ``cache_info``, are intended to
+    help size the cache:  a maxsize that covers the application's vocabulary
+    of required permissions yields a miss count that stops growing.
+
+    Permissions that are known in advance, such as those of authorization
+    decorators, are pinned:  they are never evicted and are obtained without
+    locking.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._permissions = collections.OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def pin(self, wildcard_perm):
+        """
+        Parses and validates a wildcard permission string once, keeping the
+        Permission for as long as the process runs.
+
+        :raises ValueError: if the wildcard permission is malformed
+        :rtype: Permission
+        """
+        Permission.validate(wildcard_perm)
+        return self._pinned.setdefault(wildcard_perm,
+                                       Permission(wildcard_perm=wildcard_perm))
+
+    def get(self, wildcard_perm, creator=None, keep=True):
+        """
+        :param creator: creates the Permission of the wildcard_perm when it
+                        isn't cached, defaults to parsing the wildcard_perm
+        :param keep: whether a created Permission is cached.  Permissions
+                     that aren't kept aren't counted as misses either, so
+                     that misses continue to reflect the cache's sizing.
+        :rtype: Permission
+        """
+        try:
+            return self._pinned[wildcard_perm]
+        except KeyError:
+            pass
+
+        with self._lock:
+            try:
+                permission = self._permissions[wildcard_perm]
+                self._permissions.move_to_end(wildcard_perm)
+                self.hits += 1
+                return permission
+            except KeyError:
+                if keep:
+                    self.misses += 1
+
+        # parsing happens outside of the lock:
+        if creator is None:
+            permission = Permission(wildcard_perm=wildcard_perm)
+        else:
+            permission = creator()
+
+        if not keep:
+            return permission
+
+        with self._lock:
+            self._permissions[wildcard_perm] = permission
+            while len(self._permissions) > self.maxsize:
+                self._permissions.popitem(last=False)
+
+        return permission
+
+    def cache_info(self):
+        with self._lock:
+            return PermissionCacheInfo(self.hits, self.misses, self.maxsize,
+                                       len(self._permissions))
+
+    def clear(self):
+        with self._lock:
+            self._permissions.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+permission_cache = PermissionCache()
+
+
+class PermissionCodec:
+    """
+    A PermissionCodec encodes the permissions of a domain, as they are cached,
+    in a compact binary format rather than as a json blob of parts dicts.
+    Domains and actions are interned (each is encoded once, and then
+    referred to by its index) and numeric targets are packed as integers:
+
+        [[domain, ...], [action, ...],
+         [domain index, [action index, ...], [target, ...]], ...]
+
+    which is serialized by the SerializationManager and prefixed with the
+    MARKER.  Compact blobs are decoded without parsing json.
+
+    Decoding accepts compact and json blobs alike so that, during a rollout,
+    every process is first able to read both formats before any of them
+    caches the compact format (the permission_wire_format realm attribute).
+    """
+
+    MARKER = b'\x00yp1'  # json blobs never begin with a NUL byte
+
+    # targets packed as integers:  ascii digits, without leading zeros, that
+    # fit a 64-bit integer, so that each unpacks to the same string:
+    PACKABLE_TARGET = re.compile(r'(0|[1-9][0-9]{0,17})\Z')
+
+    def __init__(self, serialization_manager=None):
+        """
+        :param serialization_manager: serializes compact blobs, by default a
+                                      SerializationManager of the default
+                                      scheme, created when first used
+        :type serialization_manager: SerializationManager
+        """
+        self._serialization_manager = serialization_manager
+
+    @property
+    def serialization_manager(self):
+        if self._serialization_manager is None:
+            self._serialization_manager = SerializationManager(None)
+        return self._serialization_manager
+
+    @classmethod
+    def is_compact(cls, blob):
+        return isinstance(blob, bytes) and blob.startswith(cls.MARKER)
+
+    @classmethod
+    def pack_target(cls, target):
+        if cls.PACKABLE_TARGET.match(target):
+            return int(target)
+        return target
+
+    def encode(self, permission_s):
+        """
+        :type permission_s: an iterable of Permission
+        :returns: a compact blob (bytes)
+        """
+        domains = {}
+        actions = {}
+        entries = []
+        for permission in permission_s:
+            domain = domains.setdefault(next(iter(permission.domain)), len(domains))
+            entries.append([domain,
+                            [actions.setdefault(action, len(actions))
+                             for action in sorted(permission.actions)],
+                            [self.pack_target(target)
+                             for target in sorted(permission.targets)]])
+
+        record = [sorted(domains, key=domains.get),
+                  sorted(actions, key=actions.get),
+                  entries]
+        return self.MARKER + self.serialization_manager.serialize(record)
+
+    def encode_json(self, permissions):
+        """
+        Encodes the permissions of an account, as account stores provide them.
+
+        :param permissions: {'domain': json blob of a list of parts dicts}
+        :returns: a dict of compact blobs, keyed as permissions
+        """
+        return {domain: self.encode(self.decode(blob))
+                for domain, blob in permissions.items()}
+
+    def decode(self, blob):
+        """
+        :param blob: a compact blob, a json blob or None
+        :type blob: bytes or str
+        :returns: a list of Permission
+        """
+        if not blob:
+            return []
+
+        if self.is_compact(blob):
+            domains, actions, entries = self.serialization_manager.\
+                deserialize(blob[len(self.MARKER):])
+            return [Permission.from_parts(frozenset([domains[domain]]),
+                                          frozenset(actions[a] for a in action_s),
+                                          frozenset(str(t) for t in target_s))
+                    for domain, action_s, target_s in entries]
+
+        if isinstance(blob, bytes):
+            blob = blob.decode('utf-8')
+        return [Permission(parts=parts) for parts in json.loads(blob)]
+
+
+permission_codec = PermissionCodec()
+
+
+class PermissionIndex:
+    """
+    A PermissionIndex compiles a user's assigned permissions into a
+    domain -> action -> [Permission] lookup.  Rather than parsing every
+    assigned permission and testing each of them during every check, a check
+    consults only those grants that are indexed under the required domain
+    (or the wildcard domain) and under one of the required actions (or the
+    wildcard action).  Each candidate is then confirmed using
+    ``Permission.implies``, so results are exactly those of a full scan.
+
+    Permissions are indexed a domain at a time, as they are obtained from the
+    authorization cache (json blobs, keyed by domain).
+    """
+
+    def __init__(self, generations=None):
+        """
+        :param generations: the authz generations that the index is compiled
+                            under, if any
+        """
+        self.grants = collections.defaultdict(
+            lambda: collections.defaultdict(list))
+        self.indexed_domains = set()
+        self.generations = generations
+        self.created = time.time()
+
+    def is_indexed(self, domain):
+        return domain in self.indexed_domains
+
+    def add(self, permission):
+        """
+        :type permission: Permission
+        """
+        by_action = self.grants[next(iter(permission.domain))]
+        for action in permission.actions:
+            by_action[action].append(permission)
+
+    def add_json(self, domain, blob, codec=None):
+        """
+        :param domain: the domain under which the blob is stored, marked as
+                       indexed even when there is no blob
+        :param blob:  a json blob of a list of permission parts dicts, or a
+                      compact blob (see PermissionCodec)
+        :type blob: bytes or str
+        :type codec: PermissionCodec
+        """
+        for permission in (codec or permission_codec).decode(blob):
+            self.add(permission)
+        self.indexed_domains.add(domain)
+
+    def candidates(self, required):
+        """
+        :type required: Permission
+        :returns: a generator of the assigned permissions that may imply the
+                  required permission
+        """
+        wildcard = Permission.WILDCARD_TOKEN
+        domains = [wildcard]
+        if len(required.domain) == 1 and wildcard not in required.domain:
+            domains.append(next(iter(required.domain)))
+
+        # an implying permission either has every required action or is a
+        # wildcard, so only one of the required actions need be looked up:
+        action = next(iter(required.actions))
+        actions = {action, wildcard}
+
+        for domain in domains:
+            by_action = self.grants.get(domain)
+            if by_action:
+                for action in actions:
+                    yield from by_action.get(action, ())
+
+    def implies(self, required):
+        """
+        :type required: Permission
+        :returns: a Boolean indicating whether any indexed permission implies
+                  the required permission
+        """
+        return any(assigned.implies(required)
+                   for assigned in self.candidates(required))
+
+    def permitted_targets(self, required):
+        """
+        Compiles the targets that the indexed permissions permit for the
+        domain and actions of the required permission.
+
+        :type required: Permission
+        :returns: a tuple containing a Boolean indicating whether every target
+                  is permitted and a frozenset of the permitted targets
+        """
+        targets = set()
+        for assigned in self.candidates(required):
+            if assigned.implies_actions(required):
+                if assigned.targets == {Permission.WILDCARD_TOKEN}:
+                    return (True, frozenset())
+                targets.update(assigned.targets)
+        return (False, frozenset(targets))
+
+    def filter_permitted(self, permission, targets):
+        """
+        Filters targets to those for which an indexed permission implies the
+        permission, evaluating every target in a single pass.  A target is
+        permitted when it is a member of the targets compiled by
+        permitted_targets.  A target that does not parse as a single target
+        (one that is empty or includes a divider token) is confirmed
+        using ``Permission.implies`` instead so that results are exactly
+        those of checking each target individually.
+
+        :param permission: a domain and actions, such as 'document:read'
+        :type permission: str
+
+        :param targets: the target ids to filter
+        :type targets: an iterable of str or int
+
+        :returns: a list of the permitted targets, ordered as targets
+        """
+        required = Permission.parse(permission)
+        permits_all, permitted = self.permitted_targets(required)
+        if permits_all:
+            return list(targets)
+
+        dividers = (Permission.PART_DIVIDER_TOKEN,
+                    Permission.SUBPART_DIVIDER_TOKEN)
+        # a permission without actions permits every action:
+        prefix = Permission.PART_DIVIDER_TOKEN.join(
+            (permission.split(Permission.PART_DIVIDER_TOKEN) +
+             [Permission.WILDCARD_TOKEN])[:2] + [''])
+
+        def is_permitted(target):
+            target = str(target)
+            stripped = target.strip()
+            if stripped and not any(d in target for d in dividers):
+                return stripped in permitted
+            return self.implies(Permission.parse(prefix + target, cache=False))
+
+        return [target for target in targets if is_permitted(target)]
+
+    def permitted_actions(self, domain, target=None, catalog=None):
+        """
+        Compiles the actions of the domain that the indexed permissions
+        permit, in a single pass over the grants of the domain (and of the
+        wildcard domain).  An action is permitted exactly when
+        'domain:action' (or 'domain:action:target') is.  As with
+        ``Permission.implies``, only a part that is the wildcard alone grants
+        every action:  a wildcard among named actions grants the named ones.
+
+        :type domain: str
+
+        :param target: the target acted upon, or None for any target
+        :type target: str or int
+
+        :param catalog: the actions of the domain, against which a wildcard
+                        action is expanded and to which the result is limited,
+                        or None to return the actions granted by name (plus
+                        the wildcard, should every action be granted)
+        :type catalog: a set of str
+
+        :returns: a frozenset of str
+        """
+        wildcard = Permission.WILDCARD_TOKEN
+        required_targets = frozenset([wildcard if target is None
+                                      else str(target).strip()])
+        actions = set()
+        every_action = False
+
+        for indexed_domain in {wildcard, domain}:
+            by_action = self.grants.get(indexed_domain, {})
+            assigned_s = {assigned for grants in by_action.values()
+                          for assigned in grants}
+            for assigned in assigned_s:
+                if assigned.domain != {wildcard} and assigned.domain != {domain}:
+                    continue
+                if (assigned.targets != {wildcard} and
+                        not assigned.targets >= required_targets):
+                    continue
+                if assigned.actions == {wildcard}:
+                    every_action = True
+                else:
+                    actions.update(assigned.actions - {wildcard})
+
+        if catalog is None:
+            if every_action:
+                actions.add(wildcard)
+            return frozenset(actions)
+        if every_action:
+            return frozenset(catalog)
+        return frozenset(actions.intersection(catalog))
+
+
+class TargetPredicate:
+    """
+    A TargetPredicate is the compiled form of a subject's instance-level
+    permissions for a domain and actions, such as 'blogpost:edit', so that a
+    query obtains only those rows that the subject is permitted rather than
+    every row being obtained and then checked.  It permits either every
+    target ('all'), the targets of a set ('in') or no target ('none').
+
+    A predicate is pushed down to the database as a SQLAlchemy clause::
+
+        predicate = subject.target_predicate('blogpost:edit')
+        query = session.query(BlogPost).\
+            filter(predicate.to_sqlalchemy(BlogPost.id, coerce=int))
+
+    or as a parameterized SQL fragment::
+
+        fragment, params = predicate.to_sql('blogpost.id')
+        cursor.execute('SELECT * FROM blogpost WHERE ' + fragment, params)
+    """
+
+    ALL = 'all'
+    IN = 'in'
+    NONE = 'none'
+
+    def __init__(self, permits_all=False, targets=None):
+        """
+        :type permits_all: bool
+        :param targets: the permitted targets, when not every target is
+        :type targets: a set of str
+        """
+        self.targets = frozenset() if permits_all else frozenset(targets or ())
+        if permits_all:
+            self.kind = self.ALL
+        elif self.targets:
+            self.kind = self.IN
+        else:
+            self.kind = self.NONE
+
+    def permits(self, target):
+        return self.kind == self.ALL or str(target).strip() in self.targets
+
+    def coerced_targets(self, coerce=None):
+        """
+        :param coerce: a callable applied to each (str) target, such as int,
+                       should the column not be of a string type
+        :returns: a list of the targets, sorted
+        """
+        targets = sorted(self.targets)
+        if coerce is not None:
+            targets = [coerce(target) for target in targets]
+        return targets
+
+    def to_sqlalchemy(self, column, coerce=None):
+        """
+        :param column: the column of the target ids, such as BlogPost.id
+        :param coerce: a callable applied to each (str) target
+        :returns: a SQLAlchemy clause
+        """
+        # SQLAlchemy is only required of those who push predicates down to it:
+        import sqlalchemy
+
+        if self.kind == self.ALL:
+            return sqlalchemy.true()
+        if self.kind == self.NONE:
+            return sqlalchemy.false()
+        return column.in_(self.coerced_targets(coerce))
+
+    def to_sql(self, column, placeholder='?', coerce=None):
+        """
+        :param column: the (trusted) name of the column of the target ids
+        :type column: str
+
+        :param placeholder: the parameter placeholder of the DB-API driver,
+                            such as '?' or '%s'
+        :param coerce: a callable applied to each (str) target
+
+        :returns: a tuple containing the SQL fragment and a list of its
+                  parameters
+        """
+        if self.kind == self.ALL:
+            return ('1 = 1', [])
+        if self.kind == self.NONE:
+            return ('1 = 0', [])
+
+        targets = self.coerced_targets(coerce)
+        placeholders = ', '.join([placeholder] * len(targets))
+        return ('{0} IN ({1})'.format(column, placeholders), targets)
+
+    def __eq__(self, other):
+        try:
+            return self.kind == other.kind and self.targets == other.targets
+        except AttributeError:
+            return False
+
+    def __repr__(self):
+        return "TargetPredicate(kind={0}, targets={1})".\
+            format(self.kind, sorted(self.targets))
+
+
+class RoleHierarchy:
+    """
+    A RoleHierarchy compiles the inheritance among roles, such as
+    admin -> editor -> viewer, into the transitive closure of every role:  the
+    role along with every role that it implies, directly or indirectly.
+    Membership of a role is then determined by a set lookup rather than by
+    assigning every implied role to each user.
+
+    The permissions assigned to roles are expanded likewise, so that a role
+    is granted the permissions of every role that it implies.
+
+    The closure is maintained incrementally as inheritance is added or
+    removed, recomputing only the closures of the roles affected.  The
+    expansion of each set of assigned roles is memoized until inheritance is
+    next edited, so that a membership check costs a lookup.
+    """
+
+    def __init__(self, graph=None, role_permissions=None, expansions_maxsize=10000):
+        """
+        :param graph: maps each role to the roles that it directly implies
+        :type graph: dict
+
+        :param role_permissions: maps a role to the wildcard permission strings
+                                 assigned directly to it
+        :type role_permissions: dict
+
+        :param expansions_maxsize: the number of sets of assigned roles whose
+                                   expansion is memoized, beyond which the
+                                   least recently used are forgotten
+        :type expansions_maxsize: int
+        """
+        self.lock = threading.RLock()
+        self.children = collections.defaultdict(set)
+        self.role_permissions = {role: frozenset(perms) for role, perms in
+                                 (role_permissions or {}).items()}
+        self.closure = {}
+
+        # frozenset of assigned roles -> frozenset of the roles they imply:
+        self.expansions = collections.OrderedDict()
+        self.expansions_maxsize = expansions_maxsize
+
+        for parent, children in (graph or {}).items():
+            self.children[parent].update(children)
+
+        self.recompute(set(self.children) |
+                       set(itertools.chain.from_iterable(self.children.values())))
+
+    def descendants(self, role):
+        """
+        :returns: a frozenset of the role and every role that it implies
+        """
+        implied = {role}
+        pending = [role]
+        while pending:
+            for child in self.children.get(pending.pop(), ()):
+                if child not in implied:
+                    implied.add(child)
+                    pending.append(child)
+        return frozenset(implied)
+
+    def ancestors(self, role):
+        """
+        :returns: the roles whose closures include the role
+        """
+        return [parent for parent, implied in self.closure.items()
+                if role in implied]
+
+    def recompute(self, roles):
+        with self.lock:
+            for role in roles:
+                self.closure[role] = self.descendants(role)
+            self.expansions.clear()
+
+    def implied_roles(self, role):
+        """
+        :returns: a frozenset of the role and every role that it implies
+        """
+        return self.closure.get(role, frozenset([role]))
+
+    def expand(self, role_s):
+        """
+        :param role_s: assigned roles
+        :returns: a frozenset of the roles and every role that they imply
+        """
+        assigned = frozenset(role_s)
+
+        with self.lock:
+            expanded = self.expansions.get(assigned)
+            if expanded is not None:
+                self.expansions.move_to_end(assigned)
+                return expanded
+
+            closure = self.closure
+            expanded = frozenset(itertools.chain.from_iterable(
+                closure.get(role, (role,)) for role in assigned))
+
+            self.expansions[assigned] = expanded
+            while len(self.expansions) > self.expansions_maxsize:
+                self.expansions.popitem(last=False)
+
+        return expanded
+
+    def permissions(self, role_s):
+        """
+        :param role_s: assigned roles
+        :returns: a set of the wildcard permission strings granted by the
+                  roles and every role that they imply
+        """
+        role_permissions = self.role_permissions
+        return set(itertools.chain.from_iterable(
+            role_permissions.get(role, ()) for role in self.expand(role_s)))
+
+    def add_inheritance(self, parent, child):
+        """
+        Makes parent imply child, extending the closures of the parent and
+        of every role that implies the parent.
+        """
+        with self.lock:
+            self.children[parent].add(child)
+            implied = self.implied_roles(child)
+            for role in self.ancestors(parent) or [parent]:
+                self.closure[role] = self.closure.get(role, frozenset([role])) | implied
+            self.closure.setdefault(child, implied)
+            self.expansions.clear()
+
+    def remove_inheritance(self, parent, child):
+        """
+        Stops parent from implying child, recomputing the closures of the
+        parent and of every role that implies the parent.
+        """
+        with self.lock:
+            self.children[parent].discard(child)
+            self.recompute(self.ancestors(parent) or [parent])
+
+    def __repr__(self):
+        return "RoleHierarchy(roles={0})".format(len(self.closure))
+
+
+class PermissionMinimizer:
+    """
+    A PermissionMinimizer reduces a set of assigned permissions to the fewest
+    that grant the same actions on the same targets, so that fewer
+    permissions are stored, cached and evaluated.  Permissions implied by
+    another (``Permission.implies``) are removed, and permissions of a domain
+    that differ only by actions, or only by targets, are merged:
+
+        doc:*, doc:read, doc:read:5       -->  doc:*
+        doc:read:5, doc:write:5           -->  doc:read,write:5
+        doc:read:5, doc:read:6            -->  doc:read:5,6
+
+    Merging grants an action on a target exactly when the original
+    permissions did.  However, a check of several actions (or targets) at
+    once, which the original permissions only granted separately, is then
+    granted by the merged permission.
+
+    Account stores may minimize permissions as they are written, and
+    realms minimize them as they are cached (see minimize_permissions).
+    """
+
+    def minimize(self, permission_s):
+        """
+        :param permission_s: the assigned permissions
+        :type permission_s: an iterable of Permission or wildcard strings
+
+        :returns: a list of Permission, ordered by canonical string
+        """
+        permissions = {Permission.parse(permission)
+                       if isinstance(permission, str) else permission
+                       for permission in permission_s}
+
+        while True:
+            permissions = self.remove_implied(permissions)
+            merged = self.merge(permissions, 'actions', 'targets')
+            merged = self.merge(merged, 'targets', 'actions')
+            if merged == permissions:
+                return sorted(permissions, key=Permission.canonical)
+            permissions = merged
+
+    def minimize_json(self, permissions):
+        """
+        Minimizes the permissions of an account, as account stores provide
+        them, including the removal of those implied by permissions of the
+        wildcard domain.
+
+        :param permissions: {'domain': json blob of a list of parts dicts}
+        :type permissions: dict
+
+        :returns: a dict of the minimized json blobs, keyed as permissions
+        """
+        parsed = {domain: permission_codec.decode(blob)
+                  for domain, blob in permissions.items()}
+
+        wildcard_domain = Permission.WILDCARD_TOKEN
+        wildcards = [wildcard for wildcard in
+                     self.minimize(parsed.get(wildcard_domain, ()))
+                     if not self.is_mixed(wildcard)]
+
+        minimized = {}
+        for domain, permission_s in parsed.items():
+            if domain != wildcard_domain:
+                permission_s = [permission for permission in permission_s
+                                if not any(wildcard.implies(permission)
+                                           for wildcard in wildcards)]
+            minimized[domain] = json.dumps([permission.to_parts() for permission
+                                            in self.minimize(permission_s)])
+        return minimized
+
+    def remove_implied(self, permissions):
+        """
+        Removes the permissions implied by another.  Only permissions whose
+        parts are either the wildcard or free of it are relied upon to imply
+        others:  those neither imply one another when distinct nor imply
+        a permission by way of a removed one.
+
+        :type permissions: a set of Permission
+        :returns: a set of Permission
+        """
+        impliers = [permission for permission in permissions
+                    if not self.is_mixed(permission)]
+        return {permission for permission in permissions
+                if not any(other is not permission and other.implies(permission)
+                           for other in impliers)}
+
+    @staticmethod
+    def is_mixed(permission):
+        """
+        :returns: a Boolean indicating whether a part of the permission
+                  includes the wildcard token among other subparts
+        """
+        return any(len(part) > 1 and Permission.WILDCARD_TOKEN in part
+                   for part in (permission.domain, permission.actions,
+                                permission.targets))
+
+    def merge(self, permissions, merged_part, shared_part):
+        """
+        Merges the merged_part of the permissions whose domain and
+        shared_part are the same.  A part that includes the wildcard token is
+        not merged, as a merged wildcard would no longer be one.
+
+        :param merged_part: 'actions' or 'targets'
+        :param shared_part: 'targets' or 'actions'
+        :returns: a set of Permission
+        """
+        wildcard = Permission.WILDCARD_TOKEN
+        merged = collections.defaultdict(set)
+        result = set()
+
+        for permission in permissions:
+            if (wildcard in getattr(permission, merged_part) or
+                    len(permission.domain) != 1):
+                result.add(permission)
+                continue
+            key = (permission.domain, getattr(permission, shared_part))
+            merged[key].update(getattr(permission, merged_part))
+
+        for (domain, shared), parts in merged.items():
+            part_s = {merged_part: frozenset(parts), shared_part: shared}
+            result.add(Permission.from_parts(domain,
+                                             part_s['actions'],
+                                             part_s['targets']))
+        return result
 
 
 class DefaultPermissionVerifier:
 
     def is_permitted_from_str(self, required, assigned):
-        required_perm = Permission(wildcard_perm=required)
+        required_perm = Permission.parse(required)
         for perm_str in assigned:
-            assigned_perm = Permission(wildcard_perm=perm_str)
+            assigned_perm = Permission.parse(perm_str)
             if assigned_perm.implies(required_perm):
                 return True
         return False
 
     def is_permitted_from_json(self, required, assigned):
-        required = Permission(wildcard_perm=required)
-        the_parts = json.loads(assigned.decode('utf-8'))
-        for parts in the_parts:
-            assigned_perm = Permission(parts=parts)
+        required = Permission.parse(required)
+        for assigned_perm in permission_codec.decode(assigned):
             if assigned_perm.implies(required):
                 return True
         return False
@@ -160,11 +1052,54 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
     A ModularRealmAuthorizer is an Authorizer implementation that consults
     one or more configured Realms during an authorization operation.
 
+    Realms are consulted one after another unless a realm executor is
+    configured (AUTHZ_CONFIG.realm_executor.max_workers), in which case
+    multiple realms are consulted concurrently on a bounded thread pool so
+    that a check costs the latency of the slowest realm rather than the sum
+    of every realm's.  A realm that doesn't respond within the realm_timeout
+    is treated as though it granted nothing.
+
+    When routing by identity is configured (AUTHZ_CONFIG.route_by_identity),
+    only the realms that own a subject's identity, those named by the
+    source_names of its identifiers, are consulted on the subject's behalf
+    (see route_realms).
+
+    When warm-up is configured (AUTHZ_CONFIG.warm_up), a user's roles and
+    permissions are cached by each realm once authentication succeeds,
+    asynchronously by default, so that the checks that follow login are
+    answered from cache.
+
     :type realms:  Tuple
     """
-    def __init__(self):
+    def __init__(self, settings=None):
         self.realms = None
+        self.realms_by_name = {}
+        self.route_by_identity = False
         self.event_bus = None
+        self.executor = None
+        self.realm_timeout = None
+        self.warm_up_enabled = False
+        self.warm_up_executor = None
+        self.action_catalog = {}
+
+        if settings is not None:
+            authz_settings = AuthorizationSettings(settings)
+            max_workers = authz_settings.realm_executor_max_workers
+            if max_workers:
+                # thread_name_prefix is omitted, as it requires python 3.6:
+                self.executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+                self.realm_timeout = authz_settings.realm_timeout
+
+            self.warm_up_enabled = authz_settings.warm_up_enabled
+            if self.warm_up_enabled and authz_settings.warm_up_asynchronous:
+                self.warm_up_executor = futures.ThreadPoolExecutor(max_workers=1)
+
+            self.action_catalog = authz_settings.action_catalog
+            self.route_by_identity = authz_settings.route_by_identity
+
+        for executor in (self.executor, self.warm_up_executor):
+            if executor is not None:
+                weakref.finalize(self, executor.shutdown, wait=False)
 
     def init_realms(self, realms):
         """
@@ -173,8 +1108,31 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         # this eliminates the need for an authorizing_realms attribute:
         self.realms = tuple(realm for realm in realms
                             if isinstance(realm, realm_abcs.AuthorizingRealm))
+        self.realms_by_name = {getattr(realm, 'name', None): realm
+                               for realm in self.realms}
         self.register_cache_clear_listener()
 
+    # new to Yosai:
+    def route_realms(self, identifiers):
+        """
+        Obtains the realms that own the identity, when route_by_identity is
+        configured:  those whose names are source_names of the identifiers,
+        in the order that realms are configured.  Every realm owns
+        identifiers that name none of the realms, such as those not obtained
+        through authentication.  Otherwise, every realm is consulted, as an
+        authorization-only realm owns none of the identities it authorizes.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+        :returns: a tuple of realms
+        """
+        source_names = getattr(identifiers, 'source_names', None)
+        if self.route_by_identity and source_names and len(self.realms) > 1:
+            owners = {self.realms_by_name.get(name) for name in source_names}
+            routed = tuple(realm for realm in self.realms if realm in owners)
+            if routed:
+                return routed
+        return self.realms
+
     def assert_realms_configured(self):
         if (not self.realms):
             msg = ("Configuration error:  No realms have been configured! "
@@ -186,13 +1144,95 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
     # generators and sub-generators so as to optimize processing w/ each realm
     # and improve code readability
 
+    # new to Yosai:
+    def fans_out(self, realms):
+        """
+        Whether the realms are consulted concurrently.
+        """
+        return self.executor is not None and len(realms) > 1
+
+    # new to Yosai:
+    def _fan_out(self, realms, realm_check, item_s):
+        """
+        Consults every realm concurrently, using the executor, yielding the
+        results of each realm as soon as the realm responds.  A realm that
+        hasn't responded within the realm_timeout of being submitted is
+        logged and denies every item, as a realm that grants nothing would.
+        Realms that haven't been consulted once the generator is closed, such
+        as when evaluation short-circuits, are cancelled.
+
+        :param realm_check: obtains a realm's generator of (item, Boolean)
+                            tuples, such as lambda realm:
+                            realm.is_permitted(identifiers, permission_s)
+
+        :param item_s: the items checked, denied by realms that time out
+
+        :yields: a list of (item, Boolean) tuples, per realm
+        """
+        deadlines = {}  # future -> (realm, deadline or None)
+        for realm in realms:
+            future = self.executor.submit(lambda realm=realm: list(realm_check(realm)))
+            deadline = None
+            if self.realm_timeout:
+                deadline = time.monotonic() + self.realm_timeout
+            deadlines[future] = (realm, deadline)
+        pending = set(deadlines)
+
+        try:
+            while pending:
+                expirations = [deadlines[future][1] for future in pending
+                               if deadlines[future][1] is not None]
+                timeout = (max(0, min(expirations) - time.monotonic())
+                           if expirations else None)
+                done, pending = futures.wait(pending, timeout=timeout,
+                                             return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+                now = time.monotonic()
+                expired = {future for future in pending
+                           if deadlines[future][1] is not None and
+                           deadlines[future][1] <= now}
+                for future in expired:
+                    msg = ("Realm {0} did not respond within {1} seconds.  "
+                           "It is treated as denying every item.".
+                           format(getattr(deadlines[future][0], 'name', None),
+                                  self.realm_timeout))
+                    logger.warning(msg)
+                    future.cancel()
+                    yield [(item, False) for item in item_s]
+                pending -= expired
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self, wait=True):
+        """
+        Stops the threads of the realm executor and of the warm-up executor,
+        if either was created.  The executors are also shut down, without
+        waiting, once the authorizer is garbage collected.
+        """
+        for executor in (self.executor, self.warm_up_executor):
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self.executor = None
+        self.warm_up_executor = None
+
     # new to Yosai:
     def _has_role(self, identifiers, role_s):
         """
         :type identifiers:  subject_abcs.IdentifierCollection
         :type role_s: Set of String(s)
         """
-        for realm in self.realms:
+        realms = self.route_realms(identifiers)
+        if self.fans_out(realms):
+            for results in self._fan_out(
+                    realms, lambda realm: realm.has_role(identifiers, role_s),
+                    role_s):
+                yield from results
+            return
+
+        for realm in realms:
             # the realm's has_role returns a generator
             yield from realm.has_role(identifiers, role_s)
 
@@ -204,11 +1244,97 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         :param permission_s: a collection of 1..N permissions
         :type permission_s: List of permission string(s)
         """
-
-        for realm in self.realms:
+        realms = self.route_realms(identifiers)
+        if self.fans_out(realms):
+            for results in self._fan_out(
+                    realms,
+                    lambda realm: realm.is_permitted(identifiers, permission_s),
+                    permission_s):
+                yield from results
+            return
+
+        for realm in realms:
             # the realm's is_permitted returns a generator
             yield from realm.is_permitted(identifiers, permission_s)
 
+    # new to Yosai:
+    def _evaluate_collective(self, realms, realm_check, item_s, logical_operator):
+        """
+        Lazily evaluates the any or all of the results that the realms yield
+        for item_s, returning as soon as the outcome is certain.  Realms are
+        consulted one at a time and only for the items that remain undecided,
+        so realms after an outcome is certain are never queried:
+
+            - any: the first grant decides the outcome
+            - all: an item is denied once every realm has denied it, so the
+                   first denial yielded by the last realm consulted decides
+                   the outcome
+
+        :param realm_check: obtains a realm's generator of (item, Boolean)
+                            tuples, such as lambda realm, items:
+                            realm.is_permitted(identifiers, items)
+
+        :type logical_operator: any OR all (from python standard library)
+
+        :returns: a Boolean
+        """
+        if self.fans_out(realms):
+            return self._evaluate_collective_concurrently(
+                realms, realm_check, item_s, logical_operator)
+
+        pending = list(item_s)
+        last = len(realms) - 1
+
+        for position, realm in enumerate(realms):
+            if not pending:
+                break
+
+            granted = set()
+            for item, result in realm_check(realm, pending):
+                if result:
+                    if logical_operator is any:
+                        return True
+                    granted.add(item)
+                elif logical_operator is all and position == last:
+                    return False
+
+            if logical_operator is all:
+                pending = [item for item in pending if item not in granted]
+
+        # any:  no realm granted an item;  all:  whether every item was granted
+        return logical_operator is all and not pending
+
+    # new to Yosai:
+    def _evaluate_collective_concurrently(self, realms, realm_check, item_s,
+                                          logical_operator):
+        """
+        The concurrent counterpart of _evaluate_collective:  every realm is
+        consulted at once and evaluation returns as soon as the realms that
+        have responded determine the outcome, cancelling the others:
+
+            - any: the first grant decides the outcome
+            - all: the outcome is True once every item is granted, and False
+                   only once every realm has responded (or timed out)
+
+        :returns: a Boolean
+        """
+        required = set(item_s)
+        granted = set()
+
+        for results in self._fan_out(realms,
+                                     lambda realm: realm_check(realm, item_s),
+                                     item_s):
+            for item, result in results:
+                if result:
+                    if logical_operator is any:
+                        return True
+                    granted.add(item)
+
+            if logical_operator is all and granted >= required:
+                return True
+
+        return logical_operator is all and granted >= required
+
     def is_permitted(self, identifiers, permission_s, log_results=True):
         """
         Yosai differs from Shiro in how it handles String-typed Permission
@@ -250,6 +1376,95 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         results = set(results.items())
         return results
 
+    def filter_permitted(self, identifiers, permission, targets):
+        """
+        Filters targets to those for which the permission is granted by any
+        of the realms.  Each realm is consulted only for those targets that
+        the realms consulted before it have not permitted.
+
+        :param identifiers: a collection of identifiers
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param permission: a domain and actions, such as 'document:read'
+        :type permission: str
+
+        :param targets: the target ids to filter
+        :type targets: a sequence of str or int
+
+        :returns: a list of the permitted targets, ordered as targets
+        """
+        self.assert_realms_configured()
+
+        targets = list(targets)
+        pending = targets
+        permitted = set()
+
+        for realm in self.route_realms(identifiers):
+            if not pending:
+                break
+            permitted.update(realm.filter_permitted(identifiers,
+                                                    permission,
+                                                    pending))
+            pending = [target for target in pending
+                       if target not in permitted]
+
+        return [target for target in targets if target in permitted]
+
+    def target_predicate(self, identifiers, permission):
+        """
+        Compiles the targets for which any of the realms permits the
+        permission into a TargetPredicate.
+
+        :param identifiers: a collection of identifiers
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param permission: a domain and actions, such as 'blogpost:edit'
+        :type permission: str
+
+        :rtype: TargetPredicate
+        """
+        self.assert_realms_configured()
+
+        targets = set()
+        for realm in self.route_realms(identifiers):
+            permits_all, permitted = realm.permitted_targets(identifiers,
+                                                             permission)
+            if permits_all:
+                return TargetPredicate(permits_all=True)
+            targets.update(permitted)
+
+        return TargetPredicate(targets=targets)
+
+    def permitted_actions(self, identifiers, domain, target=None):
+        """
+        Obtains the actions of the domain that any of the realms permits, such
+        as those of the menu items to render, rather than checking each
+        action's permission.  Wildcard actions are expanded against the
+        domain's action_catalog, when one is declared (AUTHZ_CONFIG).
+
+        :param identifiers: a collection of identifiers
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :type domain: str
+
+        :param target: the target acted upon, or None for any target
+        :type target: str or int
+
+        :returns: a frozenset of the permitted actions
+        """
+        self.assert_realms_configured()
+
+        catalog = self.action_catalog.get(domain)
+        actions = set()
+
+        for realm in self.route_realms(identifiers):
+            actions.update(realm.permitted_actions(identifiers, domain,
+                                                   target, catalog))
+            if catalog is not None and actions >= catalog:
+                break
+
+        return frozenset(actions)
+
     # yosai.core.refactored is_permitted_all to support ANY or ALL operations
     def is_permitted_collective(self, identifiers,
                                 permission_s, logical_operator):
@@ -268,12 +1483,18 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         """
         self.assert_realms_configured()
 
-        # interim_results is a set of tuples:
-        interim_results = self.is_permitted(identifiers, permission_s,
-                                            log_results=False)
+        if logical_operator in (any, all):
+            results = self._evaluate_collective(
+                self.route_realms(identifiers),
+                lambda realm, pending: realm.is_permitted(identifiers, pending),
+                permission_s, logical_operator)
+        else:
+            # interim_results is a set of tuples:
+            interim_results = self.is_permitted(identifiers, permission_s,
+                                                log_results=False)
 
-        results = logical_operator(is_permitted for perm, is_permitted
-                                   in interim_results)
+            results = logical_operator(is_permitted for perm, is_permitted
+                                       in interim_results)
 
         if results:
             self.notify_event(identifiers,
@@ -365,11 +1586,17 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         """
         self.assert_realms_configured()
 
-        # interim_results is a set of tuples:
-        interim_results = self.has_role(identifiers, role_s, log_results=False)
+        if logical_operator in (any, all):
+            results = self._evaluate_collective(
+                self.route_realms(identifiers),
+                lambda realm, pending: realm.has_role(identifiers, pending),
+                role_s, logical_operator)
+        else:
+            # interim_results is a set of tuples:
+            interim_results = self.has_role(identifiers, role_s, log_results=False)
 
-        results = logical_operator(has_role for role, has_role
-                                   in interim_results)
+            results = logical_operator(has_role for role, has_role
+                                       in interim_results)
 
         if results:
             self.notify_event(identifiers,
@@ -425,9 +1652,34 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
                 realm.clear_cached_authorization_info(identifier)
         except AttributeError:
             msg = ('Could not clear authc_info from cache after event. '
-                   'identifiers: ' + identifiers)
+                   'identifiers: ' + str(identifier))
             logger.warn(msg)
 
+        # warming follows clearing, within this listener, to be ordered:
+        if self.warm_up_enabled:
+            self.warm_up_cache(identifier)
+
+    # new to Yosai:
+    def warm_up_cache(self, identifier):
+        """
+        Has every realm cache the roles and permissions of the identifier,
+        using the warm_up_executor when there is one.  Warming up is a
+        best-effort optimization:  failures are logged rather than raised.
+        """
+        def warm_up():
+            for realm in self.realms:
+                try:
+                    realm.warm_authz_cache(identifier)
+                except Exception:
+                    msg = ('Could not warm up the authz_info of [{0}] for realm '
+                           '{1}'.format(identifier, getattr(realm, 'name', realm)))
+                    logger.warning(msg, exc_info=True)
+
+        if self.warm_up_executor is not None:
+            self.warm_up_executor.submit(warm_up)
+        else:
+            warm_up()
+
     def register_cache_clear_listener(self):
 
         try:
@@ -0,0 +1,42 @@
+class AuthorizationSettings:
+    """
+    AuthorizationSettings is a settings proxy.  It is new for Yosai.
+    It obtains the authz configuration from Yosai's global settings
+    and default values if there aren't any.
+    """
+    def __init__(self, settings):
+        self.authz_config = settings.AUTHZ_CONFIG or {}
+
+        # memoizes a subject's authorization decisions for the duration of a
+        # Yosai.context block (a request), def: disabled
+        self.decision_memo_enabled = self.authz_config.get('decision_memo', False)
+
+        # realms are consulted concurrently, on a thread pool of max_workers,
+        # only when max_workers is set:
+        realm_executor = self.authz_config.get('realm_executor') or {}
+        self.realm_executor_max_workers = realm_executor.get('max_workers')
+        self.realm_timeout = realm_executor.get('timeout')  # seconds
+
+        # only the realms that authenticated an identity authorize it, when
+        # every realm both authenticates and authorizes its own accounts:
+        self.route_by_identity = self.authz_config.get('route_by_identity', False)
+
+        # roles and permissions are cached once authentication succeeds:
+        warm_up = self.authz_config.get('warm_up') or {}
+        self.warm_up_enabled = warm_up.get('enabled', False)
+        self.warm_up_asynchronous = warm_up.get('asynchronous', True)
+
+        # the actions of each domain, such that permitted_actions can expand
+        # wildcard grants, ie. {'invoice': ['create', 'void', 'export']}
+        action_catalog = self.authz_config.get('action_catalog') or {}
+        self.action_catalog = {domain: frozenset(actions)
+                               for domain, actions in action_catalog.items()}
+
+    def __repr__(self):
+        return ("AuthorizationSettings(decision_memo_enabled={0}, "
+                "realm_executor_max_workers={1}, realm_timeout={2}, "
+                "warm_up_enabled={3})".
+                format(self.decision_memo_enabled,
+                       self.realm_executor_max_workers,
+                       self.realm_timeout,
+                       self.warm_up_enabled))
@@ -38,5 +38,70 @@ class StoppableScheduledExecutor(threading.Thread):
             if self.event.wait(self.interval):
                 return
 
+
+class ConcurrencyLimiter:
+    """
+    A bulkhead:  admits up to max_concurrent callers at once, queues up to
+    max_queued more for at most queue_timeout seconds each, and turns away
+    the rest immediately rather than letting them pile up.
+    """
+
+    def __init__(self, max_concurrent, max_queued=0, queue_timeout=None):
+        """
+        :param max_concurrent: the number of callers admitted at once
+        :type max_concurrent: int
+
+        :param max_queued: the number of callers that may wait for admission
+        :type max_queued: int
+
+        :param queue_timeout: the seconds a caller waits before it is turned
+                              away, or None to wait indefinitely
+        :type queue_timeout: float
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued or 0
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, blocking=True):
+        """
+        :param blocking: whether the caller may queue when none can be admitted
+        :returns: whether the caller is admitted, in which case it must release
+        :rtype: bool
+        """
+        with self.condition:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return True
+
+            if not blocking or self.queued >= self.max_queued:
+                return False
+
+            self.queued += 1
+            try:
+                admitted = self.condition.wait_for(
+                    lambda: self.active < self.max_concurrent,
+                    self.queue_timeout)
+            finally:
+                self.queued -= 1
+
+            if admitted:
+                self.active += 1
+            return admitted
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+
+    def __repr__(self):
+        return ("ConcurrencyLimiter(max_concurrent={0}, max_queued={1}, "
+                "active={2}, queued={3})".format(self.max_concurrent,
+                                                 self.max_queued,
+                                                 self.active, self.queued))
+
+
 # yosai.core.omits ThreadContext because it is replaced by the standard library
 # threading.local() object
@@ -37,6 +37,7 @@ class EventLogger:
         eventbus.subscribe(self.log_authc_event, 'AUTHENTICATION.SUCCEEDED')
 
         eventbus.subscribe(self.log_authc_event, 'AUTHENTICATION.FAILED')
+        eventbus.subscribe(self.log_authc_event, 'AUTHENTICATION.THROTTLED')
         eventbus.subscribe(self.log_authz_event, 'AUTHORIZATION.GRANTED')
         eventbus.subscribe(self.log_authz_event, 'AUTHORIZATION.DENIED')
         eventbus.subscribe(self.log_authz_event, 'AUTHORIZATION.RESULTS')
@@ -61,6 +61,18 @@ class AccountException(AuthenticationException):
     pass
 
 
+class ExcessiveAttemptsException(YosaiException):
+    """
+    Raises when authentication is attempted more often than is allowed for an
+    identifier or host, before the attempt is processed
+    """
+    def __init__(self, retry_after=None):
+        """
+        the seconds after which an attempt would be processed
+        """
+        self.retry_after = retry_after
+
+
 class IncorrectCredentialsException(AuthenticationException):
     def __init__(self, failed_attempts=None):
         """
@@ -81,6 +93,15 @@ class LockedAccountException(YosaiException):
     pass
 
 
+class AuthenticationOverloadedException(YosaiException):
+    """
+    Raises when credentials are not verified because as many verifications
+    as are allowed are already in progress or waiting.  It is not a failed
+    authentication attempt:  the client ought to retry later.
+    """
+    pass
+
+
 class MultiRealmAuthenticationException(AuthenticationException):
 
     def __init__(self, realm_errors):
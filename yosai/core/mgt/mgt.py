@@ -25,6 +25,7 @@ from abc import abstractmethod
 from yosai.core import (
     AdditionalAuthenticationRequired,
     AuthenticationException,
+    AuthorizationSettings,
     DefaultAuthenticator,
     DelegatingSubject,
     EventLogger,
@@ -34,6 +35,7 @@ from yosai.core import (
     SubjectStore,
     InvalidSessionException,
     ModularRealmAuthorizer,
+    PermissionCodec,
     RememberMeSettings,
     event_bus,
     mgt_abcs,
@@ -347,7 +349,7 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
                  realms=None,
                  cache_handler=None,
                  authenticator=None,
-                 authorizer=ModularRealmAuthorizer(),
+                 authorizer=None,
                  serialization_manager=None,
                  session_manager=None,
                  remember_me_manager=None,
@@ -362,7 +364,10 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
             session_manager = NativeSessionManager(settings)
         self.session_manager = session_manager
 
+        if not authorizer:
+            authorizer = ModularRealmAuthorizer(settings)
         self.authorizer = authorizer
+        self.authz_settings = AuthorizationSettings(settings)
 
         if not authenticator:
             authenticator = DefaultAuthenticator(settings)
@@ -375,15 +380,29 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
         self.apply_event_bus(event_bus)
 
         self.apply_cache_handler(cache_handler)
+        self.apply_serialization_manager(serialization_manager)
         self.apply_realms()
 
     def apply_cache_handler(self, cache_handler):
         for realm in self.realms:
             if hasattr(realm, 'cache_handler'):  # implies cache support
                 realm.cache_handler = cache_handler
+        if hasattr(self.authenticator, 'apply_cache_handler'):
+            self.authenticator.apply_cache_handler(cache_handler)
         if hasattr(self.session_manager, 'apply_cache_handler'):
             self.session_manager.apply_cache_handler(cache_handler)
 
+    def apply_serialization_manager(self, serialization_manager):
+        """
+        Realms that cache permissions in the compact format serialize them
+        with the configured serialization manager.
+        """
+        if serialization_manager is None:
+            return
+        for realm in self.realms:
+            if hasattr(realm, 'permission_codec'):
+                realm.permission_codec = PermissionCodec(serialization_manager)
+
     def apply_event_bus(self, eventbus):
         self.authenticator.event_bus = eventbus
         self.authorizer.event_bus = eventbus
@@ -409,6 +428,46 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
         """
         return self.authorizer.is_permitted(identifiers, permission_s)
 
+    def filter_permitted(self, identifiers, permission, targets):
+        """
+        :type identifiers: SimpleIdentifierCollection
+
+        :param permission: a domain and actions, such as 'document:read'
+        :type permission: str
+
+        :param targets: the target ids to filter
+        :type targets: a sequence of str or int
+
+        :returns: a list of the permitted targets
+        """
+        return self.authorizer.filter_permitted(identifiers, permission, targets)
+
+    def target_predicate(self, identifiers, permission):
+        """
+        :type identifiers: SimpleIdentifierCollection
+
+        :param permission: a domain and actions, such as 'blogpost:edit'
+        :type permission: str
+
+        :rtype: TargetPredicate
+        """
+        return self.authorizer.target_predicate(identifiers, permission)
+
+    def permitted_actions(self, identifiers, domain, target=None):
+        """
+        :type identifiers: SimpleIdentifierCollection
+
+        :param domain: the domain whose permitted actions are obtained,
+                       such as 'invoice'
+        :type domain: str
+
+        :param target: the target acted upon, or None for any target
+        :type target: str or int
+
+        :returns: a frozenset of the permitted actions
+        """
+        return self.authorizer.permitted_actions(identifiers, domain, target)
+
     def is_permitted_collective(self, identifiers, permission_s, logical_operator):
         """
         :type identifiers: SimpleIdentifierCollection
@@ -718,7 +777,8 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
                                  host=host,
                                  session=session,
                                  session_creation_enabled=session_creation_enabled,
-                                 security_manager=security_manager)
+                                 security_manager=security_manager,
+                                 decision_memo_enabled=self.authz_settings.decision_memo_enabled)
 
     def save(self, subject):
         """
@@ -77,6 +77,51 @@ class SecurityManagerSettings:
                 if permission_verifier_cls:
                     verifiers['permission_verifier'] = maybe_resolve(permission_verifier_cls)()
 
+            # seconds that a compiled PermissionIndex is reused in-process:
+            permission_index_ttl = realm_attributes.get('permission_index_ttl')
+            if permission_index_ttl:
+                verifiers['permission_index_ttl'] = permission_index_ttl
+
+            # seconds that the absence of account data is cached, per domain:
+            negative_cache_ttl = realm_attributes.get('negative_cache_ttl')
+            if negative_cache_ttl:
+                verifiers['negative_cache_ttl'] = negative_cache_ttl
+
+            # stamps cached authz info with realm and role generations:
+            authz_generations = realm_attributes.get('authz_generations')
+            if authz_generations:
+                verifiers['authz_generations'] = authz_generations
+
+            # caches roles and permissions together, as one record:
+            combined_authz_cache = realm_attributes.get('combined_authz_cache')
+            if combined_authz_cache:
+                verifiers['combined_authz_cache'] = combined_authz_cache
+
+            # seconds that permission check results are shared across nodes:
+            decision_cache_ttl = realm_attributes.get('decision_cache_ttl')
+            if decision_cache_ttl:
+                verifiers['decision_cache_ttl'] = decision_cache_ttl
+
+            # decisions shared per identifier, beyond which the oldest are dropped:
+            decision_cache_maxsize = realm_attributes.get('decision_cache_maxsize')
+            if decision_cache_maxsize:
+                verifiers['decision_cache_maxsize'] = decision_cache_maxsize
+
+            # removes redundant permissions before they are cached:
+            minimize_permissions = realm_attributes.get('minimize_permissions')
+            if minimize_permissions:
+                verifiers['minimize_permissions'] = minimize_permissions
+
+            # 'json' or 'compact', the format in which permissions are cached:
+            permission_wire_format = realm_attributes.get('permission_wire_format')
+            if permission_wire_format:
+                verifiers['permission_wire_format'] = permission_wire_format
+
+            # seconds that a successful password verification is remembered:
+            verified_credentials_ttl = realm_attributes.get('verified_credentials_ttl')
+            if verified_credentials_ttl:
+                verifiers['verified_credentials_ttl'] = verified_credentials_ttl
+
             realms.append([realm_cls, account_store_cls, verifiers])
 
         return realms
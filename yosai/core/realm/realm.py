@@ -16,18 +16,28 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import collections
+import hashlib
+import hmac
 import logging
+import os
+import threading
 from uuid import uuid4
 import time
 from yosai.core import (
     AccountException,
     ConsumedTOTPToken,
     Permission,
+    PermissionIndex,
+    PermissionMinimizer,
+    permission_codec,
+    RoleHierarchy,
     DefaultPermissionVerifier,
     IncorrectCredentialsException,
     LockedAccountException,
     SimpleIdentifierCollection,
     TOTPToken,
+    account_abcs,
     realm_abcs,
 )
 
@@ -47,22 +57,184 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             - as of shiro v2 alpha rev1693638, shiro doesn't (yet)
     """
 
+    # the field of cached permissions that holds the stamp of the generations
+    # of the identifier's roles, which no domain name can collide with:
+    ROLES_STAMP_KEY = ':stamp'
+
     def __init__(self,
                  name='AccountStoreRealm_' + str(uuid4()),
                  account_store=None,
                  authc_verifiers=None,
-                 permission_verifier=DefaultPermissionVerifier()):
+                 permission_verifier=DefaultPermissionVerifier(),
+                 permission_index_ttl=None,
+                 permission_index_maxsize=10000,
+                 negative_cache_ttl=None,
+                 negative_cache_maxsize=10000,
+                 authz_generations=False,
+                 generation_check_interval=1,
+                 combined_authz_cache=False,
+                 decision_cache_ttl=None,
+                 decision_cache_maxsize=256,
+                 minimize_permissions=False,
+                 permission_wire_format='json',
+                 verified_credentials_ttl=None,
+                 verified_credentials_maxsize=10000):
         """
         :authc_verifiers: tuple of Verifier objects
+
+        :param permission_verifier: evaluates permissions unless it is a
+                                    DefaultPermissionVerifier, whose
+                                    evaluation a PermissionIndex compiles (see
+                                    uses_permission_index)
+
+        :param permission_index_ttl: the number of seconds that a compiled
+                                     PermissionIndex is used before it is
+                                     recompiled from the authorization cache,
+                                     or None to compile one per check.  An
+                                     index is cleared only in the process
+                                     that clears the authorization info, so
+                                     other processes use it for up to as
+                                     long.
+
+        :param permission_index_maxsize: the maximum number of identifiers
+                                         whose PermissionIndex is kept, beyond
+                                         which the least recently used are
+                                         forgotten
+
+        :param negative_cache_ttl: the number of seconds that the absence of
+                                   account data is remembered, for each of the
+                                   'authentication', 'authorization:permissions'
+                                   and 'authorization:roles' cache domains.
+                                   Absences aren't remembered for a domain
+                                   without a ttl.
+        :type negative_cache_ttl: dict
+
+        :param negative_cache_maxsize: the maximum number of absences
+                                       remembered, beyond which the oldest
+                                       are forgotten
+
+        :param authz_generations: whether cached authorization info is stamped
+                                  with the generations of the realm and of
+                                  the roles it was obtained under, see
+                                  bump_authz_generation
+        :type authz_generations: bool
+
+        :param generation_check_interval: the number of seconds that the
+                                          generations are used before they are
+                                          obtained from the cache again
+
+        :param combined_authz_cache: whether an identifier's roles and
+                                     permissions are cached together, as one
+                                     'authorization:info' record obtained with
+                                     a single request, rather than as separate
+                                     'authorization:roles' and
+                                     'authorization:permissions' entries
+        :type combined_authz_cache: bool
+
+        :param decision_cache_ttl: the number of seconds that the result of a
+                                   permission check is shared, by way of the
+                                   cache_handler, with every process of the
+                                   realm, or None not to share results
+
+        :param decision_cache_maxsize: the maximum number of decisions shared
+                                       for an identifier, beyond which those
+                                       expiring soonest are dropped
+
+        :param minimize_permissions: whether the permissions obtained from the
+                                     account_store are minimized (see
+                                     PermissionMinimizer) before they are
+                                     cached
+        :type minimize_permissions: bool
+
+        :param permission_wire_format: the format in which permissions are
+                                       cached, 'json' or 'compact' (see
+                                       PermissionCodec).  Either format is
+                                       read.
+        :type permission_wire_format: str
+
+        :param verified_credentials_ttl: the number of seconds that a
+                                         successful password verification is
+                                         remembered, in-process, so that the
+                                         same credentials submitted again
+                                         aren't hashed again, or None not to
+                                         remember verifications
+
+        :param verified_credentials_maxsize: the maximum number of identifiers
+                                             whose verification is remembered,
+                                             beyond which the oldest are
+                                             forgotten
         """
         self.name = name
         self.account_store = account_store
         self.authc_verifiers = authc_verifiers  # a tuple
         self.permission_verifier = permission_verifier
 
+        # identifier -> PermissionIndex, compiled in-process:
+        self.permission_indexes = collections.OrderedDict()
+        self.permission_index_ttl = permission_index_ttl
+        self.permission_index_maxsize = permission_index_maxsize
+        self.permission_indexes_lock = threading.Lock()
+        # counts the invalidations of indexes, so that an index compiled
+        # before an invalidation isn't kept after it:
+        self.permission_index_invalidations = 0
+
+        # (domain, identifier) -> expiration time, compiled in-process:
+        self.negative_cache = collections.OrderedDict()
+        self.negative_cache_ttl = negative_cache_ttl or {}
+        self.negative_cache_maxsize = negative_cache_maxsize
+        self.negative_cache_lock = threading.Lock()
+
+        # loaded from the account_store once, when first used:
+        self._role_hierarchy = None
+        self._role_hierarchy_lock = threading.Lock()
+
+        self.authz_generations = authz_generations
+        self.generation_check_interval = generation_check_interval
+        self._generations = None
+        self._generations_obtained = 0
+        self._generations_lock = threading.Lock()
+
+        self.combined_authz_cache = combined_authz_cache
+        self.decision_cache_ttl = decision_cache_ttl
+        self.decision_cache_maxsize = decision_cache_maxsize
+        self.permission_minimizer = (PermissionMinimizer()
+                                     if minimize_permissions else None)
+
+        if permission_wire_format not in ('json', 'compact'):
+            msg = "Unsupported permission_wire_format: " + str(permission_wire_format)
+            raise ValueError(msg)
+        self.permission_wire_format = permission_wire_format
+        # replaced by a codec of the configured SerializationManager:
+        self.permission_codec = permission_codec
+
+        # identifier -> (hmac digest, expiration time), compiled in-process.
+        # Digests are keyed by a secret that never leaves the process:
+        self.verified_credentials = collections.OrderedDict()
+        self.verified_credentials_ttl = verified_credentials_ttl
+        self.verified_credentials_maxsize = verified_credentials_maxsize
+        self.verified_credentials_secret = os.urandom(32)
+        self.verified_credentials_lock = threading.Lock()
+
         self.cache_handler = None
         self.token_resolver = self.init_token_resolution()
 
+    @property
+    def role_hierarchy(self):
+        """
+        The RoleHierarchy of the account_store, loaded when first used, or
+        None when the account_store doesn't define one (and no inheritance
+        has been added since).
+
+        :rtype: RoleHierarchy
+        """
+        if (self._role_hierarchy is None and
+                isinstance(self.account_store,
+                           account_abcs.RoleHierarchyAccountStore)):
+            self._role_hierarchy = RoleHierarchy(
+                self.account_store.get_role_hierarchy(),
+                self.account_store.get_role_permissions())
+        return self._role_hierarchy
+
     @property
     def supported_authc_tokens(self):
         """
@@ -105,6 +277,8 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         msg = "Clearing cached authc_info for [{0}]".format(identifier)
         logger.debug(msg)
 
+        self.forget_negative_result('authentication', identifier)
+        self.forget_verified_credentials(identifier)
         self.cache_handler.delete('authentication:' + self.name, identifier)
 
     def clear_cached_authorization_info(self, identifier):
@@ -122,14 +296,209 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         """
         msg = "Clearing cached authz_info for [{0}]".format(identifier)
         logger.debug(msg)
+        self.forget_negative_result('authorization:permissions', identifier)
+        self.forget_negative_result('authorization:roles', identifier)
+
+        if self.decision_cache_ttl:
+            self.cache_handler.delete(
+                'authorization:decisions:' + self.name,
+                self.get_authz_cache_identifier(identifier,
+                                                'authorization:decisions'))
+
+        if self.combined_authz_cache:
+            self.forget_negative_result('authorization:info', identifier)
+            self.cache_handler.delete(
+                'authorization:info:' + self.name,
+                self.get_authz_cache_identifier(identifier, 'authorization:info'))
+            self.forget_permission_index(identifier)
+            return
+
         key = 'authorization:permissions:' + self.name
-        self.cache_handler.delete(key, identifier)
+        self.cache_handler.delete(
+            key, self.get_authz_cache_identifier(identifier,
+                                                 'authorization:permissions'))
+
+        # once the cache no longer holds the stale permissions:
+        self.forget_permission_index(identifier)
+
+    def is_negatively_cached(self, domain, identifier):
+        """
+        Determines whether the account store recently had no data of the
+        cache domain for the identifier.
+
+        :param domain: 'authentication', 'authorization:permissions',
+                       'authorization:roles' or 'authorization:info'
+        :type identifier: str
+
+        :returns: a Boolean
+        """
+        with self.negative_cache_lock:
+            expiration = self.negative_cache.get((domain, identifier))
+            if expiration is None:
+                return False
+
+            if expiration > time.time():
+                return True
+
+            self.negative_cache.pop((domain, identifier), None)
+            return False
+
+    def cache_negative_result(self, domain, identifier):
+        """
+        Remembers that the account store has no data of the cache domain for
+        the identifier, for the negative_cache_ttl of the domain.
+
+        :param domain: 'authentication', 'authorization:permissions',
+                       'authorization:roles' or 'authorization:info'
+        :type identifier: str
+        """
+        ttl = self.negative_cache_ttl.get(domain)
+        if not ttl:
+            return
+
+        key = (domain, identifier)
+        with self.negative_cache_lock:
+            self.negative_cache.pop(key, None)
+            self.negative_cache[key] = time.time() + ttl
+
+            while len(self.negative_cache) > self.negative_cache_maxsize:
+                self.negative_cache.popitem(last=False)
+
+    def forget_negative_result(self, domain, identifier):
+        with self.negative_cache_lock:
+            self.negative_cache.pop((domain, identifier), None)
+
+    # --------------------------------------------------------------------------
+    # Authorization Generations
+    # --------------------------------------------------------------------------
+
+    def get_authz_generations(self):
+        """
+        Obtains the generations of the realm and of its roles, shared by way of
+        the cache_handler and re-obtained at most once per
+        generation_check_interval.
+
+        :returns: a dict, such as {'realm': 3, 'roles': {'editor': 1}}
+        """
+        now = time.time()
+        if (self._generations is None or
+                now - self._generations_obtained > self.generation_check_interval):
+            try:
+                generations = self.cache_handler.get(
+                    domain='authorization:generations:' + self.name,
+                    identifier=self.name)
+            except AttributeError:
+                # this means the cache_handler isn't configured
+                generations = None
+
+            self._generations = generations or {'realm': 0, 'roles': {}}
+            self._generations_obtained = now
+
+        return self._generations
+
+    def bump_authz_generation(self, role=None):
+        """
+        Makes stale, with one write, the cached authorization info of every
+        identifier of the realm or, given a role, of every identifier that is
+        a member of the role (such as after revoking a permission from it).
+        Entries made stale by the realm generation are no longer obtained,
+        expiring with their ttl, whereas those made stale by a role's
+        generation are replaced once they are next obtained.
+
+        Generations are updated read-modify-write:  bumps made concurrently
+        by different processes may be lost, so bumping the realm generation
+        is the safer choice for bulk changes made from several processes.
+
+        :param role: the role whose members' authorization info is stale, or
+                     None for every identifier of the realm
+        :type role: str
+        """
+        if not self.authz_generations:
+            msg = "{0} does not stamp authorization info with generations".\
+                format(self.name)
+            raise ValueError(msg)
+
+        with self._generations_lock:
+            self._generations = None  # obtain the current generations
+            current = self.get_authz_generations()
+            generations = {'realm': current.get('realm', 0),
+                           'roles': dict(current.get('roles', {}))}
+
+            if role is None:
+                generations['realm'] += 1
+            else:
+                generations['roles'][role] = generations['roles'].get(role, 0) + 1
+
+            self.cache_handler.set(domain='authorization:generations:' + self.name,
+                                   identifier=self.name,
+                                   value=generations)
+            self._generations = generations
+            self._generations_obtained = time.time()
+
+        # compiled permission indexes are stamped likewise:
+        self.forget_permission_index()
+
+    def get_authz_cache_identifier(self, identifier, domain):
+        """
+        Obtains the identifier under which the authorization info of the
+        domain is cached:  stamped with the realm generation.  Without
+        authz_generations, it is the identifier.
+
+        Cached permissions, a combined 'authorization:info' record and shared
+        decisions hold the stamp of the generations of the identifier's
+        roles, which is verified once they are obtained (see
+        get_authzd_domain_permissions, get_authz_info and
+        get_cached_decisions), so that they are cleared without obtaining
+        the identifier's roles.
+
+        :param domain: 'authorization:permissions', 'authorization:roles',
+                       'authorization:info' or 'authorization:decisions'
+        :returns: str
+        """
+        if not self.authz_generations:
+            return identifier
+
+        stamp = self.get_authz_generations().get('realm', 0)
+
+        return '{0}@{1}'.format(identifier, stamp)
+
+    def get_roles_stamp(self, identifier):
+        """
+        :returns: the digest of the generations of the identifier's roles, or
+                  None when roles have no generations, in which case the
+                  roles aren't obtained
+        """
+        if (not self.authz_generations or
+                not self.get_authz_generations().get('roles')):
+            return None
+        return self.get_role_generations_stamp(self.get_authzd_roles(identifier))
+
+    def get_role_generations_stamp(self, role_s):
+        """
+        :returns: a digest of the generations of the roles (and of the roles
+                  that they imply), or None when none has a generation
+        """
+        role_generations = self.get_authz_generations().get('roles')
+        if not role_generations:
+            return None
+
+        hierarchy = self.role_hierarchy
+        if hierarchy is not None:
+            role_s = hierarchy.expand(role_s)
+
+        held = sorted((role, role_generations[role]) for role in role_s
+                      if role in role_generations)
+        if not held:
+            return None
+
+        return hashlib.sha1(repr(held).encode('utf-8')).hexdigest()[:16]
 
     def lock_account(self, identifier):
         """
         :type account: Account
         """
         locked_time = int(time.time() * 1000)  # milliseconds
+        self.forget_verified_credentials(identifier)
         self.account_store.lock_account(identifier, locked_time)
 
     def unlock_account(self, identifier):
@@ -142,6 +511,41 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
     # Authentication
     # --------------------------------------------------------------------------
 
+    def get_editable_role_hierarchy(self):
+        """
+        :returns: the role_hierarchy or, when the account_store doesn't define
+                  one, an empty RoleHierarchy that is then the role_hierarchy
+        :rtype: RoleHierarchy
+        """
+        with self._role_hierarchy_lock:
+            if self.role_hierarchy is None:
+                self._role_hierarchy = RoleHierarchy()
+            return self._role_hierarchy
+
+    def add_role_inheritance(self, parent, child):
+        """
+        Makes the parent role imply the child role, updating the closure of the
+        role_hierarchy incrementally.
+
+        The role_hierarchy is held in-process:  an edit is neither stored by
+        the account_store nor shared with other processes, which keep the
+        inheritance that they loaded until the same edit is made in them or
+        they restart.  Change the account_store's hierarchy too for the edit
+        to outlive the process.
+        """
+        self.get_editable_role_hierarchy().add_inheritance(parent, child)
+        # compiled permission indexes include permissions obtained by role:
+        self.forget_permission_index()
+
+    def remove_role_inheritance(self, parent, child):
+        """
+        Stops the parent role from implying the child role, updating the
+        closure of the role_hierarchy incrementally.  As with
+        add_role_inheritance, the edit is made in-process only.
+        """
+        self.get_editable_role_hierarchy().remove_inheritance(parent, child)
+        self.forget_permission_index()
+
     def get_authentication_info(self, identifier):
         """
         The default authentication caching policy is to cache an account's
@@ -159,6 +563,12 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         account_info = None
         ch = self.cache_handler
 
+        if self.is_negatively_cached('authentication', identifier):
+            msg = ("No account credentials found for identifiers [{0}] "
+                   "(negatively cached).  Returning None.".format(identifier))
+            logger.debug(msg)
+            return None
+
         def query_authc_info(self):
             msg = ("Could not obtain cached credentials for [{0}].  "
                    "Will try to acquire credentials from account store."
@@ -192,6 +602,7 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             msg3 = ("No account credentials found for identifiers [{0}].  "
                     "Returning None.".format(identifier))
             logger.warning(msg3)
+            self.cache_negative_result('authentication', identifier)
 
         if account_info:
             account_info['account_id'] = SimpleIdentifierCollection(source_name=self.name,
@@ -256,6 +667,14 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         """
         cred_type = authc_token.token_info['cred_type']
 
+        # one-time totp tokens are always verified:
+        remembered = (self.verified_credentials_ttl and
+                      not isinstance(authc_token, TOTPToken))
+        if remembered:
+            digest = self.get_verified_credentials_digest(authc_token, account)
+            if self.is_verified_credentials(authc_token.identifier, digest):
+                return
+
         try:
             verifier.verify_credentials(authc_token, account['authc_info'])
         except IncorrectCredentialsException:
@@ -271,6 +690,56 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
                                    identifier=authc_token.identifier,
                                    value=account)
 
+        if remembered:
+            self.remember_verified_credentials(authc_token.identifier, digest)
+
+    def get_verified_credentials_digest(self, authc_token, account):
+        """
+        An HMAC of the realm, the identifier and the submitted credentials,
+        which also covers the stored credential so that a changed password
+        invalidates any verification of the former one.
+
+        :rtype: bytes
+        """
+        cred_type = authc_token.token_info['cred_type']
+        stored = account['authc_info'][cred_type].get('credential')
+
+        digest = hmac.new(self.verified_credentials_secret,
+                          digestmod=hashlib.sha256)
+        for part in (self.name, authc_token.identifier,
+                     authc_token.credentials, stored):
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            part = bytes(part or b'')
+            # length-prefixed, so that parts can't run into one another:
+            digest.update(len(part).to_bytes(4, 'big') + part)
+        return digest.digest()
+
+    def is_verified_credentials(self, identifier, digest):
+        with self.verified_credentials_lock:
+            try:
+                verified_digest, expires = self.verified_credentials[identifier]
+            except KeyError:
+                return False
+
+            if expires <= time.time():
+                del self.verified_credentials[identifier]
+                return False
+
+        return hmac.compare_digest(verified_digest, digest)
+
+    def remember_verified_credentials(self, identifier, digest):
+        expires = time.time() + self.verified_credentials_ttl
+        with self.verified_credentials_lock:
+            self.verified_credentials[identifier] = (digest, expires)
+            self.verified_credentials.move_to_end(identifier)
+            while len(self.verified_credentials) > self.verified_credentials_maxsize:
+                self.verified_credentials.popitem(last=False)
+
+    def forget_verified_credentials(self, identifier):
+        with self.verified_credentials_lock:
+            self.verified_credentials.pop(identifier, None)
+
     def generate_totp_token(self, account):
         try:
             stored_totp_key = account['authc_info']['totp_key']['credential']
@@ -286,6 +755,191 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
     # Authorization
     # --------------------------------------------------------------------------
 
+    def warm_authz_cache(self, identifier):
+        """
+        Caches the roles and permissions of the identifier, obtaining both
+        with a single account_store query when the account_store supports it,
+        and compiles its PermissionIndex when compiled indexes are kept (see
+        permission_index_ttl).  This is intended for when authentication
+        succeeds, so that subsequent authorization checks are answered from
+        cache.
+
+        :type identifier:  str
+        """
+        msg = "Warming up the authz_info cache for [{0}]".format(identifier)
+        logger.debug(msg)
+
+        invalidations = self.permission_index_invalidations
+        authz_info = self.query_authz_info(identifier)
+        roles = authz_info['roles']
+        permissions = authz_info['permissions']
+
+        # the creators are only called when the entries are not yet cached:
+        if self.combined_authz_cache:
+            if not (roles or permissions):
+                self.cache_negative_result('authorization:info', identifier)
+                return
+            if self.authz_generations:
+                authz_info['stamp'] = self.get_role_generations_stamp(roles)
+            self.cache_handler.get_or_create(
+                domain='authorization:info:' + self.name,
+                identifier=self.get_authz_cache_identifier(
+                    identifier, 'authorization:info'),
+                creator_func=lambda realm: authz_info,
+                creator=self)
+        elif roles:
+            self.cache_handler.get_or_create(
+                domain='authorization:roles:' + self.name,
+                identifier=self.get_authz_cache_identifier(
+                    identifier, 'authorization:roles'),
+                creator_func=lambda realm: roles,
+                creator=self)
+        else:
+            self.cache_negative_result('authorization:roles', identifier)
+
+        if not permissions:
+            if not self.combined_authz_cache:
+                self.cache_negative_result('authorization:permissions', identifier)
+            return
+
+        if not self.combined_authz_cache:
+            cached_permissions = permissions
+            if self.authz_generations:
+                cached_permissions = dict(permissions)
+                cached_permissions[self.ROLES_STAMP_KEY] = (
+                    self.get_role_generations_stamp(roles) or '')
+            self.cache_handler.hmget_or_create(
+                domain='authorization:permissions:' + self.name,
+                identifier=self.get_authz_cache_identifier(
+                    identifier, 'authorization:permissions'),
+                keys=['*'],
+                creator_func=lambda realm: cached_permissions,
+                creator=self)
+
+        if not self.permission_index_ttl:
+            return
+
+        index = self.create_permission_index(identifier)
+        for domain, blob in permissions.items():
+            index.add_json(domain, blob, self.permission_codec)
+        index.indexed_domains.add('*')
+        self.keep_permission_index(identifier, index, invalidations)
+
+    def query_authz_info(self, identifier):
+        """
+        Obtains the roles and permissions of the identifier from the
+        account_store, with a single query when the account_store is an
+        AuthorizationInfoAccountStore.
+
+        :returns: a dict, {'roles': a list of str,
+                           'permissions': {'domain': json blob}}
+        """
+        if isinstance(self.account_store, account_abcs.AuthorizationInfoAccountStore):
+            authz_info = self.account_store.get_authz_info(identifier) or {}
+            roles = authz_info.get('roles')
+            permissions = authz_info.get('permissions')
+        else:
+            roles = self.account_store.get_authz_roles(identifier)
+            permissions = self.account_store.get_authz_permissions(identifier)
+
+        if permissions:
+            permissions = self.prepare_permissions(permissions)
+
+        return {'roles': sorted(roles or ()),
+                'permissions': dict(permissions or {})}
+
+    def get_authz_info(self, identifier):
+        """
+        Obtains the combined authorization record of the identifier, caching
+        its roles and permissions together so that both are obtained with a
+        single request of the cache_handler.  When authz_generations are
+        enabled, a record obtained under generations of its roles that have
+        since been bumped is replaced.
+
+        :type identifier:  str
+
+        :returns: a dict, {'roles': a list of str,
+                           'permissions': {'domain': json blob}},
+                  which is empty if the account_store has neither
+        """
+        if self.is_negatively_cached('authorization:info', identifier):
+            msg = ("No authz_info found for identifiers [{0}] "
+                   "(negatively cached).".format(identifier))
+            logger.debug(msg)
+            return {'roles': [], 'permissions': {}}
+
+        def query_authz_info(self):
+            msg = ("Could not obtain cached authz_info for [{0}].  "
+                   "Will try to acquire authz_info from account store."
+                   .format(identifier))
+            logger.debug(msg)
+
+            authz_info = self.query_authz_info(identifier)
+            if not (authz_info['roles'] or authz_info['permissions']):
+                msg = "Could not get authz_info from account_store for {0}".\
+                    format(identifier)
+                raise ValueError(msg)
+
+            if self.authz_generations:
+                authz_info['stamp'] = self.get_role_generations_stamp(
+                    authz_info['roles'])
+            return authz_info
+
+        domain = 'authorization:info:' + self.name
+        try:
+            msg2 = ("Attempting to get cached authz_info for [{0}]"
+                    .format(identifier))
+            logger.debug(msg2)
+
+            cache_identifier = self.get_authz_cache_identifier(
+                identifier, 'authorization:info')
+            authz_info = self.cache_handler.get_or_create(
+                domain=domain,
+                identifier=cache_identifier,
+                creator_func=query_authz_info,
+                creator=self)
+
+            if (self.authz_generations and
+                    authz_info.get('stamp') !=
+                    self.get_role_generations_stamp(authz_info['roles'])):
+                self.cache_handler.delete(domain, cache_identifier)
+                authz_info = self.cache_handler.get_or_create(
+                    domain=domain,
+                    identifier=cache_identifier,
+                    creator_func=query_authz_info,
+                    creator=self)
+
+        except AttributeError:
+            # this means the cache_handler isn't configured
+            try:
+                authz_info = query_authz_info(self)
+            except ValueError:
+                authz_info = {'roles': [], 'permissions': {}}
+
+        except ValueError:
+            msg3 = ("No authz_info found for identifiers [{0}].  "
+                    "Returning None.".format(identifier))
+            logger.warning(msg3)
+            self.cache_negative_result('authorization:info', identifier)
+            authz_info = {'roles': [], 'permissions': {}}
+
+        return authz_info
+
+    def prepare_permissions(self, permissions):
+        """
+        Prepares the permissions obtained from the account_store to be cached:
+        minimized, if minimize_permissions, and encoded compactly, if the
+        permission_wire_format is 'compact'.
+
+        :param permissions: {'domain': json blob of a list of parts dicts}
+        :returns: a dict of blobs, keyed as permissions
+        """
+        if self.permission_minimizer is not None:
+            permissions = self.permission_minimizer.minimize_json(permissions)
+        if self.permission_wire_format == 'compact':
+            permissions = self.permission_codec.encode_json(permissions)
+        return permissions
+
     def get_authzd_permissions(self, identifier, perm_domain):
         """
         :type identifier:  str
@@ -293,8 +947,34 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
 
         :returns: a list of relevant json blobs, each a list of permission dicts
         """
+        return self.get_authzd_domain_permissions(identifier, [perm_domain])
+
+    def get_authzd_domain_permissions(self, identifier, perm_domains):
+        """
+        Obtains the permissions of the '*' domain and of every perm_domain
+        in a single request of the cache_handler.
+
+        :type identifier:  str
+        :type perm_domains:  list of str
+
+        :returns: a list of relevant json blobs, each a list of permission
+                  dicts, ordered '*' first and then as perm_domains are
+                  ordered, or an empty list if no permissions are found
+        """
         related_perms = []
-        keys = ['*', perm_domain]
+        keys = ['*'] + list(perm_domains)
+
+        if self.combined_authz_cache:
+            permissions = self.get_authz_info(identifier)['permissions']
+            if permissions:
+                related_perms = [permissions.get(key) for key in keys]
+            return related_perms
+
+        if self.is_negatively_cached('authorization:permissions', identifier):
+            msg = ("No permissions found for identifiers [{0}] "
+                   "(negatively cached).".format(identifier))
+            logger.debug(msg)
+            return related_perms
 
         def query_permissions(self):
             msg = ("Could not obtain cached permissions for [{0}].  "
@@ -308,6 +988,12 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
                 msg = "Could not get permissions from account_store for {0}".\
                     format(identifier)
                 raise ValueError(msg)
+
+            return self.prepare_permissions(permissions)
+
+        def query_stamped_permissions(self):
+            permissions = dict(query_permissions(self))
+            permissions[self.ROLES_STAMP_KEY] = self.get_roles_stamp(identifier) or ''
             return permissions
 
         try:
@@ -319,29 +1005,61 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
 
             # related_perms is a list of json blobs whose contents are ordered
             # such that the order matches that in the keys parameter:
-            related_perms = self.cache_handler.\
-                hmget_or_create(domain=domain,
-                                identifier=identifier,
-                                keys=keys,
-                                creator_func=query_permissions,
-                                creator=self)
+            cache_identifier = self.get_authz_cache_identifier(
+                identifier, 'authorization:permissions')
+
+            if not self.authz_generations:
+                related_perms = self.cache_handler.\
+                    hmget_or_create(domain=domain,
+                                    identifier=cache_identifier,
+                                    keys=keys,
+                                    creator_func=query_permissions,
+                                    creator=self)
+            else:
+                # permissions obtained before a generation of one of the
+                # identifier's roles was bumped are replaced:
+                stamped_keys = keys + [self.ROLES_STAMP_KEY]
+                related_perms = self.cache_handler.\
+                    hmget_or_create(domain=domain,
+                                    identifier=cache_identifier,
+                                    keys=stamped_keys,
+                                    creator_func=query_stamped_permissions,
+                                    creator=self)
+                if (related_perms.pop() or None) != self.get_roles_stamp(identifier):
+                    self.cache_handler.delete(domain, cache_identifier)
+                    related_perms = self.cache_handler.\
+                        hmget_or_create(domain=domain,
+                                        identifier=cache_identifier,
+                                        keys=stamped_keys,
+                                        creator_func=query_stamped_permissions,
+                                        creator=self)
+                    related_perms.pop()
         except ValueError:
             msg3 = ("No permissions found for identifiers [{0}].  "
                     "Returning None.".format(identifier))
             logger.warning(msg3)
+            self.cache_negative_result('authorization:permissions', identifier)
 
         except AttributeError:
             # this means the cache_handler isn't configured
             queried_permissions = query_permissions(self)
 
-            related_perms = [queried_permissions.get('*'),
-                             queried_permissions.get(perm_domain)]
+            related_perms = [queried_permissions.get(key) for key in keys]
 
         return related_perms
 
     def get_authzd_roles(self, identifier):
         roles = []
 
+        if self.combined_authz_cache:
+            return set(self.get_authz_info(identifier)['roles'])
+
+        if self.is_negatively_cached('authorization:roles', identifier):
+            msg = ("No roles found for identifiers [{0}] "
+                   "(negatively cached).".format(identifier))
+            logger.debug(msg)
+            return set(roles)
+
         def query_roles(self):
             msg = ("Could not obtain cached roles for [{0}].  "
                    "Will try to acquire roles from account store."
@@ -361,7 +1079,8 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
 
             roles = self.cache_handler.get_or_create(
                 domain='authorization:roles:' + self.name,
-                identifier=identifier,
+                identifier=self.get_authz_cache_identifier(
+                    identifier, 'authorization:roles'),
                 creator_func=query_roles,
                 creator=self)
         except AttributeError:
@@ -371,14 +1090,117 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             msg3 = ("No roles found for identifiers [{0}].  "
                     "Returning None.".format(identifier))
             logger.warning(msg3)
+            self.cache_negative_result('authorization:roles', identifier)
 
         return set(roles)
 
+    def get_index_generations(self):
+        return self.get_authz_generations() if self.authz_generations else None
+
+    def create_permission_index(self, identifier):
+        """
+        Creates an empty PermissionIndex for the identifier, including the
+        permissions that the role_hierarchy grants to the identifier's roles.
+
+        :rtype: PermissionIndex
+        """
+        index = PermissionIndex(self.get_index_generations())
+
+        hierarchy = self.role_hierarchy
+        if hierarchy is not None and hierarchy.role_permissions:
+            for perm in hierarchy.permissions(self.get_authzd_roles(identifier)):
+                index.add(Permission.parse(perm))
+
+        return index
+
+    def get_permission_index(self, identifier, perm_domains):
+        """
+        Obtains the PermissionIndex compiled for the identifier, compiling the
+        permissions of the perm_domains (and of the '*' domain) into it should
+        they not yet be indexed.  Every domain missing from the index is
+        obtained with a single request of the authorization cache.  An index
+        is recompiled from the authorization cache once it is older than
+        permission_index_ttl or once the authz generations change.  A new
+        index includes the permissions that the role_hierarchy grants to the
+        identifier's roles.
+
+        :type identifier:  str
+        :type perm_domains:  a collection of str
+
+        :rtype: PermissionIndex
+        """
+        invalidations = self.permission_index_invalidations
+        index = self.get_kept_permission_index(identifier)
+        generations = self.get_index_generations()
+
+        if (index is None or
+                time.time() - index.created > self.permission_index_ttl or
+                index.generations != generations):
+            index = self.create_permission_index(identifier)
+            self.keep_permission_index(identifier, index, invalidations)
+
+        missing = [domain for domain in perm_domains
+                   if not index.is_indexed(domain)]
+
+        if missing or not index.is_indexed('*'):
+            assigned = self.get_authzd_domain_permissions(identifier, missing)
+
+            # assigned is ordered '*' and then as missing is, or is empty:
+            for domain, blob in zip(['*'] + missing, assigned):
+                if not index.is_indexed(domain):
+                    index.add_json(domain, blob, self.permission_codec)
+            index.indexed_domains.update(['*'] + missing)
+
+        return index
+
+    def get_kept_permission_index(self, identifier):
+        if not self.permission_index_ttl:
+            return None
+
+        with self.permission_indexes_lock:
+            index = self.permission_indexes.get(identifier)
+            if index is not None:
+                self.permission_indexes.move_to_end(identifier)
+            return index
+
+    def keep_permission_index(self, identifier, index, invalidations):
+        """
+        :param invalidations: the permission_index_invalidations obtained
+                              before the index was compiled.  The index isn't
+                              kept should indexes have been invalidated since.
+        """
+        if not self.permission_index_ttl:
+            return
+
+        with self.permission_indexes_lock:
+            if invalidations != self.permission_index_invalidations:
+                return
+            self.permission_indexes[identifier] = index
+            self.permission_indexes.move_to_end(identifier)
+            while len(self.permission_indexes) > self.permission_index_maxsize:
+                self.permission_indexes.popitem(last=False)
+
+    def forget_permission_index(self, identifier=None):
+        """
+        Forgets the PermissionIndex of the identifier or, without one, of
+        every identifier, such that indexes compiled concurrently with
+        this invalidation aren't kept either.
+        """
+        with self.permission_indexes_lock:
+            self.permission_index_invalidations += 1
+            if identifier is None:
+                self.permission_indexes.clear()
+            else:
+                self.permission_indexes.pop(identifier, None)
+
     def is_permitted(self, identifiers, permission_s):
         """
         If the authorization info cannot be obtained from the accountstore,
         permission check tuple yields False.
 
+        The permissions of every domain that permission_s refers to are
+        obtained at once, before the first result is yielded.
+
         :type identifiers:  subject_abcs.IdentifierCollection
 
         :param permission_s: a collection of one or more permissions, represented
@@ -390,22 +1212,235 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         """
         identifier = identifiers.primary_identifier
 
-        for required in permission_s:
-            domain = Permission.get_domain(required)
+        if self.decision_cache_ttl:
+            yield from self.get_cached_decisions(identifier, permission_s)
+            return
+
+        for required, is_permitted in zip(
+                permission_s, self.evaluate_permissions(identifier, permission_s)):
+            yield (required, is_permitted)
+
+    def uses_permission_index(self):
+        """
+        A compiled PermissionIndex evaluates permissions as the
+        DefaultPermissionVerifier does.  Any other permission_verifier is
+        consulted instead.
 
-            # assigned is a list of json blobs:
-            assigned = self.get_authzd_permissions(identifier, domain)
+        :returns: whether permissions are evaluated with a PermissionIndex
+        """
+        verifier = self.permission_verifier
+        return verifier is None or type(verifier) is DefaultPermissionVerifier
 
-            is_permitted = False
-            for perms_blob in assigned:
-                is_permitted = self.permission_verifier.\
-                    is_permitted_from_json(required, perms_blob)
+    def verify_permissions(self, identifier, permission_s):
+        """
+        Evaluates permission_s with the permission_verifier, against the
+        permissions of their domains (obtained with a single request of the
+        authorization cache) and those that the role_hierarchy grants.
 
-            yield (required, is_permitted)
+        :returns: a list of Booleans, ordered as permission_s
+        """
+        verifier = self.permission_verifier
+
+        # domains are ordered as first required, without duplicates:
+        perm_domains = list(collections.OrderedDict.fromkeys(
+            Permission.parse_required(required).domain_name()
+            for required in permission_s))
+
+        assigned = [blob for blob in
+                    self.get_authzd_domain_permissions(identifier, perm_domains)
+                    if blob]
+
+        granted = ()
+        hierarchy = self.role_hierarchy
+        if hierarchy is not None and hierarchy.role_permissions:
+            granted = hierarchy.permissions(self.get_authzd_roles(identifier))
+
+        return [any(verifier.is_permitted_from_json(required, blob)
+                    for blob in assigned) or
+                (bool(granted) and verifier.is_permitted_from_str(required, granted))
+                for required in permission_s]
+
+    def evaluate_permissions(self, identifier, permission_s):
+        """
+        :returns: a list of Booleans, ordered as permission_s
+        """
+        if not self.uses_permission_index():
+            return self.verify_permissions(identifier, permission_s)
+
+        required_s = [Permission.parse_required(required)
+                      for required in permission_s]
+
+        # domains are ordered as first required, without duplicates:
+        perm_domains = list(collections.OrderedDict.fromkeys(
+            required.domain_name() for required in required_s))
+
+        index = self.get_permission_index(identifier, perm_domains)
+
+        return [index.implies(required) for required in required_s]
+
+    def get_cached_decisions(self, identifier, permission_s):
+        """
+        Obtains the results of permission checks that any process of the realm
+        made within the last decision_cache_ttl seconds, with a single request
+        of the cache_handler, evaluating only those permissions whose results
+        aren't cached and then sharing their results.
+
+        Decisions are cached for each identifier as a record of the
+        generations of its roles and of a dict, keyed by canonical permission,
+        of [result, expiration time], holding at most decision_cache_maxsize
+        decisions.  Concurrent updates may overwrite one another's new
+        decisions, which are then re-evaluated.  Results evaluated with a
+        PermissionIndex compiled before this check (see permission_index_ttl)
+        aren't shared, as the index may predate a change of authorization
+        info that another process cleared.
+
+        :yields: tuple(Permission, Boolean)
+        """
+        domain = 'authorization:decisions:' + self.name
+        cache_identifier = self.get_authz_cache_identifier(
+            identifier, 'authorization:decisions')
+        stamp = self.get_roles_stamp(identifier)
+        now = time.time()
+
+        try:
+            cached = self.cache_handler.get(domain=domain,
+                                            identifier=cache_identifier) or {}
+        except AttributeError:
+            # this means the cache_handler isn't configured
+            cached = None
+
+        decisions = {}
+        if cached and cached.get('stamp') == stamp:
+            decisions = {canonical: decision for canonical, decision in
+                         cached['decisions'].items() if decision[1] > now}
+
+        canonicals = [Permission.parse_required(required).canonical()
+                      for required in permission_s]
+        undecided = collections.OrderedDict(
+            (required, canonical) for required, canonical in
+            zip(permission_s, canonicals) if canonical not in decisions)
+
+        if undecided:
+            expiration = now + self.decision_cache_ttl
+            results = self.evaluate_permissions(identifier, list(undecided))
+            for canonical, is_permitted in zip(undecided.values(), results):
+                decisions[canonical] = [is_permitted, expiration]
+
+            index = self.get_kept_permission_index(identifier)
+            if cached is not None and (index is None or index.created >= now):
+                if len(decisions) > self.decision_cache_maxsize:
+                    kept = sorted(decisions.items(), key=lambda item: item[1][1],
+                                  reverse=True)[:self.decision_cache_maxsize]
+                    shared = dict(kept)
+                else:
+                    shared = decisions
+                self.cache_handler.set(domain=domain,
+                                       identifier=cache_identifier,
+                                       value={'stamp': stamp,
+                                              'decisions': shared})
+
+        for required, canonical in zip(permission_s, canonicals):
+            yield (required, decisions[canonical][0])
+
+    def filter_permitted(self, identifiers, permission, targets):
+        """
+        Filters targets to those for which the permission is granted, such as
+        filtering document ids by 'document:read'.  The permissions of the
+        domain are obtained and compiled once, rather than once per target.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param permission: a domain and actions, such as 'document:read'
+        :type permission: str
+
+        :param targets: the target ids to filter
+        :type targets: a sequence of str or int
+
+        :returns: a list of the permitted targets, ordered as targets
+        """
+        identifier = identifiers.primary_identifier
+
+        if not self.uses_permission_index():
+            results = self.verify_permissions(
+                identifier, [permission + ':' + str(target) for target in targets])
+            return [target for target, is_permitted in zip(targets, results)
+                    if is_permitted]
+
+        index = self.get_permission_index(identifier,
+                                          [Permission.get_domain(permission)])
+
+        return index.filter_permitted(permission, targets)
+
+    def permitted_targets(self, identifiers, permission):
+        """
+        Compiles the targets for which the permission is granted.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param permission: a domain and actions, such as 'blogpost:edit'
+        :type permission: str
+
+        :returns: a tuple containing a Boolean indicating whether every target
+                  is permitted and a frozenset of the permitted targets
+        """
+        identifier = identifiers.primary_identifier
+
+        index = self.get_permission_index(identifier,
+                                          [Permission.get_domain(permission)])
+
+        permits_all, permitted = index.permitted_targets(Permission.parse(permission))
+
+        if not self.uses_permission_index():
+            # the targets that the index grants are narrowed by the verifier:
+            permitted = list(permitted)
+            results = self.verify_permissions(
+                identifier, [permission] +
+                [permission + ':' + str(target) for target in permitted])
+            permits_all = permits_all and results[0]
+            permitted = frozenset(target for target, is_permitted in
+                                  zip(permitted, results[1:]) if is_permitted)
+
+        return permits_all, permitted
+
+    def permitted_actions(self, identifiers, domain, target=None, catalog=None):
+        """
+        Obtains the actions of the domain that are permitted, evaluating the
+        permissions of the domain once rather than once per action.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+        :type domain: str
+
+        :param target: the target acted upon, or None for any target
+        :type target: str or int
+
+        :param catalog: the actions of the domain, against which wildcard
+                        actions are expanded
+        :type catalog: a set of str
+
+        :returns: a frozenset of the permitted actions
+        """
+        identifier = identifiers.primary_identifier
+
+        index = self.get_permission_index(identifier, [domain])
+
+        actions = index.permitted_actions(domain, target, catalog)
+
+        if not self.uses_permission_index():
+            # the actions that the index grants are narrowed by the verifier:
+            actions = list(actions)
+            suffix = '' if target is None else ':' + str(target)
+            results = self.verify_permissions(
+                identifier, [domain + ':' + action + suffix for action in actions])
+            actions = frozenset(action for action, is_permitted in
+                                zip(actions, results) if is_permitted)
+
+        return actions
 
     def has_role(self, identifiers, required_role_s):
         """
-        Confirms whether a subject is a member of one or more roles.
+        Confirms whether a subject is a member of one or more roles.  When the
+        account_store defines a role hierarchy, a subject is a member of every
+        role implied by its assigned roles.
 
         If the authorization info cannot be obtained from the accountstore,
         role check tuple yields False.
@@ -429,6 +1464,10 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             for role in required_role_s:
                 yield (role, False)
         else:
+            hierarchy = self.role_hierarchy
+            if hierarchy is not None:
+                assigned_role_s = hierarchy.expand(assigned_role_s)
+
             for role in required_role_s:
-                hasrole = ({role} <= assigned_role_s)
+                hasrole = (role in assigned_role_s)
                 yield (role, hasrole)
@@ -28,6 +28,8 @@ from yosai.core import (
     SessionException,
     ThreadStateManager,
     UnauthenticatedException,
+    UnauthorizedException,
+    permission_cache,
     subject_abcs,
 )
 
@@ -181,6 +183,15 @@ class DelegatingSubject(subject_abcs.Subject):
     would (as if the target had logged in).  This helps w/ customer support,
     debugging, etc.
 
+    Decision Memo
+    --------------
+    When decision_memo_enabled, a subject memoizes the results of its
+    permission and role checks, so that checks repeated during a request
+    are answered without consulting the SecurityManager.  A subject lives
+    for the duration of a ``Yosai.context`` block, at the end of which its
+    memo is cleared.  The memo is also cleared whenever the subject's identity
+    changes (login, logout, run_as).  Decisions are not shared among subjects.
+
     Concurrency
     -------------
     Shiro uses multithreading.  Yosai's approach to concurrency will be decided
@@ -197,9 +208,11 @@ class DelegatingSubject(subject_abcs.Subject):
                  host=None,
                  session=None,
                  session_creation_enabled=True,
-                 security_manager=None):
+                 security_manager=None,
+                 decision_memo_enabled=False):
 
         self.security_manager = security_manager
+        self.decision_memo = {} if decision_memo_enabled else None
         self.identifiers = identifiers
         self.remembered = remembered
         self.authenticated = authenticated
@@ -254,9 +267,76 @@ class DelegatingSubject(subject_abcs.Subject):
         if (isinstance(identifiers, subject_abcs.IdentifierCollection) or
                 identifiers is None):
             self._identifiers = identifiers
+            self.clear_decision_memo()
         else:
             raise ValueError('must use IdentifierCollection')
 
+    # new to yosai:
+    def clear_decision_memo(self):
+        """
+        Discards any memoized authorization decisions.
+        """
+        if self.decision_memo is not None:
+            self.decision_memo.clear()
+
+    # new to yosai:
+    def memoized_results(self, kind, item_s, check):
+        """
+        Obtains the results of the individual checks of item_s, consulting the
+        check only for those items that aren't yet memoized.
+
+        :param kind: either 'permission' or 'role'
+        :param check: the SecurityManager's is_permitted or has_role
+
+        :returns: a set of tuple(s), containing the item and a Boolean
+        """
+        memo = self.decision_memo
+        pending = [item for item in item_s if (kind, item) not in memo]
+
+        if pending:
+            for item, result in check(self.identifiers, pending):
+                memo[(kind, item)] = result
+
+        return {(item, memo.get((kind, item), False)) for item in item_s}
+
+    # new to yosai:
+    def memoized_collective(self, kind, item_s, logical_operator, check):
+        """
+        Obtains the result of a collective check of item_s, consulting the
+        check only when neither the collective check nor each of the items
+        is memoized.  Consulting the check (rather than checking items
+        individually) preserves the GRANTED/DENIED events of the first check.
+
+        :param kind: either 'permission' or 'role'
+        :param check: the SecurityManager's is_permitted_collective or
+                      has_role_collective
+
+        :returns: a Boolean
+        """
+        memo = self.decision_memo
+        items = frozenset(item_s)
+
+        if all((kind, item) in memo for item in items):
+            return logical_operator(memo[(kind, item)] for item in items)
+
+        key = (kind, items, logical_operator)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+
+        result = check(self.identifiers, item_s, logical_operator)
+        memo[key] = result
+
+        # the individual results are known when every item must have the
+        # same result:
+        if (len(items) == 1 or (result and logical_operator is all) or
+                (not result and logical_operator is any)):
+            for item in items:
+                memo[(kind, item)] = result
+
+        return result
+
     def is_permitted(self, permission_s):
         """
         :param permission_s: a collection of 1..N permissions
@@ -267,12 +347,86 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         if self.authorized:
             self.check_security_manager()
+            if self.decision_memo is not None:
+                return self.memoized_results('permission', permission_s,
+                                             self.security_manager.is_permitted)
             return (self.security_manager.is_permitted(
                     self.identifiers, permission_s))
 
         msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
         raise ValueError(msg)
 
+    def filter_permitted(self, permission, targets):
+        """
+        Filters targets to those that the subject is permitted, checking the
+        permission for every target at once::
+
+            permitted_ids = subject.filter_permitted('document:read', doc_ids)
+
+        :param permission: a domain and actions, such as 'document:read'
+        :type permission: str
+
+        :param targets: the target ids to filter
+        :type targets: a sequence of str or int
+
+        :returns: a list of the permitted targets, ordered as targets
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return (self.security_manager.filter_permitted(
+                    self.identifiers, permission, targets))
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
+    def target_predicate(self, permission):
+        """
+        Compiles the subject's instance-level permissions into a predicate of
+        the targets that the subject is permitted, so that a database query
+        filters rows rather than each row being checked::
+
+            predicate = subject.target_predicate('blogpost:edit')
+            posts = session.query(BlogPost).\
+                filter(predicate.to_sqlalchemy(BlogPost.id, coerce=int))
+
+        :param permission: a domain and actions, such as 'blogpost:edit'
+        :type permission: str
+
+        :rtype: TargetPredicate
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return (self.security_manager.target_predicate(
+                    self.identifiers, permission))
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
+    def permitted_actions(self, domain, target=None):
+        """
+        Obtains the actions of a domain that the subject is permitted, in a
+        single evaluation, such as to render a toolbar::
+
+            actions = subject.permitted_actions('invoice')
+            if 'void' in actions:
+                ...
+
+        :param domain: such as 'invoice'
+        :type domain: str
+
+        :param target: the target acted upon, or None for any target
+        :type target: str or int
+
+        :returns: a frozenset of the permitted actions
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return (self.security_manager.permitted_actions(
+                    self.identifiers, domain, target))
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
     # refactored is_permitted_all:
     def is_permitted_collective(self, permission_s, logical_operator=all):
         """
@@ -286,6 +440,10 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         sm = self.security_manager
         if self.authorized:
+            if self.decision_memo is not None:
+                return self.memoized_collective('permission', permission_s,
+                                                logical_operator,
+                                                sm.is_permitted_collective)
             return sm.is_permitted_collective(self.identifiers,
                                               permission_s,
                                               logical_operator)
@@ -324,9 +482,13 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         self.assert_authz_check_possible()
         if self.authorized:
-            self.security_manager.check_permission(self.identifiers,
-                                                   permission_s,
-                                                   logical_operator)
+            if self.decision_memo is None:
+                self.security_manager.check_permission(self.identifiers,
+                                                       permission_s,
+                                                       logical_operator)
+            elif not self.is_permitted_collective(permission_s, logical_operator):
+                msg = "Subject lacks permission(s) to satisfy logical operation"
+                raise UnauthorizedException(msg)
         else:
             msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
             raise ValueError(msg)
@@ -340,6 +502,9 @@ class DelegatingSubject(subject_abcs.Subject):
                   indicating whether the user is a member of the Role
         """
         if self.authorized:
+            if self.decision_memo is not None:
+                return self.memoized_results('role', role_s,
+                                             self.security_manager.has_role)
             return self.security_manager.has_role(self.identifiers, role_s)
         msg = 'Cannot check permission when identifiers aren\'t set!'
         raise ValueError(msg)
@@ -357,6 +522,10 @@ class DelegatingSubject(subject_abcs.Subject):
         :returns: a Boolean
         """
         if self.authorized:
+            if self.decision_memo is not None:
+                return self.memoized_collective(
+                    'role', role_s, logical_operator,
+                    self.security_manager.has_role_collective)
             return self.security_manager.has_role_collective(self.identifiers,
                                                               role_s,
                                                               logical_operator)
@@ -376,9 +545,13 @@ class DelegatingSubject(subject_abcs.Subject):
         :raises UnauthorizedException: if Subject not assigned to all roles
         """
         if self.authorized:
-            self.security_manager.check_role(self.identifiers,
-                                             role_ids,
-                                             logical_operator)
+            if self.decision_memo is None:
+                self.security_manager.check_role(self.identifiers,
+                                                 role_ids,
+                                                 logical_operator)
+            elif not self.has_role_collective(role_ids, logical_operator):
+                msg = "Subject does not have role(s) assigned."
+                raise UnauthorizedException(msg)
         else:
             msg = 'Cannot check permission when identifiers aren\'t set!'
             raise ValueError(msg)
@@ -413,6 +586,7 @@ class DelegatingSubject(subject_abcs.Subject):
 
         self._identifiers = identifiers
         self.authenticated = True
+        self.clear_decision_memo()
 
         if not host:
             try:
@@ -488,6 +662,7 @@ class DelegatingSubject(subject_abcs.Subject):
             self.session = None
             self._identifiers = None
             self.authenticated = False
+            self.clear_decision_memo()
 
     def session_stopped(self):
         self.session = None
@@ -562,6 +737,7 @@ class DelegatingSubject(subject_abcs.Subject):
         stack.append(identifiers)
         session = self.get_session()
         session.set_internal_attribute(self.run_as_identifiers_session_key, stack)
+        self.clear_decision_memo()
 
     def pop_identity(self):
         """
@@ -572,6 +748,7 @@ class DelegatingSubject(subject_abcs.Subject):
 
         if (stack):
             popped = stack.pop()
+            self.clear_decision_memo()
             if (stack):
                 # persist the changed stack to the session
                 session = self.get_session()
@@ -806,6 +983,8 @@ class Yosai:
         except:
             raise
         finally:
+            for subject in global_subject_context.stack:
+                subject.clear_decision_memo()
             global_yosai_context.stack = []
             global_subject_context.stack = []
 
@@ -938,7 +1117,14 @@ class Yosai:
 
         Basic Example:
             requires_permission(['domain1:action1,action2'])
+
+        The permissions are validated and parsed once, when decorating, so
+        that a malformed permission raises a ValueError at import time.
         """
+        for permission in permission_s:
+            if isinstance(permission, str):
+                permission_cache.pin(permission)
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):
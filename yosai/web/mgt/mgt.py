@@ -134,6 +134,7 @@ class WebSecurityManager(NativeSecurityManager):
 
         # must run after resolve_identifiers:
         remembered = getattr(subject_context, 'remembered', None)
+        decision_memo_enabled = self.authz_settings.decision_memo_enabled
 
         return WebDelegatingSubject(identifiers=identifiers,
                                     remembered=remembered,
@@ -142,7 +143,8 @@ class WebSecurityManager(NativeSecurityManager):
                                     session=session,
                                     session_creation_enabled=session_creation_enabled,
                                     security_manager=security_manager,
-                                    web_registry=subject_context.web_registry)
+                                    web_registry=subject_context.web_registry,
+                                    decision_memo_enabled=decision_memo_enabled)
 
 
 class CookieRememberMeManager(AbstractRememberMeManager):
@@ -30,6 +30,7 @@ from yosai.core import (
     global_yosai_context,
     global_subject_context,
     memoized_property,
+    permission_cache,
 )
 
 from yosai.web import (
@@ -94,7 +95,8 @@ class WebDelegatingSubject(DelegatingSubject):
     """
     def __init__(self, identifiers=None, remembered=False, authenticated=False,
                  host=None, session=None, session_creation_enabled=True,
-                 security_manager=None, web_registry=None):
+                 security_manager=None, web_registry=None,
+                 decision_memo_enabled=False):
 
         super().__init__(identifiers=identifiers,
                          remembered=False,
@@ -102,7 +104,8 @@ class WebDelegatingSubject(DelegatingSubject):
                          host=host,
                          session=session,
                          session_creation_enabled=session_creation_enabled,
-                         security_manager=security_manager)
+                         security_manager=security_manager,
+                         decision_memo_enabled=decision_memo_enabled)
 
         self.web_registry = web_registry
 
@@ -184,6 +187,8 @@ class WebYosai(Yosai):
         except:
             raise
         finally:
+            for subject in global_subject_context.stack:
+                subject.clear_decision_memo()
             global_yosai_context.stack = []
             global_webregistry_context.stack = []
             global_subject_context.stack = []
@@ -312,7 +317,14 @@ class WebYosai(Yosai):
 
         Basic Example:
             requires_permission(['domain1:action1,action2'])
+
+        The permissions are validated and parsed once, when decorating, so
+        that a malformed permission raises a ValueError at import time.
         """
+        for permission in permission_s:
+            if isinstance(permission, str):
+                permission_cache.pin(permission)
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):